@@ -0,0 +1,137 @@
+"""
+Microbenchmark of the serverData decode path.
+
+Compares the previous path (json.loads on a slice of the frame, then a dict
+per symbol) with src.ws.decoder using the standard library and orjson
+backends. Reports microseconds per frame and bytes allocated per frame.
+
+Usage:
+    python benchmarks/decode_benchmark.py [--file feed.jsonl.gz] [--symbols 80] [--repeat 2000]
+
+Without --file a synthetic frame with --symbols symbols is used.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import src.ws.decoder as decoder
+from src.config.time import get_current_time
+from src.ws.decoder import DELTA_FIELDS, decode_event, decode_ticks
+
+
+def synthetic_frame(symbols: int) -> str:
+    """A serverData frame shaped like the ones BVC sends"""
+    items = [
+        {
+            "COD_SIMB": f"SYM{index:03d}",
+            "DESC_SIMB": f"SIMBOLO {index} S.A.",
+            "PRECIO": round(random.uniform(1, 500), 2),
+            "VAR_ABS": round(random.uniform(-5, 5), 2),
+            "VAR_REL": round(random.uniform(-3, 3), 2),
+            "VOLUMEN": random.randint(0, 1_000_000),
+            "MONTO_EFECTIVO": round(random.uniform(0, 10_000_000), 2),
+            "HORA": "11:42:07",
+        }
+        for index in range(symbols)
+    ]
+    return "42" + json.dumps(["serverData", items])
+
+
+def previous_path(message: str) -> list:
+    """Decode as BVCWebSocketClient did before src.ws.decoder"""
+    data = json.loads(message[2:])
+    now = get_current_time()
+    trading_date = now.date().isoformat()
+    symbols_data = []
+    for item in data[1]:
+        symbol = item.get("COD_SIMB")
+        if symbol is None:
+            continue
+        values = {field: item.get(key) for key, field in DELTA_FIELDS.items()}
+        values["trading_date"] = trading_date
+        symbols_data.append(
+            {
+                "symbol": symbol,
+                "description": item.get("DESC_SIMB"),
+                "timestamp": now,
+                **values,
+            }
+        )
+    return symbols_data
+
+
+def decoder_path(message: str) -> list:
+    """Decode with src.ws.decoder (backend chosen by decoder.JSON_BACKEND)"""
+    _, payload = decode_event(message)
+    now = get_current_time()
+    return decode_ticks(payload, now, now.date().isoformat())
+
+
+def measure(function, frames, repeat: int) -> dict:
+    for message in frames:  # warm up
+        function(message)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in frames:
+            function(message)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    kept = [function(message) for message in frames]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+
+    count = repeat * len(frames)
+    return {
+        "us_per_frame": elapsed / count * 1e6,
+        "retained_bytes_per_frame": allocated / len(frames),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serverData decoding")
+    parser.add_argument("--file", help="Recording made with feed_replay.py")
+    parser.add_argument("--symbols", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.file:
+        from feed_replay import load_frames
+
+        frames = [frame for _, frame in load_frames(args.file) if frame[:2] == "42"]
+        repeat = max(1, args.repeat // max(len(frames), 1))
+    else:
+        frames = [synthetic_frame(args.symbols)]
+        repeat = args.repeat
+
+    paths = [("previous", previous_path)]
+    backends = ["json"] + (["orjson"] if decoder.orjson is not None else [])
+    results = {}
+    for name, function in paths:
+        results[name] = measure(function, frames, repeat)
+    for backend in backends:
+        decoder.JSON_BACKEND = backend
+        results[f"decoder[{backend}]"] = measure(decoder_path, frames, repeat)
+
+    baseline = results["previous"]["us_per_frame"]
+    print(f"{len(frames)} frame(s), {repeat} repetitions")
+    for name, result in results.items():
+        print(
+            f"{name:18} {result['us_per_frame']:9.1f} us/frame  "
+            f"{result['retained_bytes_per_frame']:9.0f} B/frame  "
+            f"x{baseline / result['us_per_frame']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Record the live BVC feed and replay it from a local WebSocket server.
+
+Recordings are gzip-compressed JSONL, one frame per line:
+    {"t": <seconds since the recording started>, "dir": "in" | "out", "frame": "<raw frame>"}
+"in" frames were received from BVC ("0{...}", "40{...}", "2", "42[...]"),
+"out" frames were sent by the recorder ("40", "3").
+
+Usage:
+    python benchmarks/feed_replay.py record --out feed.jsonl.gz [--duration 600]
+    python benchmarks/feed_replay.py serve --file feed.jsonl.gz [--speed 1] [--port 8765]
+
+A speed of 0 replays as fast as possible. Point the client at the server with
+WS_BVC=ws://127.0.0.1:8765.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import websockets
+from dotenv import load_dotenv
+from websockets.asyncio.server import serve
+
+
+def load_frames(path: str) -> List[Tuple[float, str]]:
+    """Received frames of a recording as (offset seconds, frame)"""
+    frames = []
+    with gzip.open(path, "rt", encoding="utf-8") as recording:
+        for line in recording:
+            entry = json.loads(line)
+            if entry.get("dir", "in") == "in":
+                frames.append((entry["t"], entry["frame"]))
+    return frames
+
+
+async def record(out: str, duration: Optional[float], ws_url: Optional[str]) -> int:
+    """
+    Connect to the BVC feed and write every frame to 'out'.
+
+    Answers pings like the real client so the server keeps sending data.
+
+    Returns:
+        Number of frames received
+    """
+    from src.ws.bvc import BVCWebSocketClient
+
+    client = BVCWebSocketClient(ws_url)
+    received = 0
+    started = time.monotonic()
+
+    with gzip.open(out, "wt", encoding="utf-8") as recording:
+
+        def write(direction: str, frame: str) -> None:
+            entry = {"t": round(time.monotonic() - started, 6), "dir": direction}
+            entry["frame"] = frame
+            recording.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        async with websockets.connect(
+            client.ws_url,
+            ssl=(
+                client._create_ssl_context()
+                if client.ws_url.startswith("wss://")
+                else None
+            ),
+            additional_headers=client.headers,
+        ) as websocket:
+            await websocket.send("40")
+            write("out", "40")
+
+            while duration is None or time.monotonic() - started < duration:
+                try:
+                    frame = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    continue
+                write("in", frame)
+                received += 1
+                if frame == "2":
+                    await websocket.send("3")
+                    write("out", "3")
+                if received % 100 == 0:
+                    print(f"{received} frames recorded")
+
+    return received
+
+
+class ReplayServer:
+    """
+    Local WebSocket server that replays recorded frames to every client.
+
+    Each connection gets the full recording from the start; 'done' is set
+    when a replay finishes.
+    """
+
+    def __init__(self, frames: List[Tuple[float, str]], speed: float = 1.0):
+        """
+        Args:
+            frames: Output of load_frames()
+            speed: Replay speed multiplier (0 = as fast as possible)
+        """
+        self.frames = frames
+        self.speed = speed
+        self.done = asyncio.Event()
+        self.sent = 0
+
+    async def handler(self, websocket) -> None:
+        previous = None
+        for offset, frame in self.frames:
+            if self.speed > 0 and previous is not None:
+                await asyncio.sleep(max(offset - previous, 0) / self.speed)
+            previous = offset
+            await websocket.send(frame)
+            self.sent += 1
+        self.done.set()
+        # Leave closing to the client, so it doesn't see a drop and reconnect
+        await websocket.wait_closed()
+
+    @staticmethod
+    def _accept_client_headers(connection, request) -> None:
+        """
+        BVCWebSocketClient sends its own Upgrade header on top of the one added
+        by websockets. BVC accepts the duplicate, the websockets server doesn't.
+        """
+        del request.headers["Upgrade"]
+        request.headers["Upgrade"] = "websocket"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        """Async context manager running the server"""
+        return serve(
+            self.handler,
+            host,
+            port,
+            max_size=None,
+            process_request=self._accept_client_headers,
+        )
+
+
+async def run_server(path: str, speed: float, host: str, port: int) -> None:
+    server = ReplayServer(load_frames(path), speed)
+    async with server.serve(host, port):
+        print(
+            f"Replaying {len(server.frames)} frames at "
+            f"{'max' if speed <= 0 else f'{speed}x'} speed on ws://{host}:{port}"
+        )
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Record the live feed")
+    record_parser.add_argument("--out", required=True, help="Output .jsonl.gz file")
+    record_parser.add_argument(
+        "--duration", type=float, help="Seconds to record (default: until Ctrl+C)"
+    )
+    record_parser.add_argument("--url", help="Feed URL (default: WS_BVC)")
+
+    serve_parser = commands.add_parser("serve", help="Replay a recording")
+    serve_parser.add_argument("--file", required=True, help="Recording to replay")
+    serve_parser.add_argument(
+        "--speed", type=float, default=1.0, help="Speed multiplier, 0 = max"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    try:
+        if args.command == "record":
+            count = asyncio.run(record(args.out, args.duration, args.url))
+            print(f"Recorded {count} frames to {args.out}")
+        else:
+            asyncio.run(run_server(args.file, args.speed, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Replay a recorded feed through BVCWebSocketClient and measure ingestion.
+
+Starts a local replay server (see feed_replay.py), points a client at it and
+stores everything in a throwaway database on the local mongod. Reports:
+- frames/sec received and decoded, and end-to-end including the last flush
+- decode -> persist latency per symbol update (p50/p95/p99/max)
+- MongoDB commands per frame, by command name
+- last-seen cache hits/misses and dropped frames
+
+Usage:
+    python benchmarks/ingest_benchmark.py --file feed.jsonl.gz [--speed 0] [--json out.json]
+
+Environment:
+    MONGO_URL: Local mongod (default mongodb://localhost:27017). Other hosts
+        are refused unless --allow-remote or BENCHMARK_ALLOW_REMOTE=1 is given
+    BENCHMARK_DATABASE: Database to write to, dropped before the run (default bvc_benchmark)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+from pymongo import monitoring
+
+load_dotenv()
+# Never write benchmark data into the real database
+os.environ["MONGO_DATABASE"] = os.getenv("BENCHMARK_DATABASE") or "bvc_benchmark"
+
+import src.ws.bvc as bvc
+from src.database.mongo import start_db
+from feed_replay import ReplayServer, load_frames
+from local_db import require_local_mongo
+from stats import summarize
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the commands pymongo sends to the server"""
+
+    def __init__(self):
+        self.commands = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+class InstrumentedClient(bvc.BVCWebSocketClient):
+    """BVCWebSocketClient that records when frames are decoded and persisted"""
+
+    def __init__(self, ws_url: str, expected_frames: int):
+        super().__init__(ws_url)
+        self.session = None  # replayed frames are accepted at any time of day
+        self.expected_frames = expected_frames
+        self.received = 0
+        self.data_frames = 0
+        self.first_frame_at = None
+        self.last_frame_at = None
+        self.last_saved_at = None
+        self.latencies: List[float] = []
+        self.all_received = asyncio.Event()
+        self._decoded_at: Dict[int, float] = {}
+
+    async def _handle_message(self, message: str):
+        now = time.perf_counter()
+        if self.first_frame_at is None:
+            self.first_frame_at = now
+        response = await super()._handle_message(message)
+        self.received += 1
+        self.last_frame_at = time.perf_counter()
+        if self.received >= self.expected_frames:
+            self.all_received.set()
+        return response
+
+    async def _process_server_data(self, data: List[Dict[str, Any]]) -> None:
+        self.data_frames += 1
+        await super()._process_server_data(data)
+
+    async def _enqueue(self, symbols_data: List[Dict[str, Any]]) -> None:
+        decoded_at = time.perf_counter()
+        for info in symbols_data:
+            self._decoded_at[id(info)] = decoded_at
+        await super()._enqueue(symbols_data)
+
+    def _save_data(self, symbols_data: List[Dict[str, Any]]) -> Dict[str, int]:
+        counts = super()._save_data(symbols_data)
+        saved_at = time.perf_counter()
+        for info in symbols_data:
+            decoded_at = self._decoded_at.pop(id(info), None)
+            if decoded_at is not None:
+                self.latencies.append(saved_at - decoded_at)
+        self.last_saved_at = saved_at
+        return counts
+
+
+async def run(path: str, speed: float, port: int) -> Dict[str, Any]:
+    frames = load_frames(path)
+    if not frames:
+        raise ValueError(f"{path} holds no received frames")
+
+    counter = CommandCounter()
+    monitoring.register(counter)  # must happen before the client is created
+    db = start_db()
+    db.client.drop_database(db.name)
+    setup_commands = sum(counter.commands.values())
+
+    server = ReplayServer(frames, speed)
+    client = InstrumentedClient(f"ws://127.0.0.1:{port}", len(frames))
+
+    async with server.serve(port=port):
+        started = time.perf_counter()
+        task = asyncio.create_task(client.start())
+        await client.all_received.wait()
+        await client.stop()
+        await task  # flushes the write queue before returning
+
+    commands = counter.commands
+    db_commands = sum(commands.values()) - setup_commands
+    receive_time = client.last_frame_at - client.first_frame_at
+    total_time = (client.last_saved_at or client.last_frame_at) - started
+
+    return {
+        "file": path,
+        "speed": "max" if speed <= 0 else speed,
+        "frames": client.received,
+        "data_frames": client.data_frames,
+        "receive_seconds": receive_time,
+        "total_seconds": total_time,
+        "frames_per_second": client.received / receive_time if receive_time else None,
+        "end_to_end_frames_per_second": client.received / total_time,
+        "decode_to_persist_ms": summarize(client.latencies, scale=1000),
+        "db_commands": db_commands,
+        "db_commands_per_data_frame": db_commands / max(client.data_frames, 1),
+        "db_commands_by_name": dict(commands.most_common()),
+        "cache": client.cache_stats,
+        "dropped_frames": client.dropped_frames,
+        "writers": client.writer_count,
+        "write_batch_size": client.write_batch_size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BVC feed ingestion")
+    parser.add_argument("--file", required=True, help="Recording to replay")
+    parser.add_argument(
+        "--speed", type=float, default=0, help="Replay speed multiplier, 0 = max"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Also drop and write BENCHMARK_DATABASE on a non-local MONGO_URL",
+    )
+    args = parser.parse_args()
+
+    require_local_mongo(args.allow_remote)
+    report = asyncio.run(run(args.file, args.speed, args.port))
+
+    latency = report["decode_to_persist_ms"]
+    print()
+    print(f"Frames:              {report['frames']} ({report['data_frames']} data)")
+    print(f"Receive rate:        {report['frames_per_second'] or 0:.1f} frames/s")
+    print(f"End to end:          {report['end_to_end_frames_per_second']:.1f} frames/s")
+    if latency["count"]:
+        print(
+            f"Decode->persist ms:  p50 {latency['p50']:.2f}  p95 {latency['p95']:.2f}  "
+            f"p99 {latency['p99']:.2f}  max {latency['max']:.2f}"
+        )
+    print(f"DB commands/frame:   {report['db_commands_per_data_frame']:.2f}")
+    print(f"Dropped frames:      {report['dropped_frames']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, default=str)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
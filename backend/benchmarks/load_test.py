@@ -0,0 +1,315 @@
+"""
+HTTP load test of the API against a seeded database.
+
+Serves the app (main.py) with uvicorn on BENCHMARK_DATABASE, or targets an
+already running server with --url, and runs every endpoint for --duration
+seconds at each --concurrency level. Each concurrent client sends its next
+request as soon as the previous one is answered. For every endpoint and level
+it reports:
+- throughput (requests/s) and bytes received
+- latency p50/p95/p99/max in ms, measured until the whole body is read
+- status codes and connection errors
+
+The JSON report includes the dataset written by seed_market.py, so runs over
+different dataset sizes and commits can be compared.
+
+Usage:
+    python benchmarks/seed_market.py --symbols 50 --days 60
+    python benchmarks/load_test.py [--concurrency 1,8,32] [--duration 10] [--json out.json]
+    python benchmarks/load_test.py --endpoint "/market/{symbol}/history?points=500"
+    python benchmarks/load_test.py --url http://127.0.0.1:8000
+
+Environment:
+    MONGO_URL: Local mongod (default mongodb://localhost:27017)
+    BENCHMARK_DATABASE: Database the served app reads (default bvc_benchmark)
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+# Never load test the real database
+os.environ["MONGO_DATABASE"] = os.getenv("BENCHMARK_DATABASE") or "bvc_benchmark"
+
+from stats import summarize
+
+BACKEND = Path(__file__).parent.parent
+
+# Endpoints tested by default; {symbol} is replaced by the seeded symbols in turn
+DEFAULT_ENDPOINTS = (
+    "/market",
+    "/market?history_limit=50",
+    "/market/summary",
+    "/market/top/gainers",
+    "/market/search?q=A",
+    "/market/{symbol}/candles?interval=1h",
+    "/market/{symbol}/history?points=500",
+    "/market/{symbol}/indicators",
+)
+
+
+def dataset_info() -> Optional[Dict[str, Any]]:
+    """The dataset description stored by seed_market.py, if any"""
+    from seed_market import SEED_ID
+    from src.database.mongo import get_db
+    from src.database.mongo.collections import MARKET_META
+
+    try:
+        document = get_db()[MARKET_META].find_one({"_id": SEED_ID}, {"_id": 0})
+    except Exception as error:
+        print(f"Could not read the dataset description: {error}")
+        return None
+    return document
+
+
+class Server:
+    """The app served by uvicorn in a child process"""
+
+    def __init__(self, port: int, workers: int):
+        self.url = f"http://127.0.0.1:{port}"
+        self.port = port
+        self.workers = workers
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "Server":
+        env = dict(os.environ, VERCEL="1")  # no app.log file handler
+        env.pop("EMBED_INGESTER", None)
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.workers),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            cwd=BACKEND,
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("The server exited during startup")
+            try:
+                httpx.get(self.url + "/", timeout=1)
+                return self
+            except httpx.TransportError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("The server did not start within 30s")
+
+    def __exit__(self, *exc_info) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+async def fetch_symbols(client: httpx.AsyncClient) -> List[str]:
+    response = await client.get("/market", params={"fields": "symbol"})
+    response.raise_for_status()
+    return [quote["symbol"] for quote in response.json()["data"]]
+
+
+def expand(endpoint: str, symbols: List[str]) -> Iterator[str]:
+    """Paths to request in turn: one per symbol if the endpoint has {symbol}"""
+    if "{symbol}" not in endpoint:
+        return itertools.repeat(endpoint)
+    if not symbols:
+        raise ValueError(f"{endpoint} needs symbols, and the server returned none")
+    return itertools.cycle(endpoint.replace("{symbol}", symbol) for symbol in symbols)
+
+
+async def measure(
+    client: httpx.AsyncClient,
+    paths: Iterator[str],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, Any]:
+    """Run 'concurrency' closed-loop clients for 'duration' seconds"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    received = 0
+
+    async def worker(deadline: float) -> None:
+        nonlocal received
+        while time.perf_counter() < deadline:
+            path = next(paths)
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+            except httpx.HTTPError as error:
+                errors[type(error).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+            received += len(response.content)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": dict(errors),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "bytes_per_second": received / elapsed,
+        "latency_ms": summarize(latencies, scale=1000),
+    }
+
+
+async def run(
+    url: str,
+    endpoints: List[str],
+    levels: List[int],
+    duration: float,
+    warmup: float,
+    accept_encoding: str,
+) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=url,
+        limits=limits,
+        timeout=60,
+        headers={"Accept-Encoding": accept_encoding},
+    ) as client:
+        symbols = []
+        if any("{symbol}" in endpoint for endpoint in endpoints):
+            symbols = await fetch_symbols(client)
+        results = []
+        for endpoint in endpoints:
+            paths = expand(endpoint, symbols)
+            if warmup > 0:
+                # Fills caches and opens the connections
+                await measure(client, paths, max(levels), warmup)
+            for concurrency in levels:
+                result = await measure(client, paths, concurrency, duration)
+                results.append(
+                    {"endpoint": endpoint, "concurrency": concurrency, **result}
+                )
+                print_result(results[-1])
+        return results
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    failed = sum(result["errors"].values()) + sum(
+        count for status, count in result["statuses"].items() if int(status) >= 400
+    )
+    line = (
+        f"{result['endpoint'][:44]:<44} {result['concurrency']:>4} "
+        f"{result['requests_per_second']:>9.1f}"
+    )
+    if latency["count"]:
+        line += f" {latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f}"
+    print(line + (f"  ({failed} failed)" if failed else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the HTTP API")
+    parser.add_argument(
+        "--url", help="Server to test (default: serve main.py on BENCHMARK_DATABASE)"
+    )
+    parser.add_argument(
+        "--endpoint",
+        action="append",
+        help="Path to test, may contain {symbol}; repeat for several "
+        "(default: the main market endpoints)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,8,32",
+        help="Comma-separated concurrent clients per run (default: 1,8,32)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Seconds per endpoint and level"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2, help="Unmeasured seconds per endpoint"
+    )
+    parser.add_argument(
+        "--accept-encoding",
+        default="gzip",
+        help="Accept-Encoding sent with every request (default: gzip)",
+    )
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn workers of the served app"
+    )
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    endpoints = args.endpoint or list(DEFAULT_ENDPOINTS)
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    def start(url: str) -> List[Dict[str, Any]]:
+        print(
+            f"{'endpoint':<44} {'conc':>4} {'req/s':>9} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        return asyncio.run(
+            run(
+                url,
+                endpoints,
+                levels,
+                args.duration,
+                args.warmup,
+                args.accept_encoding,
+            )
+        )
+
+    report = {
+        "started_at": datetime.utcnow().isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "accept_encoding": args.accept_encoding,
+    }
+    if args.url:
+        url = args.url.rstrip("/")
+        report["dataset"] = None
+        results = start(url)
+    else:
+        report["dataset"] = dataset_info()
+        report["workers"] = args.workers
+        with Server(args.port, args.workers) as server:
+            url = server.url
+            results = start(url)
+    report["url"] = url
+    report["results"] = results
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, default=str)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
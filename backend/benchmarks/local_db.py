@@ -0,0 +1,46 @@
+"""
+Guard for the benchmark scripts that drop and rewrite their database.
+
+MONGO_URL is usually loaded from .env, which may point at a shared cluster.
+Only the database name is forced to BENCHMARK_DATABASE, so these scripts
+refuse to run against anything but a local mongod unless told otherwise.
+"""
+
+import os
+from typing import List
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def mongo_hosts(url: str) -> List[str]:
+    """Host names of a mongodb:// URL, without ports or credentials"""
+    address = url.split("://", 1)[-1]
+    address = address.split("/", 1)[0].split("?", 1)[0]
+    address = address.rsplit("@", 1)[-1]
+    hosts = []
+    for host in address.split(","):
+        if host.startswith("["):
+            hosts.append(host[1:].split("]", 1)[0])
+        else:
+            hosts.append(host.split(":", 1)[0])
+    return hosts
+
+
+def require_local_mongo(allow_remote: bool = False) -> None:
+    """
+    Exit unless MONGO_URL points at a local mongod.
+
+    Args:
+        allow_remote: Skip the check (--allow-remote); BENCHMARK_ALLOW_REMOTE=1
+            does the same
+    """
+    if allow_remote or os.getenv("BENCHMARK_ALLOW_REMOTE") == "1":
+        return
+    url = os.getenv("MONGO_URL") or "mongodb://localhost:27017"
+    remote = [host for host in mongo_hosts(url) if host not in LOCAL_HOSTS]
+    if url.startswith("mongodb+srv://") or remote:
+        raise SystemExit(
+            f"MONGO_URL points at {', '.join(remote) or 'an SRV record'}, not a local "
+            "mongod. This script drops its database; pass --allow-remote (or set "
+            "BENCHMARK_ALLOW_REMOTE=1) to run it there anyway."
+        )
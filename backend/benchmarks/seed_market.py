@@ -0,0 +1,256 @@
+"""
+Fill a local mongod with synthetic market data shaped like the BVC feed.
+
+Generates N symbols x M trading days of ticks (a random walk per symbol, with
+cumulative daily volume and amount like BVC sends them), the latest quote of
+every symbol, and the OHLCV candles the ingester would have kept. The same
+--seed always produces the same data (ending on today's date), so load tests
+can be compared across commits and dataset sizes.
+
+Usage:
+    python benchmarks/seed_market.py [--symbols 50] [--days 60] [--ticks-per-day 200]
+
+Environment:
+    MONGO_URL: Local mongod (default mongodb://localhost:27017). Other hosts
+        are refused unless --allow-remote or BENCHMARK_ALLOW_REMOTE=1 is given
+    BENCHMARK_DATABASE: Database to write to, dropped before seeding
+        (default bvc_benchmark)
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Never write benchmark data into the real database
+os.environ["MONGO_DATABASE"] = os.getenv("BENCHMARK_DATABASE") or "bvc_benchmark"
+
+from src.config.time import get_time_zone, get_zone, set_time_zone
+from src.database.mongo import start_db
+from src.database.mongo.collections import (
+    MARKET_CANDLES,
+    MARKET_DATA,
+    MARKET_META,
+    MARKET_TICKS,
+    ensure_indexes,
+)
+from src.database.mongo.market_version import bump_market_version
+from src.ws.candles import CandleAggregator
+from local_db import require_local_mongo
+
+# Document in MARKET_META describing the seeded dataset (copied into load test reports)
+SEED_ID = "benchmark_seed"
+
+# Trading session the ticks are spread over (BVC trades 09:00-13:00)
+SESSION_START = 9 * 3600
+SESSION_SECONDS = 4 * 3600
+
+INSERT_BATCH_SIZE = 10_000
+
+
+def symbol_codes(count: int) -> List[str]:
+    """Distinct 3-4 letter codes: AAA, AAB, ..."""
+    codes = []
+    letters = string.ascii_uppercase
+    for index in range(count):
+        code = ""
+        value = index
+        for _ in range(3 if count <= 26**3 else 4):
+            code = letters[value % 26] + code
+            value //= 26
+        codes.append(code)
+    return codes
+
+
+def trading_dates(days: int, last: date) -> List[str]:
+    """The last 'days' weekdays up to 'last', oldest first"""
+    dates = []
+    current = last
+    while len(dates) < days:
+        if current.weekday() < 5:
+            dates.append(current.isoformat())
+        current -= timedelta(days=1)
+    return dates[::-1]
+
+
+def day_ticks(
+    rng: random.Random,
+    symbol: str,
+    trading_date: str,
+    count: int,
+    open_price: float,
+    zone,
+) -> List[Dict[str, Any]]:
+    """Ticks of one symbol's session: a random walk from 'open_price'"""
+    seconds = sorted(rng.sample(range(SESSION_SECONDS), count))
+    day = date.fromisoformat(trading_date)
+    price = open_price
+    volume = 0.0
+    amount = 0.0
+    ticks = []
+    for second in seconds:
+        price = max(round(price * (1 + rng.gauss(0, 0.004)), 2), 0.01)
+        traded = rng.randint(1, 500) * 100
+        volume += traded
+        amount += traded * price
+        market_seconds = SESSION_START + second
+        market_time = (
+            f"{market_seconds // 3600:02d}:"
+            f"{market_seconds % 3600 // 60:02d}:{market_seconds % 60:02d}"
+        )
+        change = round(price - open_price, 2)
+        ticks.append(
+            {
+                "symbol": symbol,
+                "trading_date": trading_date,
+                "market_time": market_time,
+                "price": price,
+                "absolute_variation": change,
+                "relative_variation": round(change / open_price * 100, 2),
+                "volume": volume,
+                "effective_amount": round(amount, 2),
+                # Stored a few seconds after the trade, like the live feed
+                "timestamp": datetime.combine(day, datetime.min.time(), tzinfo=zone)
+                + timedelta(seconds=market_seconds + rng.uniform(0.5, 3.0)),
+            }
+        )
+    return ticks
+
+
+def seed(
+    db,
+    symbols: int,
+    days: int,
+    ticks_per_day: int,
+    random_seed: int,
+    candles: bool = True,
+) -> Dict[str, Any]:
+    """
+    Write the synthetic dataset.
+
+    Args:
+        db: Empty database to fill
+        symbols: Number of symbols
+        days: Trading days per symbol, ending today
+        ticks_per_day: Ticks per symbol and day
+        random_seed: Seed of the random generator
+        candles: Also build the OHLCV candles
+
+    Returns:
+        Description of the dataset, also stored in market_meta
+    """
+    if not 1 <= ticks_per_day <= SESSION_SECONDS:
+        raise ValueError(f"ticks_per_day must be between 1 and {SESSION_SECONDS}")
+
+    rng = random.Random(random_seed)
+    zone = get_zone(get_time_zone())
+    codes = symbol_codes(symbols)
+    dates = trading_dates(days, datetime.now(zone).date())
+    prices = {code: round(rng.uniform(0.5, 200), 2) for code in codes}
+    aggregator = CandleAggregator()
+    latest: Dict[str, Dict[str, Any]] = {}
+    pending: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        if pending:
+            db[MARKET_TICKS].insert_many(pending, ordered=False)
+            pending.clear()
+
+    for trading_date in dates:
+        day = []
+        for code in codes:
+            ticks = day_ticks(
+                rng, code, trading_date, ticks_per_day, prices[code], zone
+            )
+            prices[code] = ticks[-1]["price"]
+            latest[code] = ticks[-1]
+            day.extend(ticks)
+
+        # Copies, since insert_many adds an _id to the documents it writes
+        pending.extend(dict(tick) for tick in day)
+        if len(pending) >= INSERT_BATCH_SIZE:
+            flush()
+
+        if candles:
+            day.sort(key=lambda tick: tick["timestamp"])
+            operations = aggregator.apply(day)
+            for start in range(0, len(operations), INSERT_BATCH_SIZE):
+                db[MARKET_CANDLES].bulk_write(
+                    operations[start : start + INSERT_BATCH_SIZE], ordered=False
+                )
+        print(f"{trading_date}: {len(day)} ticks")
+    flush()
+
+    for code, tick in latest.items():
+        quote = {key: value for key, value in tick.items() if key != "_id"}
+        quote["description"] = f"Synthetic {code}"
+        db[MARKET_DATA].replace_one({"symbol": code}, quote, upsert=True)
+    bump_market_version(db)
+
+    dataset = {
+        "symbols": symbols,
+        "days": days,
+        "ticks_per_day": ticks_per_day,
+        "seed": random_seed,
+        "first_date": dates[0],
+        "last_date": dates[-1],
+        "ticks": db[MARKET_TICKS].estimated_document_count(),
+        "candles": db[MARKET_CANDLES].estimated_document_count(),
+        "created_at": datetime.utcnow(),
+    }
+    db[MARKET_META].replace_one({"_id": SEED_ID}, dataset, upsert=True)
+    return dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=60, help="Trading days per symbol")
+    parser.add_argument("--ticks-per-day", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument(
+        "--no-candles", action="store_true", help="Only write ticks and quotes"
+    )
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Also drop and seed BENCHMARK_DATABASE on a non-local MONGO_URL",
+    )
+    args = parser.parse_args()
+
+    require_local_mongo(args.allow_remote)
+    set_time_zone()
+    db = start_db()
+    db.client.drop_database(db.name)
+    ensure_indexes(db)
+
+    started = time.perf_counter()
+    dataset = seed(
+        db,
+        symbols=args.symbols,
+        days=args.days,
+        ticks_per_day=args.ticks_per_day,
+        random_seed=args.seed,
+        candles=not args.no_candles,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"Seeded {db.name}: {dataset['ticks']} ticks and {dataset['candles']} candles "
+        f"for {args.symbols} symbols x {args.days} days in {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
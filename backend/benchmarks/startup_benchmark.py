@@ -0,0 +1,172 @@
+"""
+Cold start cost of the HTTP app, as a serverless worker pays it.
+
+Every run starts a fresh interpreter that imports main.py (what Vercel does)
+and serves one request, timing each phase:
+- interpreter: an empty interpreter, for reference
+- framework_import: fastapi and PyNest
+- app_import: the rest of main.py, including building the PyNest app
+- first_request: GET / through the ASGI app
+- total: wall time of the whole process, measured from outside
+
+With --imports N it also lists the N slowest modules (python -X importtime).
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 10] [--imports 15] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stats import summarize
+
+BACKEND = Path(__file__).parent.parent
+
+# Runs in the child interpreter and prints the phase timings as JSON
+PROBE = """
+import time
+started = time.perf_counter()
+import asyncio, json, logging, sys
+import fastapi, nest.core
+framework = time.perf_counter()
+import main
+app_ready = time.perf_counter()
+logging.disable(logging.CRITICAL)
+
+async def first_request():
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/",
+             "root_path": "", "query_string": b"", "headers": [],
+             "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80)}
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await main.app(scope, receive, send)
+    return status[0]
+
+status = asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({
+    "framework_import": framework - started,
+    "app_import": app_ready - framework,
+    "first_request": done - app_ready,
+    "status": status,
+}))
+"""
+
+
+def run_child(
+    code: str, env: Dict[str, str], *flags: str
+) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def slowest_imports(env: Dict[str, str], count: int) -> List[Dict[str, Any]]:
+    """Modules with the highest cumulative import time when importing main"""
+    result = run_child("import main", env, "-X", "importtime")
+    modules = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match:
+            modules.append(
+                {
+                    "module": match.group(4),
+                    "self_ms": int(match.group(1)) / 1000,
+                    "cumulative_ms": int(match.group(2)) / 1000,
+                    "depth": len(match.group(3)) // 2,
+                }
+            )
+    modules.sort(key=lambda module: module["cumulative_ms"], reverse=True)
+    return modules[:count]
+
+
+def run(runs: int, imports: int) -> Dict[str, Any]:
+    env = dict(os.environ, VERCEL="1")  # no app.log file handler
+    env.pop("EMBED_INGESTER", None)
+    run_child("import main", env)  # warm the bytecode cache, like a deployed build
+
+    phases: Dict[str, List[float]] = {
+        "interpreter": [],
+        "framework_import": [],
+        "app_import": [],
+        "first_request": [],
+        "total": [],
+    }
+    for _ in range(runs):
+        started = time.perf_counter()
+        run_child("pass", env)
+        phases["interpreter"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        result = run_child(PROBE, env)
+        phases["total"].append(time.perf_counter() - started)
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        for phase in ("framework_import", "app_import", "first_request"):
+            phases[phase].append(timings[phase])
+
+    report = {
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "phases_ms": {
+            phase: summarize(values, scale=1000) for phase, values in phases.items()
+        },
+    }
+    if imports:
+        report["slowest_imports"] = slowest_imports(env, imports)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP app cold start")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--imports", type=int, default=15, help="Slowest modules to list, 0 = none"
+    )
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.runs, args.imports)
+
+    print()
+    print(f"{'phase':<18} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for phase, stats in report["phases_ms"].items():
+        print(
+            f"{phase:<18} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['max']:>9.1f}"
+        )
+    if report.get("slowest_imports"):
+        print()
+        print("Slowest imports (cumulative ms):")
+        for module in report["slowest_imports"]:
+            print(f"  {module['cumulative_ms']:>8.1f}  {module['module']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Small statistics helpers shared by the benchmark scripts.
+"""
+
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (fraction in 0..1)"""
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def summarize(values: List[float], scale: float = 1.0) -> Dict[str, float]:
+    """
+    Distribution summary of a list of measurements.
+
+    Args:
+        values: Measurements (e.g. latencies in seconds)
+        scale: Factor applied to every statistic (e.g. 1000 for milliseconds)
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "min": ordered[0] * scale,
+        "mean": sum(ordered) / len(ordered) * scale,
+        "p50": percentile(ordered, 0.50) * scale,
+        "p95": percentile(ordered, 0.95) * scale,
+        "p99": percentile(ordered, 0.99) * scale,
+        "max": ordered[-1] * scale,
+    }
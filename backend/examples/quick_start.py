@@ -12,7 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from dotenv import load_dotenv
-from src.database.mongo import start_db, db
+from src.database.mongo import start_db
 from src.ws.bvc import BVCWebSocketClient
 from src.ws.market_data_utils import (
     MarketDataQuery,
@@ -71,7 +71,7 @@ def demo_market_summary():
     logger.info("DEMO: Resumen del Mercado")
     logger.info("=" * 60)
 
-    collection = db["market_data"]
+    collection = start_db()["market_data"]
     query = MarketDataQuery(collection)
 
     summary = query.get_market_summary()
@@ -102,7 +102,7 @@ def demo_top_lists():
     logger.info("DEMO: Top Listas del Mercado")
     logger.info("=" * 60)
 
-    collection = db["market_data"]
+    collection = start_db()["market_data"]
     query = MarketDataQuery(collection)
 
     # Top Gainers
@@ -172,7 +172,7 @@ def demo_symbol_search():
     logger.info("DEMO: Búsqueda de Símbolos")
     logger.info("=" * 60)
 
-    collection = db["market_data"]
+    collection = start_db()["market_data"]
     query = MarketDataQuery(collection)
 
     # Buscar bancos
@@ -1,12 +1,9 @@
-import uvicorn
 from dotenv import load_dotenv
-from src.database.mongo import start_db, db
+from src.database.mongo import get_db
 import logging
 import sys
 import io
 from src.config.time import set_time_zone
-from src.ws.bvc import connect_to_ws_bvc
-import asyncio
 
 # Load environment variables
 load_dotenv()
@@ -36,26 +33,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Initialize database for Vercel serverless environment
-# This ensures DB is connected when the module is imported
-if db is None:  # Only initialize if not already connected
-    try:
-        start_db()
-        logger.info("[OK] Database connected for Vercel")
-    except Exception as e:
-        logger.error(
-            f"[ERROR] Error connecting to database for Vercel: {e}", exc_info=True
-        )
-
-# Export app for Vercel
+# The database is connected on first use (get_db), so a cold start only
+# imports and builds the app. Export app for Vercel
 from src.app_module import http_server as app
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     # Connect to database
     try:
-        if db is None:
-            start_db()
+        get_db()
         logger.info("[OK] Database connected successfully")
     except Exception as e:
         logger.error(f"[ERROR] Error connecting to database: {e}", exc_info=True)
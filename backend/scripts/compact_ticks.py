@@ -0,0 +1,102 @@
+"""
+Roll ticks older than the retention window into daily bars and delete them.
+
+Each (symbol, trading date) older than the window becomes one "1d" candle in
+market_candles (open, high, low, close, volume, effective amount), then its
+ticks are deleted in small batches (see src/database/mongo/compaction.py).
+Intraday candles (1m, 5m, 1h) older than the window are deleted too.
+Safe to interrupt and re-run.
+
+Usage:
+    python scripts/compact_ticks.py [--retention-days 30] [--batch-size 5000]
+    python scripts/compact_ticks.py --interval 3600    # keep compacting every hour
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from src.config.time import set_time_zone
+from src.database.mongo import start_db
+from src.database.mongo.collections import ensure_indexes
+from src.database.mongo.compaction import TickCompactor
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=int(os.getenv("TICK_RETENTION_DAYS") or 30),
+        help="Keep raw ticks of the last N trading dates (default: "
+        "TICK_RETENTION_DAYS or 30)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Ticks deleted per batch (default: 5000)",
+    )
+    parser.add_argument(
+        "--pause",
+        type=float,
+        default=0.1,
+        help="Seconds to sleep between delete batches (default: 0.1)",
+    )
+    parser.add_argument(
+        "--max-days",
+        type=int,
+        help="Compact at most N symbol days per run",
+    )
+    parser.add_argument(
+        "--ignore-exports",
+        action="store_true",
+        help="Delete ticks even if the tick exporter hasn't written them yet",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Run again every N seconds instead of exiting",
+    )
+    args = parser.parse_args()
+
+    set_time_zone()
+    db = start_db()
+    ensure_indexes(db)
+    compactor = TickCompactor(
+        db,
+        retention=timedelta(days=args.retention_days),
+        batch_size=args.batch_size,
+        pause=args.pause,
+        wait_for_export=not args.ignore_exports,
+    )
+
+    while True:
+        stats = compactor.run(max_days=args.max_days)
+        print(
+            f"Compacted {stats['days']} days before {stats['cutoff']}, "
+            f"deleted {stats['deleted']} ticks and "
+            f"{stats['candles_deleted']} intraday candles"
+            + (
+                f" ({stats['waiting_for_export']} days waiting for the exporter)"
+                if stats["waiting_for_export"]
+                else ""
+            )
+        )
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
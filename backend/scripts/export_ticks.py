@@ -0,0 +1,76 @@
+"""
+Export the ticks stored since the last run to Parquet/CSV files.
+
+Reads only the ticks inserted after the export checkpoint (see
+src/exports/ticks.py) and writes them under EXPORT_DIR, partitioned by
+trading date and symbol. The parts of a trading day that is over are merged
+into one file per symbol. Safe to interrupt and re-run.
+
+Usage:
+    python scripts/export_ticks.py [--format parquet|csv] [--batch-size 50000]
+    python scripts/export_ticks.py --interval 300    # keep exporting every 5 minutes
+"""
+
+import argparse
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from src.database.mongo import start_db
+from src.exports.ticks import TickExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--format",
+        choices=("parquet", "csv"),
+        help="File format (default: parquet if pyarrow is installed, else csv)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50_000,
+        help="Ticks read and written per batch (default: 50000)",
+    )
+    parser.add_argument(
+        "--lag",
+        type=float,
+        default=60,
+        help="Only export ticks older than this many seconds (default: 60)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Run again every N seconds instead of exiting",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    exporter = TickExporter(
+        start_db(),
+        file_format=args.format,
+        batch_size=args.batch_size,
+        lag=timedelta(seconds=args.lag),
+    )
+
+    while True:
+        stats = exporter.run()
+        print(
+            f"Exported {stats['rows']} ticks to {stats['files']} files, "
+            f"merged {stats['merged']} partitions "
+            f"(checkpoint {stats['checkpoint']})"
+        )
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
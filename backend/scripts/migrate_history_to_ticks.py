@@ -0,0 +1,157 @@
+"""
+Move the embedded market_data.history arrays into the market_ticks collection.
+
+For every symbol document that still has a 'history' array:
+- Each entry is upserted into 'market_ticks' keyed by (symbol, trading_date, market_time)
+- The latest entry is copied onto the symbol document as its latest quote
+- The 'history' array is removed (unless --keep-history is given)
+
+Symbol documents also lose their stale 'raw_data' copy of a past frame.
+
+The migration is idempotent: ticks already migrated are no-op upserts, so it
+can be interrupted and re-run safely.
+
+Usage:
+    python scripts/migrate_history_to_ticks.py [--batch-size 500] [--keep-history]
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from src.config.time import get_trading_date, set_time_zone
+from src.database.mongo import start_db
+from src.database.mongo.collections import MARKET_DATA, MARKET_TICKS, ensure_indexes
+from src.database.mongo.market_version import bump_market_version
+
+
+def _entry_timestamp(entry):
+    """Entry timestamp as a datetime (older entries may hold ISO strings)"""
+    timestamp = entry.get("timestamp")
+    if isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+    return timestamp if isinstance(timestamp, datetime) else None
+
+
+def migrate_symbol(db, document, batch_size, keep_history):
+    """
+    Migrate the history of a single symbol document.
+
+    Returns:
+        Tuple of (ticks inserted, entries skipped)
+    """
+    symbol = document["symbol"]
+    history = document.get("history") or []
+    inserted = 0
+    skipped = 0
+    latest = None
+    operations = []
+
+    for entry in history:
+        timestamp = _entry_timestamp(entry)
+        if timestamp is None:
+            skipped += 1
+            continue
+
+        tick = {
+            "symbol": symbol,
+            "trading_date": get_trading_date(timestamp),
+            "market_time": entry.get("market_time"),
+            "price": entry.get("price"),
+            "absolute_variation": entry.get("absolute_variation"),
+            "relative_variation": entry.get("relative_variation"),
+            "volume": entry.get("volume"),
+            "effective_amount": entry.get("effective_amount"),
+            "timestamp": timestamp,
+        }
+        operations.append(
+            UpdateOne(
+                {
+                    "symbol": symbol,
+                    "trading_date": tick["trading_date"],
+                    "market_time": tick["market_time"],
+                },
+                {"$setOnInsert": tick},
+                upsert=True,
+            )
+        )
+        if latest is None or timestamp >= latest["timestamp"]:
+            latest = tick
+
+        if len(operations) >= batch_size:
+            inserted += (
+                db[MARKET_TICKS].bulk_write(operations, ordered=False).upserted_count
+            )
+            operations = []
+
+    if operations:
+        inserted += (
+            db[MARKET_TICKS].bulk_write(operations, ordered=False).upserted_count
+        )
+
+    update = {}
+    if latest is not None:
+        update["$set"] = {
+            key: value for key, value in latest.items() if key != "symbol"
+        }
+    if not keep_history:
+        update["$unset"] = {"history": ""}
+    if update:
+        db[MARKET_DATA].update_one({"_id": document["_id"]}, update)
+
+    return inserted, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Ticks per bulk_write (default: 500)",
+    )
+    parser.add_argument(
+        "--keep-history",
+        action="store_true",
+        help="Copy ticks but leave the embedded history arrays in place",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    set_time_zone()
+    db = start_db()
+    ensure_indexes(db)
+
+    total_inserted = 0
+    total_skipped = 0
+    documents = db[MARKET_DATA].find(
+        {"history": {"$exists": True}}, {"symbol": 1, "history": 1}
+    )
+    for document in documents:
+        inserted, skipped = migrate_symbol(
+            db, document, args.batch_size, args.keep_history
+        )
+        total_inserted += inserted
+        total_skipped += skipped
+        print(f"{document['symbol']}: {inserted} ticks migrated, {skipped} skipped")
+
+    db[MARKET_DATA].update_many(
+        {"raw_data": {"$exists": True}}, {"$unset": {"raw_data": ""}}
+    )
+    bump_market_version(db)
+
+    print(f"Done: {total_inserted} ticks migrated, {total_skipped} skipped")
+
+
+if __name__ == "__main__":
+    main()
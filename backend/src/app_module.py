@@ -2,10 +2,17 @@ from nest.core import PyNestFactory, Module
 
 from .app_controller import AppController
 from .app_service import AppService
+from src.http.exports.exports_module import ExportsModule
 from src.http.market.maket_module import MarketModule
+from src.http.metrics.metrics_module import MetricsModule
+from src.http.rates.rates_module import RatesModule
 
 
-@Module(imports=[MarketModule], controllers=[AppController], providers=[AppService])
+@Module(
+    imports=[MarketModule, MetricsModule, RatesModule, ExportsModule],
+    controllers=[AppController],
+    providers=[AppService],
+)
 class AppModule:
     pass
 
@@ -31,3 +38,56 @@ http_server.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# Compress the other responses (cached market snapshots come pre-compressed,
+# and the middleware leaves them and SSE streams alone). Export downloads are
+# served as stored, since their Range responses address the file's own bytes
+from src.http.compression import SelectiveGZipMiddleware
+
+http_server.add_middleware(
+    SelectiveGZipMiddleware,
+    exclude_paths=("/exports/files/",),
+    minimum_size=1000,
+    compresslevel=6,
+)
+
+# Count and time every request (exposed at /metrics)
+from src.metrics.middleware import RequestTimingMiddleware
+
+http_server.add_middleware(RequestTimingMiddleware)
+
+# Exchange rates: fetch them once at startup so the first /rates request
+# finds them cached, and close the pooled HTTP client on shutdown
+from src.ws.bcv import rate_provider
+
+
+async def warm_rates():
+    rate_provider.refresh_in_background()
+
+
+http_server.add_event_handler("startup", warm_rates)
+http_server.add_event_handler("shutdown", rate_provider.aclose)
+
+# Optionally run the BVC ingester inside the HTTP server, so /market/stream
+# sends changes as soon as they are decoded instead of once per version
+# poll. Not for serverless deployments.
+import asyncio
+from os import getenv
+
+if getenv("EMBED_INGESTER") == "1":
+    ingester_task = None
+
+    async def start_ingester():
+        global ingester_task
+        from src.ws.ingester import run_ingester
+
+        # Leader-elected, so only one replica ingests
+        ingester_task = asyncio.create_task(run_ingester())
+
+    async def stop_ingester():
+        if ingester_task is not None:
+            ingester_task.cancel()
+            await asyncio.gather(ingester_task, return_exceptions=True)
+
+    http_server.add_event_handler("startup", start_ingester)
+    http_server.add_event_handler("shutdown", stop_ingester)
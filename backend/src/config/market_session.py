@@ -0,0 +1,171 @@
+"""
+Trading session calendar of the Bolsa de Valores de Caracas.
+
+Sessions run on weekdays from BVC_SESSION_OPEN to BVC_SESSION_CLOSE in the
+configured timezone, except on holidays: the fixed Venezuelan national
+holidays, the Easter-based ones (Carnival, Holy Thursday and Good Friday)
+and any extra date listed in BVC_HOLIDAYS.
+"""
+
+import time
+from datetime import date, datetime, time as day_time, timedelta
+from functools import lru_cache
+from os import getenv
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from .time import get_current_time, get_time_zone, get_zone
+
+# (month, day) of the national holidays with a fixed date
+FIXED_HOLIDAYS = (
+    (1, 1),  # Año Nuevo
+    (4, 19),  # Declaración de la Independencia
+    (5, 1),  # Día del Trabajador
+    (6, 24),  # Batalla de Carabobo
+    (7, 5),  # Día de la Independencia
+    (7, 24),  # Natalicio del Libertador
+    (10, 12),  # Día de la Resistencia Indígena
+    (12, 24),  # Nochebuena
+    (12, 25),  # Navidad
+    (12, 31),  # Fin de año
+)
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday) // 451
+    month, day = divmod(h + weekday - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=16)
+def national_holidays(year: int) -> FrozenSet[date]:
+    """Fixed and Easter-based national holidays of a year"""
+    easter = easter_sunday(year)
+    moveable = (
+        easter - timedelta(days=48),  # Lunes de Carnaval
+        easter - timedelta(days=47),  # Martes de Carnaval
+        easter - timedelta(days=3),  # Jueves Santo
+        easter - timedelta(days=2),  # Viernes Santo
+    )
+    return frozenset(
+        [date(year, month, day) for month, day in FIXED_HOLIDAYS] + list(moveable)
+    )
+
+
+def _parse_time(value: str) -> day_time:
+    hour, minute = value.strip().split(":")
+    return day_time(int(hour), int(minute))
+
+
+class MarketSession:
+    """
+    Session calendar plus a cached "is the market open" clock.
+
+    The clock answers from two floats compared against time.time(): the
+    answer is recomputed only when the current state (open or closed) ends,
+    so checking it on every frame builds no datetime at all.
+    """
+
+    def __init__(
+        self,
+        open_time: day_time = day_time(9, 0),
+        close_time: day_time = day_time(13, 0),
+        holidays: Iterable[date] = (),
+        lead: timedelta = timedelta(minutes=5),
+        grace: timedelta = timedelta(minutes=10),
+    ):
+        """
+        Args:
+            open_time: Session open (local time)
+            close_time: Session close (local time)
+            holidays: Extra non-trading dates besides the national holidays
+            lead: How long before the open the ingester connects
+            grace: How long after the close frames are still accepted and
+                the ingester stays connected, for the closing updates
+        """
+        self.open_time = open_time
+        self.close_time = close_time
+        self.holidays = frozenset(holidays)
+        self.lead = lead
+        self.grace = grace
+        self._state = False
+        self._state_until = 0.0  # epoch seconds
+
+    @classmethod
+    def from_env(cls) -> "MarketSession":
+        """
+        Session configured from the environment:
+        BVC_SESSION_OPEN / BVC_SESSION_CLOSE (HH:MM), BVC_HOLIDAYS
+        (comma-separated YYYY-MM-DD), BVC_SESSION_LEAD / BVC_SESSION_GRACE (minutes)
+        """
+        holidays = [
+            date.fromisoformat(value.strip())
+            for value in (getenv("BVC_HOLIDAYS") or "").split(",")
+            if value.strip()
+        ]
+        return cls(
+            open_time=_parse_time(getenv("BVC_SESSION_OPEN") or "09:00"),
+            close_time=_parse_time(getenv("BVC_SESSION_CLOSE") or "13:00"),
+            holidays=holidays,
+            lead=timedelta(minutes=float(getenv("BVC_SESSION_LEAD") or 5)),
+            grace=timedelta(minutes=float(getenv("BVC_SESSION_GRACE") or 10)),
+        )
+
+    def is_trading_day(self, day: date) -> bool:
+        return (
+            day.weekday() < 5
+            and day not in self.holidays
+            and day not in national_holidays(day.year)
+        )
+
+    def bounds(self, day: date) -> Tuple[datetime, datetime]:
+        """Open and close of the session on 'day', timezone-aware"""
+        zone = get_zone(get_time_zone())
+        return (
+            datetime.combine(day, self.open_time, tzinfo=zone),
+            datetime.combine(day, self.close_time, tzinfo=zone),
+        )
+
+    def window(self, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """
+        Current or next connection window: (open - lead, close + grace).
+
+        Args:
+            now: Reference time (defaults to the current time)
+        """
+        now = now or get_current_time()
+        day = now.date()
+        for _ in range(31):
+            if self.is_trading_day(day):
+                session_open, session_close = self.bounds(day)
+                end = session_close + self.grace
+                if now < end:
+                    return session_open - self.lead, end
+            day += timedelta(days=1)
+        raise ValueError("No trading day in the next 31 days, check BVC_HOLIDAYS")
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """Whether frames received at 'now' belong to a session (open to close + grace)"""
+        now = now or get_current_time()
+        start, end = self.window(now)
+        return start + self.lead <= now < end
+
+    def is_open_now(self) -> bool:
+        """is_open() for the current time, cached until the state changes"""
+        if time.time() < self._state_until:
+            return self._state
+
+        now = get_current_time()
+        start, end = self.window(now)
+        session_open = start + self.lead
+        self._state = session_open <= now < end
+        self._state_until = (end if self._state else session_open).timestamp()
+        return self._state
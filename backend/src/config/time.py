@@ -1,6 +1,7 @@
 from os import getenv, environ
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 
@@ -22,13 +23,30 @@ def set_time_zone():
         time.tzset()
 
 
-def get_current_time():
-    """Get current time in configured timezone (America/Caracas by default)"""
-    tz_name = get_time_zone()
+@lru_cache(maxsize=None)
+def get_zone(tz_name: str) -> ZoneInfo:
+    """ZoneInfo for a timezone name, built once per name (UTC if not found)"""
     try:
-        # Use ZoneInfo to get the correct timezone
-        tz = ZoneInfo(tz_name)
-        return datetime.now(tz)
+        return ZoneInfo(tz_name)
     except Exception:
-        # Fallback to UTC if timezone not found
-        return datetime.now(ZoneInfo("UTC"))
+        return ZoneInfo("UTC")
+
+
+def get_current_time():
+    """Get current time in configured timezone (America/Caracas by default)"""
+    return datetime.now(get_zone(get_time_zone()))
+
+
+def to_local_time(value: datetime) -> datetime:
+    """
+    Convert a datetime to the configured timezone.
+    Naive values are treated as UTC, which is how pymongo returns them.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(get_zone(get_time_zone()))
+
+
+def get_trading_date(value: datetime) -> str:
+    """Trading date (YYYY-MM-DD in the configured timezone) a datetime belongs to"""
+    return to_local_time(value).date().isoformat()
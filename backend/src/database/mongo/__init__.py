@@ -1,21 +1,57 @@
-from pymongo import MongoClient
 import os
+import threading
+
+from pymongo import MongoClient
 
 
 db = None
 
 client: MongoClient = None
 
+_lock = threading.Lock()
 
-def start_db():
+
+def _client_options() -> dict:
+    """
+    Pool and timeout settings, overridable from the environment. The short
+    server selection timeout makes a request fail fast instead of hanging for
+    pymongo's default 30s when the database is unreachable.
+    """
+    return {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE") or 10),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE") or 0),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS") or 60000),
+        "serverSelectionTimeoutMS": int(
+            os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS") or 5000
+        ),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS") or 5000),
+        "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS") or 20000),
+    }
+
+
+def get_db():
+    """
+    Database, connected on first use.
+
+    Creating the client resolves mongodb+srv:// records and starts pymongo's
+    monitor threads, so it is left out of module imports: a process only pays
+    for it when it actually queries the database.
+    """
     global db, client
     if db is not None:
         return db
-    # Replace with your MongoDB connection string
-    connection_string = (
-        os.getenv("MONGO_URL") or "mongodb://localhost:27017/bvc"
-    )  # Or your Atlas connection string
-    client = MongoClient(connection_string)
-    db = client[os.getenv("MONGO_DATABASE") or "bvc"]
-    print("MONGO DB IS CONNECTED")
+    with _lock:
+        if db is None:
+            # Replace with your MongoDB connection string
+            connection_string = (
+                os.getenv("MONGO_URL") or "mongodb://localhost:27017/bvc"
+            )  # Or your Atlas connection string
+            client = MongoClient(connection_string, **_client_options())
+            db = client[os.getenv("MONGO_DATABASE") or "bvc"]
+            print("MONGO DB IS CONNECTED")
     return db
+
+
+def start_db():
+    """Connect eagerly (long-running processes such as the ingester)"""
+    return get_db()
@@ -0,0 +1,50 @@
+from pymongo import ASCENDING
+
+
+# Latest quote per symbol (one small document per symbol)
+MARKET_DATA = "market_data"
+
+# One document per tick, keyed by (symbol, trading_date, market_time)
+MARKET_TICKS = "market_ticks"
+
+# OHLCV candles per symbol and interval, keyed by (symbol, interval, start)
+MARKET_CANDLES = "market_candles"
+
+# Symbols that traded while the feed was disconnected (ticks possibly missed)
+MARKET_GAPS = "market_gaps"
+
+# Small bookkeeping documents (e.g. the market data version)
+MARKET_META = "market_meta"
+
+
+def ensure_indexes(db) -> None:
+    """
+    Create the indexes the ingestion and query paths rely on.
+    create_index is idempotent, so this is safe to call on every start.
+    """
+    quotes = db[MARKET_DATA]
+    quotes.create_index("symbol", unique=True)
+    # Rankings sort on these fields (see MarketDataQuery)
+    quotes.create_index("relative_variation")
+    quotes.create_index("volume")
+    quotes.create_index("effective_amount")
+    # The market summary only counts the latest session
+    quotes.create_index("trading_date")
+
+    ticks = db[MARKET_TICKS]
+    ticks.create_index(
+        [
+            ("symbol", ASCENDING),
+            ("trading_date", ASCENDING),
+            ("market_time", ASCENDING),
+        ],
+        unique=True,
+    )
+    ticks.create_index([("symbol", ASCENDING), ("timestamp", ASCENDING)])
+
+    db[MARKET_CANDLES].create_index(
+        [("symbol", ASCENDING), ("interval", ASCENDING), ("start", ASCENDING)],
+        unique=True,
+    )
+
+    db[MARKET_GAPS].create_index([("trading_date", ASCENDING), ("symbol", ASCENDING)])
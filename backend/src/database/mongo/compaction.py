@@ -0,0 +1,269 @@
+"""
+Retention for market_ticks: ticks older than a retention window are rolled
+into one daily bar per symbol and trading date, then deleted.
+
+Bars are written to market_candles as the "1d" candles, so
+/market/{symbol}/candles?interval=1d keeps serving compacted days. A bar is
+computed from every tick of its day and stored with compacted=True before
+any tick is deleted. A run that stops while deleting finds the flag on the
+next run and only finishes the deletion, so the bar is never rebuilt from a
+partial day. Re-running over compacted days is a no-op.
+
+Intraday candles (1m, 5m, 1h) follow the same window: those starting before
+the cutoff are deleted, since the daily bar is all that is kept of a day
+once its ticks are gone.
+
+Deletes go in batches of 'batch_size' with a pause between them, so the job
+never holds the collection long enough to slow down the ingester.
+"""
+
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from src.config.time import get_current_time
+from src.ws.candles import INTERVALS
+from .collections import MARKET_CANDLES, MARKET_DATA, MARKET_META, MARKET_TICKS
+
+logger = logging.getLogger(__name__)
+
+# Document in MARKET_META holding the progress of the compaction
+COMPACTION_ID = "tick_compaction"
+
+# Document in MARKET_META holding the tick export checkpoint (src/exports/ticks.py)
+EXPORT_CHECKPOINT_ID = "tick_export"
+
+# Candle intervals deleted past the retention window ("1d" bars are kept)
+INTRADAY_INTERVALS = tuple(interval for interval in INTERVALS if interval != "1d")
+
+_TICK_FIELDS = {
+    "_id": 1,
+    "price": 1,
+    "volume": 1,
+    "effective_amount": 1,
+    "timestamp": 1,
+}
+
+
+def daily_bar(ticks: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    OHLCV bar of one symbol's day.
+
+    BVC sends cumulative daily VOLUMEN and MONTO_EFECTIVO, so the day's volume
+    and amount are the largest totals seen, not a sum over the ticks.
+
+    Args:
+        ticks: Every tick of the day, oldest first
+
+    Returns:
+        The bar, or None if no tick has a price
+    """
+    priced = [tick for tick in ticks if tick.get("price") is not None]
+    if not priced:
+        return None
+    prices = [tick["price"] for tick in priced]
+    return {
+        "open": prices[0],
+        "high": max(prices),
+        "low": min(prices),
+        "close": prices[-1],
+        "volume": max((tick.get("volume") or 0 for tick in ticks), default=0),
+        "effective_amount": max(
+            (tick.get("effective_amount") or 0 for tick in ticks), default=0
+        ),
+        "ticks": len(priced),
+    }
+
+
+def _local_midnight(trading_date: str) -> datetime:
+    """Start of a trading date in the market's time zone"""
+    return datetime.combine(
+        date.fromisoformat(trading_date),
+        datetime.min.time(),
+        tzinfo=get_current_time().tzinfo,
+    )
+
+
+class TickCompactor:
+    """
+    Rolls ticks older than the retention window into daily bars.
+
+    Days are compacted one (symbol, trading_date) at a time, oldest first,
+    found through the unique (symbol, trading_date, market_time) index.
+    """
+
+    def __init__(
+        self,
+        db,
+        retention: timedelta = timedelta(days=30),
+        batch_size: int = 5000,
+        pause: float = 0.1,
+        wait_for_export: bool = True,
+    ):
+        """
+        Args:
+            db: Database holding market_ticks, market_candles and market_meta
+            retention: Age (in trading dates) after which ticks are compacted
+            batch_size: Ticks deleted per batch
+            pause: Seconds to sleep between delete batches
+            wait_for_export: Keep ticks the exporter hasn't written to files
+                yet (only when an export checkpoint exists)
+        """
+        self.db = db
+        self.ticks = db[MARKET_TICKS]
+        self.candles = db[MARKET_CANDLES]
+        self.meta = db[MARKET_META]
+        self.retention = retention
+        self.batch_size = batch_size
+        self.pause = pause
+        self.wait_for_export = wait_for_export
+
+    def cutoff(self) -> str:
+        """Trading dates before this one (YYYY-MM-DD) are compacted"""
+        return (get_current_time().date() - self.retention).isoformat()
+
+    def _export_checkpoint(self):
+        if not self.wait_for_export:
+            return None
+        document = self.meta.find_one({"_id": EXPORT_CHECKPOINT_ID})
+        return document.get("last_id") if document else None
+
+    def _oldest_day(self, symbol: str, cutoff: str, after: str) -> Optional[str]:
+        """Oldest trading date of a symbol in (after, cutoff) that still has ticks"""
+        tick = self.ticks.find_one(
+            {"symbol": symbol, "trading_date": {"$gt": after, "$lt": cutoff}},
+            {"trading_date": 1},
+            sort=[("trading_date", 1), ("market_time", 1)],
+        )
+        return tick["trading_date"] if tick else None
+
+    def run(self, max_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Compact every day older than the cutoff.
+
+        Args:
+            max_days: Stop after this many days (the next run continues)
+
+        Returns:
+            Dictionary with days compacted, ticks deleted, days skipped because
+            they aren't exported yet, intraday candles deleted and the cutoff
+        """
+        cutoff = self.cutoff()
+        exported = self._export_checkpoint()
+        stats = {
+            "days": 0,
+            "deleted": 0,
+            "waiting_for_export": 0,
+            "candles_deleted": 0,
+            "cutoff": cutoff,
+        }
+
+        for symbol in sorted(self.db[MARKET_DATA].distinct("symbol")):
+            stats["candles_deleted"] += self.expire_candles(symbol, cutoff)
+            after = ""
+            while max_days is None or stats["days"] < max_days:
+                trading_date = self._oldest_day(symbol, cutoff, after)
+                if trading_date is None:
+                    break
+                after = trading_date
+                deleted = self.compact_day(symbol, trading_date, exported)
+                if deleted is None:
+                    stats["waiting_for_export"] += 1
+                    continue
+                stats["days"] += 1
+                stats["deleted"] += deleted
+
+        self.meta.update_one(
+            {"_id": COMPACTION_ID},
+            {
+                "$set": {"cutoff": cutoff, "updated_at": datetime.utcnow()},
+                "$inc": {
+                    "days": stats["days"],
+                    "deleted": stats["deleted"],
+                    "candles_deleted": stats["candles_deleted"],
+                },
+            },
+            upsert=True,
+        )
+        if stats["days"]:
+            logger.info(
+                f"Compacted {stats['days']} days, deleted {stats['deleted']} ticks"
+            )
+        return stats
+
+    def compact_day(
+        self, symbol: str, trading_date: str, exported=None
+    ) -> Optional[int]:
+        """
+        Store the daily bar of a symbol's day and delete its ticks.
+
+        Args:
+            symbol: Symbol code
+            trading_date: Trading date as YYYY-MM-DD
+            exported: _id of the last exported tick; days with later ticks are
+                left alone
+
+        Returns:
+            Ticks deleted, or None if the day is waiting for the exporter
+        """
+        key = {"symbol": symbol, "trading_date": trading_date}
+        start = _local_midnight(trading_date)
+        bar_key = {"symbol": symbol, "interval": "1d", "start": start}
+
+        bar = self.candles.find_one(bar_key, {"compacted": 1})
+        if not (bar and bar.get("compacted")):
+            ticks = list(self.ticks.find(key, _TICK_FIELDS).sort("_id", 1))
+            if exported is not None and ticks and ticks[-1]["_id"] > exported:
+                return None
+            values = daily_bar(ticks)
+            if values is not None:
+                # $set, not $inc: the bar replaces whatever the ingester kept
+                self.candles.update_one(
+                    bar_key,
+                    {
+                        "$set": {
+                            **values,
+                            "end": start + timedelta(days=1),
+                            "closed": True,
+                            "compacted": True,
+                        }
+                    },
+                    upsert=True,
+                )
+
+        return self._delete(self.ticks, key)
+
+    def expire_candles(self, symbol: str, cutoff: str) -> int:
+        """
+        Delete a symbol's intraday candles that start before the cutoff.
+
+        Args:
+            symbol: Symbol code
+            cutoff: First trading date kept (YYYY-MM-DD)
+
+        Returns:
+            Candles deleted
+        """
+        before = _local_midnight(cutoff)
+        deleted = 0
+        # One (symbol, interval, start) index range per interval
+        for interval in INTRADAY_INTERVALS:
+            deleted += self._delete(
+                self.candles,
+                {"symbol": symbol, "interval": interval, "start": {"$lt": before}},
+            )
+        return deleted
+
+    def _delete(self, collection, query: Dict[str, Any]) -> int:
+        """Delete the documents matching 'query' in batches. Returns the count"""
+        deleted = 0
+        while True:
+            batch = collection.find(query, {"_id": 1}).limit(self.batch_size)
+            ids = [document["_id"] for document in batch]
+            if not ids:
+                return deleted
+            deleted += collection.delete_many({"_id": {"$in": ids}}).deleted_count
+            if len(ids) < self.batch_size:
+                return deleted
+            time.sleep(self.pause)
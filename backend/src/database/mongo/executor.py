@@ -0,0 +1,83 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Threads that run pymongo calls for async handlers.
+
+    Sized like the connection pool (MONGO_EXECUTOR_WORKERS, defaulting to
+    MONGO_MAX_POOL_SIZE), so a running query never waits for a connection and
+    a burst of requests queues here instead of piling up threads.
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = int(
+                    os.getenv("MONGO_EXECUTOR_WORKERS")
+                    or os.getenv("MONGO_MAX_POOL_SIZE")
+                    or 10
+                )
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="mongo"
+                )
+    return _executor
+
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking database call on the executor without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), partial(func, *args, **kwargs)
+    )
+
+
+def _next_batch(cursor, lock: threading.Lock, size: int) -> List[Any]:
+    with lock:
+        batch = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) >= size:
+                break
+        return batch
+
+
+def _close(cursor, lock: threading.Lock) -> None:
+    # Waits for a batch still being read by a cancelled stream
+    with lock:
+        cursor.close()
+
+
+async def stream_cursor(
+    open_cursor: Callable[[], Any], batch_size: int = 500
+) -> AsyncIterator[List[Any]]:
+    """
+    Documents of a pymongo cursor in batches, each read on the executor.
+
+    Only one batch is held in memory at a time. The cursor is closed on the
+    server when the iteration ends early (e.g. the client went away).
+
+    Args:
+        open_cursor: Returns the cursor (find() or aggregate()); called on the
+            executor too, since aggregate() already runs the first command
+        batch_size: Documents per batch
+    """
+    cursor = await run_db(open_cursor)
+    lock = threading.Lock()
+    try:
+        while True:
+            batch = await run_db(_next_batch, cursor, lock, batch_size)
+            if not batch:
+                return
+            yield batch
+    finally:
+        # Not awaited: this also runs when the stream is cancelled
+        get_executor().submit(_close, cursor, lock)
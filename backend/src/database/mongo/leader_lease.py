@@ -0,0 +1,101 @@
+import os
+import socket
+import uuid
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .collections import MARKET_META
+
+# Document in MARKET_META holding the ingester lease
+LEASE_ID = "ingester_leader"
+
+
+def default_owner() -> str:
+    """Identity of this process: host, pid and a random suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease:
+    """
+    Lease-based leader lock stored in MongoDB.
+
+    The lease document holds its owner and an expiry. A process becomes leader
+    by taking a lease that is free or expired, and stays leader by renewing it
+    before it expires. Expiries are computed with the server clock ($$NOW), so
+    clock skew between replicas doesn't matter. Requires MongoDB 4.2+.
+    """
+
+    def __init__(
+        self,
+        db,
+        ttl: float = 15.0,
+        owner: Optional[str] = None,
+        lease_id: str = LEASE_ID,
+    ):
+        """
+        Args:
+            db: Database holding the MARKET_META collection
+            ttl: Seconds a lease stays valid without renewal
+            owner: Identity of this process (see default_owner)
+            lease_id: _id of the lease document
+        """
+        self.collection = db[MARKET_META]
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+        self.lease_id = lease_id
+
+    def acquire(self, info: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Take the lease if it is free, expired or already ours, and extend it.
+        Renewing is the same call.
+
+        Args:
+            info: Extra fields stored on the lease (e.g. host, state)
+
+        Returns:
+            True if this process holds the lease
+        """
+        fields = {key: {"$literal": value} for key, value in (info or {}).items()}
+        try:
+            document = self.collection.find_one_and_update(
+                {
+                    "_id": self.lease_id,
+                    "$or": [
+                        {"owner": self.owner},
+                        {"$expr": {"$lte": ["$expires_at", "$$NOW"]}},
+                    ],
+                },
+                [
+                    {
+                        "$set": {
+                            **fields,
+                            "acquired_at": {
+                                "$cond": [
+                                    {"$eq": ["$owner", self.owner]},
+                                    "$acquired_at",
+                                    "$$NOW",
+                                ]
+                            },
+                            "owner": self.owner,
+                            "heartbeat_at": "$$NOW",
+                            "expires_at": {"$add": ["$$NOW", int(self.ttl * 1000)]},
+                        }
+                    }
+                ],
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # The lease exists, is not ours and has not expired
+            return False
+        return document is not None and document.get("owner") == self.owner
+
+    def release(self) -> None:
+        """Give the lease up so a standby can take over without waiting for the expiry"""
+        self.collection.delete_one({"_id": self.lease_id, "owner": self.owner})
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The lease document (owner, heartbeat_at, expires_at, ...) or None"""
+        return self.collection.find_one({"_id": self.lease_id})
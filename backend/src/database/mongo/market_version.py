@@ -0,0 +1,26 @@
+from pymongo import ReturnDocument
+
+from .collections import MARKET_META
+
+# Document in MARKET_META holding the version of the market data
+VERSION_ID = "market_data"
+
+
+def bump_market_version(db) -> int:
+    """
+    Increment the market data version. The ingester calls this after every
+    write that changed something, so readers know their snapshots are stale.
+    """
+    document = db[MARKET_META].find_one_and_update(
+        {"_id": VERSION_ID},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return document["version"]
+
+
+def get_market_version(db) -> int:
+    """Current market data version (0 if nothing was written yet)"""
+    document = db[MARKET_META].find_one({"_id": VERSION_ID}, {"version": 1})
+    return document["version"] if document else 0
@@ -0,0 +1,349 @@
+"""
+Incremental daily exports of market_ticks to columnar files on local disk.
+
+Ticks are insert-only, so their _id grows with insertion order. The exporter
+keeps the last exported _id as a checkpoint in market_meta and only reads
+ticks after it (served by the _id index), never rescanning the collection.
+
+Files are partitioned by trading date and symbol:
+
+    <EXPORT_DIR>/ticks/trading_date=2025-10-15/symbol=BNC/part-<checkpoint>.parquet
+
+Every run adds one part per partition it touched. Part names come from the
+checkpoint the batch started at, so a run that crashes before saving the
+checkpoint rewrites the same parts instead of duplicating rows.
+
+Once a trading day is over, the parts of each of its partitions are merged
+into a single part-day file, so a day ends as one file per symbol however
+often the exporter ran. Ticks are unique per (symbol, trading_date,
+market_time), so rows are deduplicated on market_time and a merge
+interrupted before its parts were removed is simply repeated.
+
+Parquet needs pyarrow (pip install pyarrow); without it, or with
+EXPORT_FORMAT=csv, parts are written as CSV.
+"""
+
+import csv
+import glob
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+
+try:
+    from src.config.time import get_current_time
+    from src.database.mongo.collections import MARKET_META, MARKET_TICKS
+except ImportError:
+    from config.time import get_current_time
+    from database.mongo.collections import MARKET_META, MARKET_TICKS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# Document in MARKET_META holding the export checkpoint
+CHECKPOINT_ID = "tick_export"
+
+# Name of the single part a closed trading day's parts are merged into
+DAY_PART = "part-day"
+
+# Exported columns, in file order
+COLUMNS = (
+    "symbol",
+    "trading_date",
+    "market_time",
+    "price",
+    "absolute_variation",
+    "relative_variation",
+    "volume",
+    "effective_amount",
+    "timestamp",
+)
+
+
+def export_dir() -> Path:
+    """Root of the exported files (EXPORT_DIR, default 'exports')"""
+    return Path(os.getenv("EXPORT_DIR") or "exports")
+
+
+def default_format() -> str:
+    """'parquet' when pyarrow is installed, else 'csv' (EXPORT_FORMAT overrides)"""
+    configured = os.getenv("EXPORT_FORMAT")
+    if configured:
+        return configured
+    return "parquet" if pyarrow is not None else "csv"
+
+
+def _parquet_schema():
+    number = pyarrow.float64()
+    return pyarrow.schema(
+        [
+            ("symbol", pyarrow.string()),
+            ("trading_date", pyarrow.string()),
+            ("market_time", pyarrow.string()),
+            ("price", number),
+            ("absolute_variation", number),
+            ("relative_variation", number),
+            ("volume", number),
+            ("effective_amount", number),
+            # pymongo returns naive UTC datetimes
+            ("timestamp", pyarrow.timestamp("ms", tz="UTC")),
+        ]
+    )
+
+
+class TickExporter:
+    """
+    Exports ticks inserted since the last checkpoint.
+
+    Only ticks older than 'lag' are exported, so writes still in flight when
+    a batch is read (which may carry a slightly smaller _id) are picked up by
+    the next run instead of being skipped.
+    """
+
+    def __init__(
+        self,
+        db,
+        root: Optional[Path] = None,
+        file_format: Optional[str] = None,
+        batch_size: int = 50_000,
+        lag: timedelta = timedelta(minutes=1),
+    ):
+        """
+        Args:
+            db: Database holding market_ticks and the checkpoint
+            root: Export directory (defaults to export_dir())
+            file_format: "parquet" or "csv" (defaults to default_format())
+            batch_size: Ticks read and written per batch
+            lag: Minimum age of an exported tick
+        """
+        self.ticks = db[MARKET_TICKS]
+        self.meta = db[MARKET_META]
+        self.root = (root or export_dir()) / "ticks"
+        self.file_format = file_format or default_format()
+        if self.file_format not in ("parquet", "csv"):
+            raise ValueError("file_format must be 'parquet' or 'csv'")
+        if self.file_format == "parquet" and pyarrow is None:
+            raise RuntimeError("Parquet exports need pyarrow (pip install pyarrow)")
+        self.batch_size = batch_size
+        self.lag = lag
+
+    def checkpoint(self) -> Optional[ObjectId]:
+        """_id of the last exported tick (None before the first export)"""
+        document = self.meta.find_one({"_id": CHECKPOINT_ID})
+        return document.get("last_id") if document else None
+
+    def _save_checkpoint(self, last_id: ObjectId, rows: int) -> None:
+        self.meta.update_one(
+            {"_id": CHECKPOINT_ID},
+            {
+                "$set": {"last_id": last_id, "updated_at": datetime.utcnow()},
+                "$inc": {"rows": rows},
+            },
+            upsert=True,
+        )
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Export every tick after the checkpoint, one batch at a time.
+
+        Returns:
+            Dictionary with rows, files and batches written, partitions merged
+            and the checkpoint
+        """
+        last_id = self.checkpoint()
+        cutoff = ObjectId.from_datetime(datetime.utcnow() - self.lag)
+        stats = {"rows": 0, "files": 0, "batches": 0}
+        touched: Set[str] = set()
+
+        while True:
+            query = {"_id": {"$lt": cutoff}}
+            if last_id is not None:
+                query["_id"]["$gt"] = last_id
+            batch = list(self.ticks.find(query).sort("_id", 1).limit(self.batch_size))
+            if not batch:
+                break
+
+            # Named after the checkpoint, so a re-run of this batch overwrites
+            part = str(last_id or "start")
+            stats["files"] += self._write_batch(batch, part, touched)
+            stats["rows"] += len(batch)
+            stats["batches"] += 1
+
+            last_id = batch[-1]["_id"]
+            self._save_checkpoint(last_id, len(batch))
+            if len(batch) < self.batch_size:
+                break
+
+        stats["checkpoint"] = str(last_id) if last_id is not None else None
+        stats["merged"] = self.merge_closed_days(touched)
+        if stats["rows"]:
+            logger.info(
+                f"Exported {stats['rows']} ticks to {stats['files']} "
+                f"{self.file_format} files"
+            )
+        return stats
+
+    def _write_batch(
+        self, batch: List[Dict[str, Any]], part: str, touched: Set[str]
+    ) -> int:
+        """
+        Write a batch as one part per (trading_date, symbol).
+
+        Args:
+            batch: Ticks to write
+            part: Part name (the checkpoint the batch started at)
+            touched: Receives the trading dates written to
+
+        Returns:
+            Number of files written
+        """
+        partitions: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for tick in batch:
+            partitions[(tick.get("trading_date"), tick.get("symbol"))].append(tick)
+
+        for (trading_date, symbol), ticks in partitions.items():
+            directory = self.root / f"trading_date={trading_date}" / f"symbol={symbol}"
+            directory.mkdir(parents=True, exist_ok=True)
+            self._write(directory / f"part-{part}.{self.file_format}", ticks)
+            touched.add(str(trading_date))
+        return len(partitions)
+
+    def _write(self, path: Path, ticks: List[Dict[str, Any]]) -> None:
+        # Written next to the target and renamed, so readers never see half a file
+        temporary = path.with_name(path.name + ".tmp")
+        if self.file_format == "parquet":
+            self._write_parquet(temporary, ticks)
+        else:
+            self._write_csv(temporary, ticks)
+        os.replace(temporary, path)
+
+    def merge_closed_days(self, touched: Iterable[str] = ()) -> int:
+        """
+        Merge the parts of every trading day that is over into one file per
+        partition.
+
+        Days newer than the 'merged_through' date of the checkpoint document
+        are merged, plus older days in 'touched' (late ticks written after
+        their day was merged).
+
+        Args:
+            touched: Trading dates this run wrote to
+
+        Returns:
+            Number of partitions merged
+        """
+        today = get_current_time().date().isoformat()
+        document = self.meta.find_one({"_id": CHECKPOINT_ID}) or {}
+        merged_through = document.get("merged_through") or ""
+
+        dates = {date for date in touched if date < today}
+        if self.root.is_dir():
+            for directory in self.root.glob("trading_date=*"):
+                date = directory.name.split("=", 1)[1]
+                if merged_through < date < today:
+                    dates.add(date)
+
+        merged = 0
+        for date in sorted(dates):
+            for directory in sorted(self.root.glob(f"trading_date={date}/symbol=*")):
+                merged += self._merge_partition(directory)
+        if dates and max(dates) > merged_through:
+            self.meta.update_one(
+                {"_id": CHECKPOINT_ID},
+                {"$set": {"merged_through": max(dates)}},
+                upsert=True,
+            )
+        return merged
+
+    def _merge_partition(self, directory: Path) -> bool:
+        """Merge the parts of one partition into DAY_PART. True if it merged"""
+        parts = sorted(directory.glob(f"part-*.{self.file_format}"))
+        target = directory / f"{DAY_PART}.{self.file_format}"
+        if not parts or parts == [target]:
+            return False
+
+        rows: Dict[Any, Dict[str, Any]] = {}
+        for path in parts:
+            for row in self._read(path):
+                rows[row.get("market_time")] = row
+        ticks = sorted(
+            rows.values(),
+            key=lambda row: (str(row.get("timestamp")), str(row.get("market_time"))),
+        )
+        self._write(target, ticks)
+        for path in parts:
+            if path != target:
+                path.unlink()
+        return True
+
+    def _read(self, path: Path) -> List[Dict[str, Any]]:
+        if self.file_format == "parquet":
+            return pyarrow.parquet.read_table(path).to_pylist()
+        with open(path, newline="", encoding="utf-8") as source:
+            return list(csv.DictReader(source))
+
+    def _write_parquet(self, path: Path, ticks: List[Dict[str, Any]]) -> None:
+        columns = {column: [tick.get(column) for tick in ticks] for column in COLUMNS}
+        for column in ("market_time", "trading_date", "symbol"):
+            columns[column] = [
+                None if value is None else str(value) for value in columns[column]
+            ]
+        table = pyarrow.Table.from_pydict(columns, schema=_parquet_schema())
+        pyarrow.parquet.write_table(table, path, compression="zstd")
+
+    def _write_csv(self, path: Path, ticks: List[Dict[str, Any]]) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as output:
+            writer = csv.writer(output)
+            writer.writerow(COLUMNS)
+            for tick in ticks:
+                row = [tick.get(column) for column in COLUMNS]
+                if isinstance(row[-1], datetime) and row[-1].tzinfo is None:
+                    row[-1] = row[-1].isoformat() + "Z"  # naive UTC from pymongo
+                writer.writerow(row)
+
+
+def list_exports(
+    trading_date: Optional[str] = None,
+    symbol: Optional[str] = None,
+    root: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Exported tick files, relative to the export directory.
+
+    Args:
+        trading_date: Only files of this trading date (YYYY-MM-DD)
+        symbol: Only files of this symbol
+        root: Export directory (defaults to export_dir())
+
+    Returns:
+        List of {"path", "size", "modified"}, sorted by path
+    """
+    root = root or export_dir()
+    if not root.is_dir():
+        return []
+    pattern = (
+        f"ticks/trading_date={glob.escape(trading_date) if trading_date else '*'}"
+        f"/symbol={glob.escape(symbol.upper()) if symbol else '*'}/part-*"
+    )
+    files = []
+    for path in sorted(root.glob(pattern)):
+        if path.suffix not in (".parquet", ".csv"):
+            continue
+        status = path.stat()
+        files.append(
+            {
+                "path": path.relative_to(root).as_posix(),
+                "size": status.st_size,
+                "modified": datetime.utcfromtimestamp(status.st_mtime),
+            }
+        )
+    return files
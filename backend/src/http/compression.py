@@ -0,0 +1,30 @@
+from typing import Iterable
+
+from starlette.middleware.gzip import GZipMiddleware
+
+
+class SelectiveGZipMiddleware:
+    """
+    GZipMiddleware for every request except those under 'exclude_paths'.
+
+    Excluded responses pass through untouched, e.g. file downloads answering
+    Range requests: their byte ranges address the stored file, so they must
+    not be re-encoded.
+    """
+
+    def __init__(self, app, exclude_paths: Iterable[str] = (), **options):
+        """
+        Args:
+            app: ASGI app to wrap
+            exclude_paths: Path prefixes that are never compressed
+            options: GZipMiddleware options (minimum_size, compresslevel)
+        """
+        self.app = app
+        self.gzip = GZipMiddleware(app, **options)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
@@ -0,0 +1,31 @@
+from typing import Optional
+
+from fastapi.responses import FileResponse
+from nest.core import Controller, Get
+from .exports_service import ExportsService
+
+MEDIA_TYPES = {".parquet": "application/vnd.apache.parquet", ".csv": "text/csv"}
+
+
+@Controller("/exports")
+class ExportsController:
+    def __init__(self, service: ExportsService):
+        self.service = service
+
+    @Get("/")
+    def list_exports(
+        self, trading_date: Optional[str] = None, symbol: Optional[str] = None
+    ):
+        return self.service.list_files(trading_date, symbol)
+
+    @Get("/files/{path:path}")
+    def download_export(self, path: str):
+        # FileResponse answers Range requests (206) and sets ETag/Last-Modified
+        target = self.service.resolve(path)
+        return FileResponse(
+            target,
+            media_type=MEDIA_TYPES[target.suffix],
+            filename=target.name,
+            # Not compressed by the app (see SelectiveGZipMiddleware)
+            headers={"Cache-Control": "public, max-age=3600"},
+        )
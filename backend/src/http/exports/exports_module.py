@@ -0,0 +1,8 @@
+from nest.core import Module
+from .exports_controller import ExportsController
+from .exports_service import ExportsService
+
+
+@Module(imports=[], controllers=[ExportsController], providers=[ExportsService])
+class ExportsModule:
+    pass
@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+from nest.core import Injectable
+from src.exports.ticks import export_dir, list_exports
+
+
+@Injectable
+class ExportsService:
+    def list_files(
+        self, trading_date: Optional[str] = None, symbol: Optional[str] = None
+    ):
+        """Exported tick files, optionally of one trading date and/or symbol"""
+        files = list_exports(trading_date=trading_date, symbol=symbol)
+        for file in files:
+            file["url"] = f"/exports/files/{file['path']}"
+        return {"data": files, "count": len(files)}
+
+    def resolve(self, path: str) -> Path:
+        """
+        Absolute path of an exported file.
+
+        Raises:
+            HTTPException: 404 if the path is outside the export directory or missing
+        """
+        root = export_dir().resolve()
+        target = (root / path).resolve()
+        if root not in target.parents or target.suffix not in (".parquet", ".csv"):
+            raise HTTPException(404, "Export not found")
+        if not target.is_file():
+            raise HTTPException(404, "Export not found")
+        return target
@@ -0,0 +1,93 @@
+from typing import List, Sequence
+
+# Supported downsampling methods
+METHODS = ("lttb", "minmax")
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets: picks 'threshold' points that keep the
+    visual shape of the series (peaks, troughs and trend changes).
+
+    Args:
+        xs: X values (e.g. epoch seconds), ascending
+        ys: Y values, same length as xs
+        threshold: Number of points to keep (at least 3)
+
+    Returns:
+        Indexes of the kept points, ascending; the first and last are always kept
+    """
+    size = len(xs)
+    if threshold >= size or threshold < 3:
+        return list(range(size))
+
+    selected = [0]
+    # Every bucket but the first and last (one point each) spans 'every' points
+    every = (size - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        # Average of the next bucket, the third corner of the triangle
+        next_start = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, size)
+        count = next_end - next_start
+        average_x = sum(xs[next_start:next_end]) / count
+        average_y = sum(ys[next_start:next_end]) / count
+
+        # Point of this bucket making the largest triangle with the previous pick
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        previous_x, previous_y = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs(
+                (previous_x - average_x) * (ys[index] - previous_y)
+                - (previous_x - xs[index]) * (average_y - previous_y)
+            )
+            if area > best_area:
+                best, best_area = index, area
+
+        selected.append(best)
+        previous = best
+
+    selected.append(size - 1)
+    return selected
+
+
+def min_max(ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Min/max bucketing: splits the series into threshold / 2 buckets and keeps
+    the lowest and highest point of each, so no extreme is ever dropped.
+
+    Args:
+        ys: Y values
+        threshold: Maximum number of points to keep (at least 2)
+
+    Returns:
+        At most 'threshold' indexes of kept points, ascending; the first and
+        last are always kept
+    """
+    size = len(ys)
+    if threshold >= size or threshold < 2:
+        return list(range(size))
+
+    selected = {0, size - 1}
+    buckets = (threshold - 2) // 2
+    if not buckets:
+        if threshold == 3:
+            # Room for a single extreme: the one furthest from the end points
+            middle = (ys[0] + ys[-1]) / 2
+            selected.add(
+                max(range(1, size - 1), key=lambda index: abs(ys[index] - middle))
+            )
+        return sorted(selected)
+
+    every = (size - 2) / buckets
+    for bucket in range(buckets):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        if start >= end:
+            continue
+        indexes = range(start, end)
+        selected.add(min(indexes, key=ys.__getitem__))
+        selected.add(max(indexes, key=ys.__getitem__))
+    return sorted(selected)
@@ -0,0 +1,169 @@
+"""
+Negotiated representations of cached market snapshots.
+
+A snapshot is serialized to JSON once per market data version. Other media
+types (MessagePack, Arrow IPC) and compressed copies (gzip, brotli) are built
+the first time a client asks for them and kept on the snapshot, so every
+later request for the same version is served without re-encoding.
+
+MessagePack and brotli are in requirements.txt; Arrow needs pyarrow, which
+is optional (pip install pyarrow). Clients asking for a format that isn't
+installed get JSON.
+"""
+
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from .snapshot_cache import Snapshot, _default
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1000
+
+# Media types that can be produced, in order of preference on ties
+FORMATS = tuple(
+    media_type
+    for media_type, module in ((JSON, json), (MSGPACK, msgpack), (ARROW, pyarrow))
+    if module is not None
+)
+
+# Content codings that can be produced, in order of preference on ties
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Short names used in variant ETags
+_TAGS = {JSON: "json", MSGPACK: "msgpack", ARROW: "arrow"}
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One representation of a snapshot"""
+
+    body: bytes
+    media_type: str
+    encoding: Optional[str]
+    etag: str
+
+
+def _preferences(header: str) -> List[Tuple[str, float]]:
+    """Values of an Accept-style header with their q weights, best first"""
+    values = []
+    for part in header.split(","):
+        value, _, parameters = part.strip().partition(";")
+        if not value:
+            continue
+        weight = 1.0
+        for parameter in parameters.split(";"):
+            name, _, number = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    weight = float(number)
+                except ValueError:
+                    weight = 0.0
+        values.append((value.strip().lower(), weight))
+    # sorted() is stable, so equal weights keep the client's order
+    return sorted(values, key=lambda item: item[1], reverse=True)
+
+
+def negotiate_format(accept: str) -> str:
+    """Best installed media type for an Accept header (JSON by default)"""
+    for media_type, weight in _preferences(accept):
+        if weight <= 0:
+            continue
+        if media_type in FORMATS:
+            return media_type
+        if media_type in ("*/*", "application/*"):
+            return JSON
+    return JSON
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported content coding for an Accept-Encoding header, or None"""
+    weights = dict(_preferences(accept_encoding))
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _arrow_table(payload: Any):
+    """Columnar table of the payload's 'data'; the other keys go in the metadata"""
+    data = payload.get("data")
+    rows = data if isinstance(data, list) else [data] if data else []
+    metadata = {
+        key: json.dumps(value, default=_default)
+        for key, value in payload.items()
+        if key != "data"
+    }
+    return pyarrow.Table.from_pylist(rows, metadata=metadata or None)
+
+
+def encode(payload: Any, media_type: str) -> bytes:
+    """Serialize a snapshot payload as MessagePack or Arrow IPC (stream format)"""
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, default=_default, use_bin_type=True)
+    if media_type == ARROW:
+        table = _arrow_table(payload)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    raise ValueError(f"Unsupported media type: {media_type}")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def variant(snapshot: Snapshot, accept: str, accept_encoding: str) -> Variant:
+    """
+    Representation of a snapshot for a request's Accept and Accept-Encoding
+    headers, encoded and compressed once per snapshot.
+    """
+    media_type = negotiate_format(accept)
+    encoding = negotiate_encoding(accept_encoding)
+    key = (media_type, encoding)
+    cached = snapshot.variants.get(key)
+    if cached is not None:
+        return cached
+
+    body = snapshot.body if media_type == JSON else encode(snapshot.payload, media_type)
+    if encoding is not None and len(body) >= MIN_COMPRESS_SIZE:
+        body = compress(body, encoding)
+    else:
+        encoding = None
+
+    etag = snapshot.etag
+    if media_type != JSON or encoding is not None:
+        # Each representation needs its own validator
+        tags = [_TAGS[media_type]] + ([encoding] if encoding else [])
+        etag = f'{snapshot.etag[:-1]}-{"-".join(tags)}"'
+
+    result = Variant(body=body, media_type=media_type, encoding=encoding, etag=etag)
+    snapshot.variants[key] = result
+    return result
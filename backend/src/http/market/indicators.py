@@ -0,0 +1,388 @@
+"""
+Technical indicators per symbol: SMA, EMA, RSI, VWAP and rolling volatility.
+
+IndicatorState holds the running values of one symbol and takes each new
+tick in O(1): ring buffers with running sums for the windowed indicators,
+recursive updates for EMA and RSI, and the day's cumulative totals for VWAP.
+States are seeded from the stored ticks with vectorized NumPy code, then kept
+current by IndicatorEngine, which only reads ticks inserted since its last
+refresh: by _id, with the tick exporter's lag so writes still in flight are
+not skipped. Ticks are applied in timestamp order, as they are seeded.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from os import getenv
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+
+from src.database.mongo.collections import MARKET_DATA, MARKET_TICKS
+
+SMA_WINDOW = 20
+EMA_SPAN = 20
+RSI_PERIOD = 14
+VOLATILITY_WINDOW = 20
+
+EMA_ALPHA = 2.0 / (EMA_SPAN + 1)
+
+# Ticks per symbol used to seed the states (enough for the EMA to converge)
+LOOKBACK = 500
+
+# Updates between exact recomputations of the running sums (float drift)
+RESYNC_EVERY = 1000
+
+# New ticks read per query
+BATCH_SIZE = 10_000
+
+_TICK_FIELDS = {
+    "_id": 1,
+    "symbol": 1,
+    "price": 1,
+    "volume": 1,
+    "effective_amount": 1,
+    "trading_date": 1,
+    "timestamp": 1,
+}
+
+
+def ema_last(values: np.ndarray, alpha: float, seed: float) -> float:
+    """
+    Last value of y_t = y_{t-1} + alpha * (x_t - y_{t-1}) over 'values',
+    starting from y = seed, computed as one weighted sum.
+    """
+    size = len(values)
+    if size == 0:
+        return seed
+    decay = 1.0 - alpha
+    weights = alpha * decay ** np.arange(size - 1, -1, -1, dtype=float)
+    return float(weights @ values + decay**size * seed)
+
+
+class IndicatorState:
+    """Running indicators of one symbol"""
+
+    __slots__ = (
+        "count",
+        "last_price",
+        "ema",
+        "vwap",
+        "trading_date",
+        "timestamp",
+        "_prices",
+        "_price_sum",
+        "_returns",
+        "_return_count",
+        "_return_sum",
+        "_return_squares",
+        "_changes",
+        "_gain",
+        "_loss",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.last_price: Optional[float] = None
+        self.ema: Optional[float] = None
+        self.vwap: Optional[float] = None
+        self.trading_date: Optional[str] = None
+        self.timestamp = None
+        # Slot i % SMA_WINDOW holds price number i
+        self._prices = np.zeros(SMA_WINDOW)
+        self._price_sum = 0.0
+        # Slot i % VOLATILITY_WINDOW holds log return number i
+        self._returns = np.zeros(VOLATILITY_WINDOW)
+        self._return_count = 0
+        self._return_sum = 0.0
+        self._return_squares = 0.0
+        # Wilder averages of gains and losses over RSI_PERIOD price changes
+        self._changes = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(
+        self,
+        price: float,
+        volume: Optional[float],
+        amount: Optional[float],
+        trading_date: Optional[str],
+        timestamp: Any = None,
+    ) -> None:
+        """Add one tick, in constant time"""
+        slot = self.count % SMA_WINDOW
+        self._price_sum += price - self._prices[slot]
+        self._prices[slot] = price
+
+        self.ema = (
+            price if self.ema is None else self.ema + EMA_ALPHA * (price - self.ema)
+        )
+
+        previous = self.last_price
+        if previous is not None:
+            change = price - previous
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self._changes += 1
+            if self._changes <= RSI_PERIOD:
+                # Seed: plain average of the first RSI_PERIOD changes
+                self._gain += gain / RSI_PERIOD
+                self._loss += loss / RSI_PERIOD
+            else:
+                self._gain += (gain - self._gain) / RSI_PERIOD
+                self._loss += (loss - self._loss) / RSI_PERIOD
+
+            if previous > 0 and price > 0:
+                value = math.log(price / previous)
+                slot = self._return_count % VOLATILITY_WINDOW
+                old = self._returns[slot]
+                self._return_sum += value - old
+                self._return_squares += value * value - old * old
+                self._returns[slot] = value
+                self._return_count += 1
+
+        # BVC sends the day's cumulative volume and amount, so their ratio is the VWAP
+        if trading_date != self.trading_date:
+            self.vwap = None
+            self.trading_date = trading_date
+        if volume and amount:
+            self.vwap = amount / volume
+
+        self.last_price = price
+        self.timestamp = timestamp
+        self.count += 1
+        if self.count % RESYNC_EVERY == 0:
+            self._price_sum = float(self._prices.sum())
+            self._return_sum = float(self._returns.sum())
+            self._return_squares = float(self._returns @ self._returns)
+
+    @classmethod
+    def from_ticks(cls, ticks: List[Dict[str, Any]]) -> "IndicatorState":
+        """
+        State after 'ticks' (oldest first), computed with array operations.
+        Equivalent to calling update() for every tick.
+        """
+        state = cls()
+        size = len(ticks)
+        if not size:
+            return state
+
+        prices = np.fromiter((tick["price"] for tick in ticks), float, size)
+        state.count = size
+        state.last_price = float(prices[-1])
+        state.timestamp = ticks[-1].get("timestamp")
+
+        kept = min(size, SMA_WINDOW)
+        state._prices[np.arange(size - kept, size) % SMA_WINDOW] = prices[-kept:]
+        state._price_sum = float(prices[-kept:].sum())
+
+        state.ema = ema_last(prices[1:], EMA_ALPHA, float(prices[0]))
+
+        changes = np.diff(prices)
+        gains = np.clip(changes, 0.0, None)
+        losses = np.clip(-changes, 0.0, None)
+        state._changes = len(changes)
+        seed = min(len(changes), RSI_PERIOD)
+        state._gain = ema_last(
+            gains[seed:], 1.0 / RSI_PERIOD, float(gains[:seed].sum()) / RSI_PERIOD
+        )
+        state._loss = ema_last(
+            losses[seed:], 1.0 / RSI_PERIOD, float(losses[:seed].sum()) / RSI_PERIOD
+        )
+
+        valid = (prices[:-1] > 0) & (prices[1:] > 0)
+        returns = np.log(prices[1:][valid] / prices[:-1][valid])
+        count = len(returns)
+        kept = min(count, VOLATILITY_WINDOW)
+        if kept:
+            window = returns[-kept:]
+            state._returns[np.arange(count - kept, count) % VOLATILITY_WINDOW] = window
+            state._return_sum = float(window.sum())
+            state._return_squares = float(window @ window)
+        state._return_count = count
+
+        state.trading_date = ticks[-1].get("trading_date")
+        for tick in reversed(ticks):
+            if tick.get("trading_date") != state.trading_date:
+                break
+            if tick.get("volume") and tick.get("effective_amount"):
+                state.vwap = tick["effective_amount"] / tick["volume"]
+                break
+        return state
+
+    def values(self) -> Dict[str, Any]:
+        """Current indicators (None until enough ticks were seen)"""
+        sma = self._price_sum / SMA_WINDOW if self.count >= SMA_WINDOW else None
+
+        rsi = None
+        if self._changes >= RSI_PERIOD:
+            if self._loss == 0:
+                rsi = 100.0 if self._gain > 0 else 50.0
+            else:
+                rsi = 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+        volatility = None
+        count = min(self._return_count, VOLATILITY_WINDOW)
+        if count >= 2:
+            variance = (self._return_squares - self._return_sum**2 / count) / (
+                count - 1
+            )
+            volatility = math.sqrt(max(variance, 0.0))
+
+        return {
+            "price": self.last_price,
+            "sma": sma,
+            "ema": self.ema,
+            "rsi": rsi,
+            "vwap": self.vwap,
+            "volatility": volatility,
+            "ticks": self.count,
+            "trading_date": self.trading_date,
+            "timestamp": self.timestamp,
+        }
+
+
+class IndicatorEngine:
+    """
+    Indicator states of every symbol, shared by the requests of this process.
+
+    The first request seeds every symbol from its last LOOKBACK ticks. Later
+    requests apply the ticks inserted since the previous refresh, at most once
+    every 'refresh_interval' seconds, each in O(1).
+
+    The server assigns tick _ids and the ingester's writers can commit them
+    out of order, so only ticks older than 'lag' are read: one committed late
+    with a smaller _id is still ahead of the checkpoint.
+    """
+
+    def __init__(
+        self,
+        lookback: int = LOOKBACK,
+        refresh_interval: Optional[float] = None,
+        lag: Optional[timedelta] = None,
+    ):
+        """
+        Args:
+            lookback: Ticks per symbol used to seed the states
+            refresh_interval: Seconds between reads of new ticks
+                (INDICATORS_REFRESH_INTERVAL, default 1.0)
+            lag: Minimum age of an applied tick (INDICATORS_LAG seconds,
+                default 5)
+        """
+        self.lookback = lookback
+        self.refresh_interval = (
+            refresh_interval
+            if refresh_interval is not None
+            else float(getenv("INDICATORS_REFRESH_INTERVAL") or 1.0)
+        )
+        self.lag = (
+            lag
+            if lag is not None
+            else timedelta(seconds=float(getenv("INDICATORS_LAG") or 5))
+        )
+        self._states: Dict[str, IndicatorState] = {}
+        self._checkpoint = None  # _id of the last applied tick
+        self._loaded = False
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _cutoff(self) -> ObjectId:
+        """Ticks with a smaller _id are old enough to be applied"""
+        return ObjectId.from_datetime(datetime.utcnow() - self.lag)
+
+    @staticmethod
+    def _tick_order(tick: Dict[str, Any]):
+        return tick["timestamp"], tick["_id"]
+
+    def _seed(self, db) -> None:
+        cutoff = self._cutoff()
+        latest = db[MARKET_TICKS].find_one(
+            {"_id": {"$lt": cutoff}}, {"_id": 1}, sort=[("_id", -1)]
+        )
+        self._checkpoint = latest["_id"] if latest else None
+        if self._checkpoint is None:
+            return
+        for symbol in db[MARKET_DATA].distinct("symbol"):
+            cursor = (
+                db[MARKET_TICKS]
+                .find(
+                    {
+                        "symbol": symbol,
+                        "_id": {"$lte": self._checkpoint},
+                        "price": {"$ne": None},
+                    },
+                    _TICK_FIELDS,
+                )
+                .sort("timestamp", -1)
+                .limit(self.lookback)
+            )
+            ticks = sorted(cursor, key=self._tick_order)
+            if ticks:
+                self._states[symbol] = IndicatorState.from_ticks(ticks)
+
+    def _apply_new_ticks(self, db) -> None:
+        cutoff = self._cutoff()
+        while True:
+            query = {"price": {"$ne": None}, "_id": {"$lt": cutoff}}
+            if self._checkpoint is not None:
+                query["_id"]["$gt"] = self._checkpoint
+            batch = list(
+                db[MARKET_TICKS]
+                .find(query, _TICK_FIELDS)
+                .sort("_id", 1)
+                .limit(BATCH_SIZE)
+            )
+            if batch:
+                self._checkpoint = batch[-1]["_id"]
+            for tick in sorted(batch, key=self._tick_order):
+                state = self._states.get(tick["symbol"])
+                if state is None:
+                    state = self._states[tick["symbol"]] = IndicatorState()
+                state.update(
+                    tick["price"],
+                    tick.get("volume"),
+                    tick.get("effective_amount"),
+                    tick.get("trading_date"),
+                    tick.get("timestamp"),
+                )
+            if len(batch) < BATCH_SIZE:
+                return
+
+    def _ensure_current(self, db) -> None:
+        now = time.monotonic()
+        if not self._loaded:
+            self._seed(db)
+            self._loaded = True
+            self._refreshed_at = now
+        elif now - self._refreshed_at >= self.refresh_interval:
+            self._apply_new_ticks(db)
+            self._refreshed_at = now
+
+    def get(self, db, symbol: str) -> Optional[Dict[str, Any]]:
+        """Indicators of one symbol, or None if it has no ticks. Blocking"""
+        with self._lock:
+            self._ensure_current(db)
+            state = self._states.get(symbol)
+            return {"symbol": symbol, **state.values()} if state else None
+
+    def board(self, db) -> List[Dict[str, Any]]:
+        """Indicators of every symbol, ordered by symbol. Blocking"""
+        with self._lock:
+            self._ensure_current(db)
+            return [
+                {"symbol": symbol, **self._states[symbol].values()}
+                for symbol in sorted(self._states)
+            ]
+
+
+def parameters() -> Dict[str, int]:
+    return {
+        "sma_window": SMA_WINDOW,
+        "ema_span": EMA_SPAN,
+        "rsi_period": RSI_PERIOD,
+        "volatility_window": VOLATILITY_WINDOW,
+    }
+
+
+indicator_engine = IndicatorEngine()
@@ -1,5 +1,52 @@
+from datetime import datetime
+from typing import Optional, Set
+
+from fastapi import Query, Request, Response
+from fastapi.responses import StreamingResponse
 from nest.core import Controller, Get
+from .encodings import variant
 from .market_service import MarketService
+from .snapshot_cache import Snapshot
+
+NDJSON = "application/x-ndjson"
+
+
+def snapshot_response(request: Request, snapshot: Snapshot) -> Response:
+    """
+    Send a cached snapshot in the format and compression the client accepts,
+    or 304 if the client already has it
+    """
+    selected = variant(
+        snapshot,
+        request.headers.get("accept", ""),
+        request.headers.get("accept-encoding", ""),
+    )
+    headers = {
+        "ETag": selected.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept, Accept-Encoding",
+    }
+    if selected.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if selected.encoding is not None:
+        headers["Content-Encoding"] = selected.encoding
+    return Response(
+        content=selected.body, media_type=selected.media_type, headers=headers
+    )
+
+
+def wants_ndjson(request: Request, format: Optional[str]) -> bool:
+    """NDJSON was asked for with ?format=ndjson or the Accept header"""
+    if format is not None:
+        return format == "ndjson"
+    return NDJSON in request.headers.get("accept", "")
+
+
+def parse_symbols(symbols: Optional[str]) -> Optional[Set[str]]:
+    """Symbol codes of a comma-separated ?symbols= list (None when not given)"""
+    if not symbols:
+        return None
+    return {symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()}
 
 
 @Controller("/market")
@@ -8,5 +55,123 @@ class MarketController:
         self.service = service
 
     @Get("/")
-    def get_market_data(self):
-        return self.service.get_all_symbols()
+    async def get_market_data(
+        self,
+        request: Request,
+        fields: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        history: bool = False,
+        history_limit: Optional[int] = None,
+        format: Optional[str] = None,
+    ):
+        if wants_ndjson(request, format):
+            # Streamed as it is read from the cursor
+            return StreamingResponse(
+                self.service.stream_all_symbols(
+                    request,
+                    fields=fields,
+                    limit=limit,
+                    after=after,
+                    include_history=history,
+                    history_limit=history_limit,
+                ),
+                media_type=NDJSON,
+            )
+
+        snapshot = await self.service.get_market_snapshot(
+            fields=fields,
+            limit=limit,
+            after=after,
+            include_history=history,
+            history_limit=history_limit,
+        )
+        return snapshot_response(request, snapshot)
+
+    @Get("/summary")
+    async def get_summary(self, request: Request):
+        return snapshot_response(request, await self.service.get_summary())
+
+    @Get("/top/{ranking}")
+    async def get_ranking(self, request: Request, ranking: str, limit: int = 10):
+        snapshot = await self.service.get_ranking(ranking, limit)
+        return snapshot_response(request, snapshot)
+
+    @Get("/search")
+    async def search_symbols(self, q: str, limit: int = 20):
+        return await self.service.search_symbols(q, limit)
+
+    @Get("/stream")
+    async def stream_market_data(self, request: Request, symbols: Optional[str] = None):
+        return StreamingResponse(
+            self.service.stream_changes(request, parse_symbols(symbols)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @Get("/history")
+    async def get_board_history(
+        self,
+        request: Request,
+        symbols: Optional[str] = None,
+        start: Optional[datetime] = Query(None, alias="from"),
+        end: Optional[datetime] = Query(None, alias="to"),
+        points: int = 200,
+        method: str = "lttb",
+    ):
+        snapshot = await self.service.get_board_history(
+            parse_symbols(symbols), start=start, end=end, points=points, method=method
+        )
+        return snapshot_response(request, snapshot)
+
+    @Get("/indicators")
+    async def get_board_indicators(self):
+        return await self.service.get_board_indicators()
+
+    @Get("/{symbol}/indicators")
+    async def get_indicators(self, symbol: str):
+        return await self.service.get_indicators(symbol)
+
+    @Get("/{symbol}/candles")
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str = "1m",
+        start: Optional[datetime] = Query(None, alias="from"),
+        end: Optional[datetime] = Query(None, alias="to"),
+    ):
+        return await self.service.get_candles(
+            symbol, interval=interval, start=start, end=end
+        )
+
+    @Get("/{symbol}/history")
+    async def get_history(
+        self,
+        request: Request,
+        symbol: str,
+        start: Optional[datetime] = Query(None, alias="from"),
+        end: Optional[datetime] = Query(None, alias="to"),
+        points: int = 500,
+        method: str = "lttb",
+    ):
+        snapshot = await self.service.get_history(
+            symbol, start=start, end=end, points=points, method=method
+        )
+        return snapshot_response(request, snapshot)
+
+    @Get("/{symbol}/ticks")
+    async def stream_ticks(
+        self,
+        request: Request,
+        symbol: str,
+        start: Optional[datetime] = Query(None, alias="from"),
+        end: Optional[datetime] = Query(None, alias="to"),
+    ):
+        return StreamingResponse(
+            self.service.stream_ticks(request, symbol, start=start, end=end),
+            media_type=NDJSON,
+        )
+
+    @Get("/{symbol}/latest")
+    async def get_latest_ticks(self, symbol: str, limit: int = 1):
+        return await self.service.get_latest_ticks(symbol, limit)
@@ -1,10 +1,620 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
 from nest.core import Injectable
-from src.database.mongo import db
+from src.config.time import get_current_time
+from src.database.mongo import get_db
+from src.database.mongo.collections import MARKET_CANDLES, MARKET_DATA, MARKET_TICKS
+from src.database.mongo.executor import run_db, stream_cursor
+from src.database.mongo.market_version import get_market_version
+from src.ws.broadcast import QuotePoller, market_broadcaster
+from src.ws.candles import INTERVALS
+from src.ws.market_data_utils import MarketDataQuery
+from .downsample import METHODS, lttb, min_max
+from .snapshot_cache import Snapshot, SnapshotCache, serialize
+
+# Fields of the latest-quote view that clients can select
+QUOTE_FIELDS = (
+    "symbol",
+    "description",
+    "price",
+    "absolute_variation",
+    "relative_variation",
+    "volume",
+    "effective_amount",
+    "market_time",
+    "trading_date",
+    "timestamp",
+)
+
+MAX_PAGE_SIZE = 500
+
+MAX_CANDLES = 1000
+
+DEFAULT_HISTORY_POINTS = 500
+
+MAX_HISTORY_POINTS = 5000
+
+# Ticks per symbol returned by /market/history
+DEFAULT_BOARD_HISTORY_POINTS = 200
+
+MAX_BOARD_HISTORY_POINTS = 1000
+
+# Window of /history when no 'from' is given
+DEFAULT_HISTORY_WINDOW = timedelta(days=30)
+
+# Most documents /history reads; larger windows are read from the candles
+MAX_HISTORY_SCAN = 20_000
+
+# Candle fields sent by /history when it reads candles
+CANDLE_POINT_PROJECTION = {
+    "_id": 0,
+    "start": 1,
+    "open": 1,
+    "high": 1,
+    "low": 1,
+    "close": 1,
+    "volume": 1,
+    "effective_amount": 1,
+}
+
+# Tick fields sent by the history endpoints
+TICK_PROJECTION = {"_id": 0, "symbol": 0, "trading_date": 0}
+
+# Ranking name -> MarketDataQuery method
+RANKINGS = {
+    "gainers": "get_top_gainers",
+    "losers": "get_top_losers",
+    "traded": "get_most_traded",
+    "value": "get_highest_value",
+}
+
+MAX_RANKING_SIZE = 100
+
+# Documents per NDJSON chunk (and per cursor batch)
+STREAM_BATCH_SIZE = 500
+
+# Seconds between keep-alive comments on idle streams
+STREAM_HEARTBEAT = 15.0
+
+# Serialized /market responses, shared by every request of this process
+snapshots = SnapshotCache(lambda: get_market_version(get_db()))
+
+# Serialized /history responses, kept apart so they don't evict the above
+history_snapshots = SnapshotCache(lambda: get_market_version(get_db()), max_entries=256)
+
+# Feeds market_broadcaster from the database for /market/stream
+quote_poller = QuotePoller(
+    market_broadcaster,
+    lambda: get_market_version(get_db()),
+    lambda: list(
+        get_db()[MARKET_DATA].find(
+            {}, {"_id": 0, **{field: 1 for field in QUOTE_FIELDS}}
+        )
+    ),
+)
+
+
+async def ndjson_lines(
+    request: Request, open_cursor: Callable[[], Any]
+) -> AsyncIterator[bytes]:
+    """
+    One JSON document per line, read from the cursor a batch at a time, so
+    memory stays flat whatever the size of the result. Stops as soon as the
+    client disconnects (the cursor is then closed on the server).
+    """
+    async for batch in stream_cursor(open_cursor, STREAM_BATCH_SIZE):
+        if await request.is_disconnected():
+            return
+        yield b"".join(serialize(document) + b"\n" for document in batch)
 
 
 @Injectable
 class MarketService:
-    def get_all_symbols(self):
-        collection = db["market_data"]
-        symbols = list(collection.find({}, {"_id": 0}))
-        return {"data": symbols, "count": len(symbols)}
+    async def get_market_snapshot(
+        self,
+        fields: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        include_history: bool = False,
+        history_limit: Optional[int] = None,
+    ) -> Snapshot:
+        """
+        Serialized get_all_symbols response, rebuilt only when the ingester
+        has written new data since it was cached.
+        """
+        key = (fields, limit, after, include_history, history_limit)
+        return await run_db(
+            snapshots.get,
+            key,
+            lambda: self.get_all_symbols(
+                fields=fields,
+                limit=limit,
+                after=after,
+                include_history=include_history,
+                history_limit=history_limit,
+            ),
+        )
+
+    async def stream_changes(
+        self, request: Request, symbols: Optional[Set[str]] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Server-Sent Events stream of market changes.
+
+        Starts with a 'snapshot' event holding the latest quote of every symbol,
+        then sends 'changes' events with only the fields that changed. Changes
+        come from market_broadcaster, fed by the ingester when it runs in this
+        process and by quote_poller (one read per market data version) in any
+        case, so any number of clients share the same reads.
+
+        Args:
+            request: Incoming request, used to stop when the client disconnects
+            symbols: Only stream these symbols (all symbols if None)
+        """
+        subscription = market_broadcaster.subscribe(symbols)
+        try:
+            await quote_poller.start()
+            yield await self._stream_snapshot(symbols)
+
+            while not await request.is_disconnected():
+                changes = await subscription.next(timeout=STREAM_HEARTBEAT)
+                if changes:
+                    yield b"event: changes\ndata: " + serialize(changes) + b"\n\n"
+                else:
+                    yield b": keep-alive\n\n"
+        finally:
+            market_broadcaster.unsubscribe(subscription)
+
+    async def _stream_snapshot(self, symbols: Optional[Set[str]]) -> bytes:
+        """Initial 'snapshot' event, from memory once the broadcaster holds quotes"""
+        quotes = market_broadcaster.snapshot(symbols)
+        if quotes:
+            body = serialize({"data": quotes, "count": len(quotes)})
+        else:
+            body = (await self.get_market_snapshot()).body
+            if symbols is not None:
+                quotes = [
+                    quote
+                    for quote in json.loads(body)["data"]
+                    if quote["symbol"] in symbols
+                ]
+                body = serialize({"data": quotes, "count": len(quotes)})
+        return b"event: snapshot\ndata: " + body + b"\n\n"
+
+    def get_all_symbols(
+        self,
+        fields: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        include_history: bool = False,
+        history_limit: Optional[int] = None,
+    ):
+        """
+        Latest quote of every symbol, ordered by symbol.
+
+        Args:
+            fields: Comma-separated quote fields to return ('symbol' is always included)
+            limit: Page size; when set, 'next_cursor' is returned for the next page
+            after: Cursor from a previous page (the last symbol it returned)
+            include_history: Include every tick of each symbol as 'history'
+            history_limit: Include only the N most recent ticks as 'history'
+        """
+        pipeline = self._all_symbols_pipeline(
+            fields, limit, after, include_history, history_limit
+        )
+        symbols = list(get_db()[MARKET_DATA].aggregate(pipeline))
+        response = {"data": symbols, "count": len(symbols)}
+        if limit is not None:
+            response["next_cursor"] = (
+                symbols[-1]["symbol"] if len(symbols) == limit else None
+            )
+        return response
+
+    def stream_all_symbols(
+        self,
+        request: Request,
+        fields: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        include_history: bool = False,
+        history_limit: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        get_all_symbols as NDJSON (one quote per line), streamed from the
+        cursor instead of built in memory. Not cached; without 'limit' every
+        symbol is sent.
+        """
+        pipeline = self._all_symbols_pipeline(
+            fields, limit, after, include_history, history_limit
+        )
+        return ndjson_lines(
+            request,
+            lambda: get_db()[MARKET_DATA].aggregate(
+                pipeline, batchSize=STREAM_BATCH_SIZE
+            ),
+        )
+
+    def _all_symbols_pipeline(
+        self,
+        fields: Optional[str],
+        limit: Optional[int],
+        after: Optional[str],
+        include_history: bool,
+        history_limit: Optional[int],
+    ) -> List[dict]:
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise HTTPException(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        if history_limit is not None and history_limit < 1:
+            raise HTTPException(400, "history_limit must be a positive integer")
+
+        pipeline = [
+            {"$match": {"symbol": {"$gt": after}} if after else {}},
+            {"$sort": {"symbol": 1}},
+        ]
+        if limit is not None:
+            pipeline.append({"$limit": limit})
+        pipeline.append({"$project": self._projection(fields)})
+        if include_history or history_limit is not None:
+            pipeline.append(self._history_lookup(history_limit))
+        return pipeline
+
+    def _projection(self, fields: Optional[str]) -> dict:
+        """Inclusion projection for the requested quote fields."""
+        selected: List[str] = list(QUOTE_FIELDS)
+        if fields:
+            selected = [field.strip() for field in fields.split(",") if field.strip()]
+            unknown = set(selected) - set(QUOTE_FIELDS)
+            if unknown:
+                raise HTTPException(
+                    400, f"Unknown fields: {', '.join(sorted(unknown))}"
+                )
+
+        projection = {"_id": 0, "symbol": 1}
+        projection.update({field: 1 for field in selected})
+        return projection
+
+    def _history_lookup(self, history_limit: Optional[int]) -> dict:
+        """
+        $lookup stage that rebuilds the 'history' array from the ticks collection.
+        With a limit, only the most recent ticks are kept (still oldest first).
+        """
+        pipeline = [{"$match": {"$expr": {"$eq": ["$symbol", "$$symbol"]}}}]
+        if history_limit is not None:
+            pipeline += [
+                {"$sort": {"timestamp": -1}},
+                {"$limit": history_limit},
+            ]
+        pipeline += [
+            {"$sort": {"timestamp": 1}},
+            {"$project": {"_id": 0, "symbol": 0, "trading_date": 0}},
+        ]
+        return {
+            "$lookup": {
+                "from": MARKET_TICKS,
+                "let": {"symbol": "$symbol"},
+                "pipeline": pipeline,
+                "as": "history",
+            }
+        }
+
+    async def get_candles(
+        self,
+        symbol: str,
+        interval: str = "1m",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ):
+        """
+        OHLCV candles of a symbol, oldest first.
+
+        Args:
+            symbol: Symbol code (e.g. "BNC")
+            interval: One of 1m, 5m, 1h, 1d
+            start: Only candles starting at or after this moment
+            end: Only candles starting before this moment
+
+        Without 'start', the most recent MAX_CANDLES candles are returned.
+        """
+        if interval not in INTERVALS:
+            raise HTTPException(400, f"interval must be one of {', '.join(INTERVALS)}")
+
+        query = {"symbol": symbol.upper(), "interval": interval}
+        if start is not None or end is not None:
+            query["start"] = {}
+            if start is not None:
+                query["start"]["$gte"] = start
+            if end is not None:
+                query["start"]["$lt"] = end
+
+        projection = {"_id": 0, "symbol": 0, "interval": 0}
+
+        def find() -> List[dict]:
+            if start is not None:
+                cursor = (
+                    get_db()[MARKET_CANDLES].find(query, projection).sort("start", 1)
+                )
+                return list(cursor.limit(MAX_CANDLES))
+            cursor = get_db()[MARKET_CANDLES].find(query, projection).sort("start", -1)
+            return list(cursor.limit(MAX_CANDLES))[::-1]
+
+        candles = await run_db(find)
+
+        # A candle is final once a later tick closed it or its interval is over
+        now = datetime.utcnow()
+        for candle in candles:
+            candle["closed"] = bool(candle.get("closed")) or candle["end"] <= now
+
+        return {
+            "symbol": symbol.upper(),
+            "interval": interval,
+            "data": candles,
+            "count": len(candles),
+        }
+
+    async def get_history(
+        self,
+        symbol: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        points: int = DEFAULT_HISTORY_POINTS,
+        method: str = "lttb",
+    ) -> Snapshot:
+        """
+        Ticks of a symbol in a time window, oldest first, downsampled on the
+        server when more than 'points' are stored. Cached until the ingester
+        writes.
+
+        Without 'start' the window is the last DEFAULT_HISTORY_WINDOW. When it
+        holds more than MAX_HISTORY_SCAN ticks, the closes of the finest
+        candles that fit are downsampled instead of the ticks, so a request
+        never reads more than MAX_HISTORY_SCAN documents.
+
+        Args:
+            symbol: Symbol code (e.g. "BNC")
+            start: Only ticks at or after this moment
+            end: Only ticks before this moment
+            points: Maximum number of ticks to return
+            method: "lttb" (keeps the shape of the price line) or "minmax"
+                (keeps the lowest and highest price of every bucket)
+        """
+        if method not in METHODS:
+            raise HTTPException(400, f"method must be one of {', '.join(METHODS)}")
+        if not 3 <= points <= MAX_HISTORY_POINTS:
+            raise HTTPException(
+                400, f"points must be between 3 and {MAX_HISTORY_POINTS}"
+            )
+        symbol = symbol.upper()
+        self._ticks_query(symbol, start, end)  # validates the window
+        key = ("history", symbol, start, end, points, method)
+        return await run_db(
+            history_snapshots.get,
+            key,
+            lambda: self._build_history(symbol, start, end, points, method),
+        )
+
+    async def get_board_history(
+        self,
+        symbols: Optional[Set[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        points: int = DEFAULT_BOARD_HISTORY_POINTS,
+        method: str = "lttb",
+    ) -> Snapshot:
+        """
+        get_history of every symbol (or of 'symbols') in one response, each
+        downsampled to 'points'. Cached until the ingester writes.
+
+        Args:
+            symbols: Only these symbols (all symbols if None)
+            start: Only ticks at or after this moment
+            end: Only ticks before this moment
+            points: Maximum number of ticks per symbol
+            method: "lttb" or "minmax", see get_history
+        """
+        if method not in METHODS:
+            raise HTTPException(400, f"method must be one of {', '.join(METHODS)}")
+        if not 3 <= points <= MAX_BOARD_HISTORY_POINTS:
+            raise HTTPException(
+                400, f"points must be between 3 and {MAX_BOARD_HISTORY_POINTS}"
+            )
+        self._ticks_query("", start, end)  # validates the window
+        selected = tuple(sorted(symbols)) if symbols is not None else None
+
+        def build() -> dict:
+            codes = selected
+            if codes is None:
+                codes = sorted(get_db()[MARKET_DATA].distinct("symbol"))
+            data = []
+            for symbol in codes:
+                history = self._build_history(symbol, start, end, points, method)
+                data.append(
+                    {
+                        "symbol": symbol,
+                        "method": history["method"],
+                        "interval": history["interval"],
+                        "total": history["total"],
+                        "history": history["data"],
+                    }
+                )
+            return {"data": data, "count": len(data)}
+
+        key = ("board_history", selected, start, end, points, method)
+        return await run_db(history_snapshots.get, key, build)
+
+    def _build_history(
+        self,
+        symbol: str,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        points: int,
+        method: str,
+    ) -> dict:
+        if start is None:
+            start = (end or get_current_time()) - DEFAULT_HISTORY_WINDOW
+        query = self._ticks_query(symbol, start, end)
+        db = get_db()
+        total = db[MARKET_TICKS].count_documents(query)
+
+        interval = None
+        if total <= MAX_HISTORY_SCAN:
+            query["price"] = {"$ne": None}
+            rows = list(
+                db[MARKET_TICKS]
+                .find(query, TICK_PROJECTION)
+                .sort("timestamp", 1)
+                .batch_size(5000)
+            )
+        else:
+            interval, rows = self._history_candles(db, symbol, start, end)
+
+        sampled = len(rows) > points
+        if sampled:
+            prices = [row["price"] for row in rows]
+            if method == "lttb":
+                times = [row["timestamp"].timestamp() for row in rows]
+                kept = lttb(times, prices, points)
+            else:
+                kept = min_max(prices, points)
+            rows = [rows[index] for index in kept]
+
+        return {
+            "symbol": symbol,
+            "method": method if sampled else None,
+            "interval": interval,
+            "total": total,
+            "data": rows,
+            "count": len(rows),
+        }
+
+    def _history_candles(
+        self, db, symbol: str, start: datetime, end: Optional[datetime]
+    ) -> Tuple[str, List[dict]]:
+        """
+        Closes of the finest candles with at most MAX_HISTORY_SCAN in the
+        window, as history points (price and timestamp of the candle start,
+        plus its OHLCV)
+        """
+        query = {"symbol": symbol, "start": {"$gte": start}}
+        if end is not None:
+            query["start"]["$lt"] = end
+        for interval in INTERVALS:
+            query["interval"] = interval
+            if db[MARKET_CANDLES].count_documents(query) <= MAX_HISTORY_SCAN:
+                break
+        candles = (
+            db[MARKET_CANDLES]
+            .find(query, CANDLE_POINT_PROJECTION)
+            .sort("start", 1)
+            .limit(MAX_HISTORY_SCAN)
+        )
+        rows = [
+            {"price": candle["close"], "timestamp": candle.pop("start"), **candle}
+            for candle in candles
+        ]
+        return interval, rows
+
+    def stream_ticks(
+        self,
+        request: Request,
+        symbol: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Every tick of a symbol in a time window as NDJSON, oldest first,
+        streamed from the cursor without downsampling.
+        """
+        query = self._ticks_query(symbol, start, end)
+        return ndjson_lines(
+            request,
+            lambda: get_db()[MARKET_TICKS]
+            .find(query, TICK_PROJECTION)
+            .sort("timestamp", 1)
+            .batch_size(STREAM_BATCH_SIZE),
+        )
+
+    def _ticks_query(
+        self, symbol: str, start: Optional[datetime], end: Optional[datetime]
+    ) -> dict:
+        if start is not None and end is not None and start >= end:
+            raise HTTPException(400, "from must be before to")
+        query = {"symbol": symbol.upper()}
+        if start is not None or end is not None:
+            query["timestamp"] = {}
+            if start is not None:
+                query["timestamp"]["$gte"] = start
+            if end is not None:
+                query["timestamp"]["$lt"] = end
+        return query
+
+    async def get_indicators(self, symbol: str):
+        """SMA, EMA, RSI, VWAP and volatility of a symbol, updated tick by tick"""
+        # NumPy is loaded by the first indicators request, not at startup
+        from .indicators import indicator_engine, parameters
+
+        values = await run_db(lambda: indicator_engine.get(get_db(), symbol.upper()))
+        if values is None:
+            raise HTTPException(404, f"No ticks stored for {symbol.upper()}")
+        return {"data": values, "parameters": parameters()}
+
+    async def get_board_indicators(self):
+        """Indicators of every symbol"""
+        from .indicators import indicator_engine, parameters
+
+        data = await run_db(lambda: indicator_engine.board(get_db()))
+        return {"data": data, "count": len(data), "parameters": parameters()}
+
+    async def get_summary(self) -> Snapshot:
+        """Serialized market summary, cached until the ingester writes"""
+        return await run_db(
+            snapshots.get,
+            ("summary",),
+            lambda: {
+                "data": MarketDataQuery(get_db()[MARKET_DATA]).get_market_summary()
+            },
+        )
+
+    async def get_ranking(self, ranking: str, limit: int = 10) -> Snapshot:
+        """
+        Serialized top list, cached until the ingester writes.
+
+        Args:
+            ranking: One of gainers, losers, traded, value
+            limit: Number of symbols to return
+        """
+        if ranking not in RANKINGS:
+            raise HTTPException(404, f"ranking must be one of {', '.join(RANKINGS)}")
+        if not 1 <= limit <= MAX_RANKING_SIZE:
+            raise HTTPException(400, f"limit must be between 1 and {MAX_RANKING_SIZE}")
+
+        def build():
+            query = MarketDataQuery(get_db()[MARKET_DATA])
+            data = getattr(query, RANKINGS[ranking])(limit)
+            return {"data": data, "count": len(data)}
+
+        return await run_db(snapshots.get, ("ranking", ranking, limit), build)
+
+    async def search_symbols(self, text: str, limit: int = 20):
+        """Symbols whose code starts with, or whose description contains, 'text'"""
+        if not text.strip():
+            raise HTTPException(400, "q must not be empty")
+        if not 1 <= limit <= MAX_RANKING_SIZE:
+            raise HTTPException(400, f"limit must be between 1 and {MAX_RANKING_SIZE}")
+        data = await run_db(
+            lambda: MarketDataQuery(get_db()[MARKET_DATA]).search_symbol(text, limit)
+        )
+        return {"data": data, "count": len(data)}
+
+    async def get_latest_ticks(self, symbol: str, limit: int = 1):
+        """Most recent ticks of a symbol, newest first"""
+        if not 1 <= limit <= MAX_RANKING_SIZE:
+            raise HTTPException(400, f"limit must be between 1 and {MAX_RANKING_SIZE}")
+        data = await run_db(
+            lambda: MarketDataQuery(get_db()[MARKET_DATA]).get_latest_by_symbol(
+                symbol, limit
+            )
+        )
+        return {"data": data, "count": len(data)}
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from os import getenv
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Pre-serialized response for one market data version"""
+
+    version: int
+    body: bytes
+    etag: str
+    # Payload the body was serialized from, for other encodings
+    payload: Any = field(default=None, compare=False, repr=False)
+    # Other representations of the same response, built on first request
+    variants: dict = field(default_factory=dict, compare=False, repr=False)
+
+
+def _default(value: Any) -> Any:
+    """JSON encoder for values pymongo returns (same output as FastAPI's encoder)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def serialize(payload: Any) -> bytes:
+    """Compact JSON encoding used for cached responses"""
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class SnapshotCache:
+    """
+    In-process cache of serialized responses, invalidated by the market data version.
+
+    The version is read from the database at most once every 'version_ttl'
+    seconds, so repeat requests are served from memory without touching MongoDB.
+    Entries are keyed by the request parameters and evicted least recently used.
+    """
+
+    def __init__(
+        self,
+        version_source: Callable[[], int],
+        version_ttl: Optional[float] = None,
+        max_entries: int = 64,
+    ):
+        """
+        Args:
+            version_source: Returns the current market data version
+            version_ttl: Seconds a version read is trusted (MARKET_VERSION_TTL, default 1.0)
+            max_entries: Maximum number of cached responses
+        """
+        self.version_source = version_source
+        self.version_ttl = (
+            version_ttl
+            if version_ttl is not None
+            else float(getenv("MARKET_VERSION_TTL") or 1.0)
+        )
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self._version = 0
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def current_version(self) -> int:
+        """Market data version, refreshed from the source when the TTL expired"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.version_ttl:
+            self._version = self.version_source()
+            self._checked_at = now
+        return self._version
+
+    def invalidate(self) -> None:
+        """Force the next request to re-read the version and rebuild"""
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = float("-inf")
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Snapshot:
+        """
+        Cached snapshot for 'key', rebuilt with 'build' when the version changed.
+
+        Args:
+            key: Hashable description of the request (e.g. its parameters)
+            build: Returns the JSON-serializable payload for the request
+        """
+        with self._lock:
+            version = self.current_version()
+            snapshot = self._entries.get(key)
+            if snapshot is not None and snapshot.version == version:
+                self._entries.move_to_end(key)
+                return snapshot
+
+            payload = build()
+            body = serialize(payload)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            snapshot = Snapshot(version=version, body=body, etag=etag, payload=payload)
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return snapshot
@@ -0,0 +1,14 @@
+from fastapi import Response
+from nest.core import Controller, Get
+from src.metrics.registry import CONTENT_TYPE
+from .metrics_service import MetricsService
+
+
+@Controller("/metrics")
+class MetricsController:
+    def __init__(self, service: MetricsService):
+        self.service = service
+
+    @Get("/")
+    def get_metrics(self):
+        return Response(content=self.service.render(), media_type=CONTENT_TYPE)
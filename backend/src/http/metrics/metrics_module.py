@@ -0,0 +1,8 @@
+from nest.core import Module
+from .metrics_controller import MetricsController
+from .metrics_service import MetricsService
+
+
+@Module(imports=[], controllers=[MetricsController], providers=[MetricsService])
+class MetricsModule:
+    pass
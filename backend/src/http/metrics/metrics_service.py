@@ -0,0 +1,9 @@
+from nest.core import Injectable
+from src.metrics.registry import registry
+
+
+@Injectable
+class MetricsService:
+    def render(self) -> str:
+        """Every metric of this process in the Prometheus text format"""
+        return registry.render()
@@ -0,0 +1,23 @@
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from nest.core import Controller, Get
+from .rates_service import RatesService
+
+
+@Controller("/rates")
+class RatesController:
+    def __init__(self, service: RatesService):
+        self.service = service
+
+    @Get("/")
+    async def get_rates(self):
+        # async so the background refresh is scheduled on the server loop
+        rates = self.service.get_rates()
+        if not rates["rates"]:
+            # First fetch still running (or failing): ask the client to retry
+            return JSONResponse(
+                jsonable_encoder(rates), status_code=503, headers={"Retry-After": "5"}
+            )
+        return JSONResponse(
+            jsonable_encoder(rates), headers={"Cache-Control": "max-age=60"}
+        )
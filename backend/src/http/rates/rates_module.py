@@ -0,0 +1,8 @@
+from nest.core import Module
+from .rates_controller import RatesController
+from .rates_service import RatesService
+
+
+@Module(imports=[], controllers=[RatesController], providers=[RatesService])
+class RatesModule:
+    pass
@@ -0,0 +1,14 @@
+from typing import Any, Dict
+
+from nest.core import Injectable
+from src.ws.bcv import rate_provider
+
+
+@Injectable
+class RatesService:
+    def get_rates(self) -> Dict[str, Any]:
+        """
+        Cached exchange rates; stale or missing rates are refreshed in the
+        background, never while the request waits.
+        """
+        return rate_provider.get_rates()
@@ -0,0 +1,49 @@
+import time
+
+from .registry import registry
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route"],
+)
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware recording the count and duration of HTTP requests.
+
+    Requests are labelled with the route template (e.g. /market/{symbol}/latest),
+    not the raw path, to keep the number of series bounded. It is a plain ASGI
+    middleware so streamed responses (/market/stream) pass through unbuffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(method=scope["method"], route=path, status=status)
+            http_request_duration.observe(
+                time.perf_counter() - started, method=scope["method"], route=path
+            )
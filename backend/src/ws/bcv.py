@@ -1,16 +1,300 @@
+"""
+Exchange rates published on alcambio.app (BCV official rate and others).
+
+RateProvider keeps the latest rates in memory and refreshes them in the
+background through a pooled async HTTP client with conditional GETs
+(ETag / Last-Modified), so a rate lookup never waits for the upstream site.
+
+Only the text of the "text-money" nodes is extracted, with a streaming
+parser; the rest of the page is skipped.
+
+Usage:
+    python src/ws/bcv.py                     # fetch and print the rates
+    python src/ws/bcv.py --save page.html    # also save the page, e.g. as a fixture
+    python src/ws/bcv.py --file page.html    # parse a saved page offline
+"""
+
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from os import getenv
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
 URL = "https://alcambio.app/"
 
-from requests import get
-from bs4 import BeautifulSoup
+# Class that marks the nodes holding a rate
+MONEY_CLASS = "text-money"
+
+# Elements without an end tag, which must not count as nesting
+_VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "wbr"}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """
+    Number in a rate text, in Venezuelan format ("Bs. 1.234,56" -> 1234.56).
+
+    Returns:
+        The number, or None if the text holds none
+    """
+    match = re.search(r"\d[\d.,]*", text)
+    if match is None:
+        return None
+    number = match.group().rstrip(".,")
+    if "," in number:
+        number = number.replace(".", "").replace(",", ".")
+    elif number.count(".") > 1:
+        number = number.replace(".", "")
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+class _MoneyParser(HTMLParser):
+    """
+    Collects the text of every MONEY_CLASS node, with the last text seen
+    before it as its label (e.g. "Dólar BCV"). Script and style contents are
+    ignored.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rates: List[Dict[str, Any]] = []
+        self._depth = 0  # open elements inside the current money node
+        self._parts: List[str] = []
+        self._label: Optional[str] = None
+        self._skip = 0  # inside <script> or <style>
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+            return
+        if tag in _VOID_TAGS:
+            return
+        if self._depth:
+            self._depth += 1
+            return
+        for name, value in attrs:
+            if name == "class" and value and MONEY_CLASS in value.split():
+                self._depth = 1
+                self._parts = []
+                return
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(self._skip - 1, 0)
+            return
+        if not self._depth or tag in _VOID_TAGS:
+            return
+        self._depth -= 1
+        if not self._depth:
+            text = " ".join(self._parts)
+            self.rates.append(
+                {"label": self._label, "text": text, "value": parse_amount(text)}
+            )
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        text = " ".join(data.split())
+        if not text:
+            return
+        if self._depth:
+            self._parts.append(text)
+        else:
+            self._label = text
+
+
+def parse_rates(html: str) -> List[Dict[str, Any]]:
+    """
+    Rates in a page, in document order.
+
+    Returns:
+        List of {"label", "text", "value"}; value is None when the text holds no number
+    """
+    parser = _MoneyParser()
+    parser.feed(html)
+    parser.close()
+    return parser.rates
+
+
+class RateProvider:
+    """
+    In-memory rates with a TTL and stale-while-revalidate.
+
+    - Fresh (younger than 'ttl'): returned as is
+    - Stale (younger than 'stale_ttl'): returned flagged as stale while a
+      single background refresh runs
+    - Older or missing: an empty result is returned while a refresh runs
+
+    get_rates() never waits for the network.
+    """
+
+    def __init__(
+        self,
+        url: str = URL,
+        ttl: float = 300.0,
+        stale_ttl: float = 3600.0,
+        timeout: float = 10.0,
+    ):
+        """
+        Args:
+            url: Page to scrape
+            ttl: Seconds the rates are served without refreshing
+            stale_ttl: Seconds stale rates are still served while refreshing
+            timeout: Seconds allowed for an upstream request
+        """
+        self.url = url
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._rates: List[Dict[str, Any]] = []
+        self._fetched_at: Optional[float] = None  # monotonic
+        self._updated_at: Optional[datetime] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """Shared client: connections to the site are kept alive and reused"""
+        if self._client is None or self._client.is_closed:
+            # Imported on first fetch, not at startup
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+                headers={"User-Agent": "bvc-backend/1.0"},
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def fetch(self) -> bool:
+        """
+        Fetch the page if it changed since the last fetch.
+
+        Returns:
+            True if the rates changed
+        """
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        response = await self.client.get(self.url, headers=headers)
+        if response.status_code == 304:
+            self._fetched_at = time.monotonic()
+            return False
+        response.raise_for_status()
+
+        rates = parse_rates(response.text)
+        if not rates:
+            raise ValueError(f"No '{MONEY_CLASS}' nodes found in {self.url}")
+
+        self._etag = response.headers.get("etag")
+        self._last_modified = response.headers.get("last-modified")
+        changed = rates != self._rates
+        self._rates = rates
+        self._fetched_at = time.monotonic()
+        self._updated_at = datetime.now(timezone.utc)
+        return changed
+
+    async def _refresh_task(self) -> None:
+        try:
+            await self.fetch()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.warning(f"Error refreshing exchange rates: {self.last_error}")
+
+    def refresh_in_background(self) -> asyncio.Task:
+        """Start a refresh unless one is already running (single flight)"""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._refresh_task())
+        return self._refresh
+
+    def get_rates(self) -> Dict[str, Any]:
+        """
+        Current rates, refreshing them in the background when needed.
+
+        Returns:
+            {"source", "rates", "updated_at", "stale", "refreshing", "error"}
+        """
+        age = (
+            time.monotonic() - self._fetched_at
+            if self._fetched_at is not None
+            else None
+        )
+        if age is None or age >= self.ttl:
+            self.refresh_in_background()
+
+        available = age is not None and age < self.stale_ttl
+        return {
+            "source": self.url,
+            "rates": self._rates if available else [],
+            "updated_at": self._updated_at if available else None,
+            "stale": age is None or age >= self.ttl,
+            "refreshing": self._refresh is not None and not self._refresh.done(),
+            "error": self.last_error,
+        }
+
+    async def aclose(self) -> None:
+        if self._refresh is not None and not self._refresh.done():
+            self._refresh.cancel()
+            await asyncio.gather(self._refresh, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+
+
+# Shared by the HTTP endpoints of this process
+rate_provider = RateProvider(
+    ttl=float(getenv("RATES_TTL") or 300),
+    stale_ttl=float(getenv("RATES_STALE_TTL") or 3600),
+)
+
 
 def main():
-    response = get(url=URL)
-    soup = BeautifulSoup(response.content, "html.parser")
-    print(soup.prettify())
-    c = soup.find_all(class_="d-flex justify-center text-money")
-    print(c)
-    
-
-if __name__ == '__main__':
+    import argparse
+    import json
+
+    import httpx
+
+    parser = argparse.ArgumentParser(description="Print the alcambio.app rates")
+    parser.add_argument("--file", help="Parse a saved page instead of fetching it")
+    parser.add_argument("--save", help="Save the fetched page to this file")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as page:
+            rates = parse_rates(page.read())
+    else:
+
+        async def fetch_page() -> str:
+            async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
+                response = await client.get(URL)
+                response.raise_for_status()
+                return response.text
+
+        html = asyncio.run(fetch_page())
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as page:
+                page.write(html)
+        rates = parse_rates(html)
+
+    print(json.dumps(rates, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
     main()
-    
\ No newline at end of file
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from os import getenv
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One downstream consumer of market changes.
+
+    Changes are buffered per symbol: while the consumer is busy, newer changes
+    for a symbol are merged into the pending entry instead of queued behind it,
+    so a slow consumer always catches up to the latest value and its buffer
+    never holds more than one entry per symbol.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        symbols: Optional[Set[str]] = None,
+        max_pending: int = 1000,
+    ):
+        """
+        Args:
+            loop: Event loop the consumer runs on
+            symbols: Only receive these symbols (all symbols if None)
+            max_pending: Maximum symbols buffered before the oldest is dropped
+        """
+        self.loop = loop
+        self.symbols = symbols
+        self.max_pending = max_pending
+        self.coalesced = 0
+        self.dropped = 0
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def wants(self, symbol: str) -> bool:
+        """Whether the symbol passes this subscription's filter"""
+        return self.symbols is None or symbol in self.symbols
+
+    def push(self, deltas: List[Dict[str, Any]]) -> None:
+        """
+        Buffer changes for the consumer. Must run on the subscription's loop.
+
+        Args:
+            deltas: List of {"symbol", "changes", "timestamp"} entries
+        """
+        for delta in deltas:
+            symbol = delta["symbol"]
+            if not self.wants(symbol):
+                continue
+
+            pending = self._pending.get(symbol)
+            if pending is not None:
+                pending["changes"].update(delta["changes"])
+                pending["timestamp"] = delta["timestamp"]
+                self.coalesced += 1
+                continue
+
+            if len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[symbol] = {
+                "symbol": symbol,
+                "changes": dict(delta["changes"]),
+                "timestamp": delta["timestamp"],
+            }
+
+        if self._pending:
+            self._ready.set()
+
+    async def next(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Wait for buffered changes and take all of them.
+
+        Args:
+            timeout: Seconds to wait; an empty list is returned when it expires
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+
+        self._ready.clear()
+        pending, self._pending = self._pending, OrderedDict()
+        return list(pending.values())
+
+
+class MarketBroadcaster:
+    """
+    Fans out the changes decoded by BVCWebSocketClient to any number of
+    subscribers, and keeps the latest quote per symbol in memory so new
+    subscribers get a snapshot without reading the database.
+    """
+
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        self._latest: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def quote_count(self) -> int:
+        return len(self._latest)
+
+    def publish(self, deltas: List[Dict[str, Any]]) -> None:
+        """
+        Listener for BVCWebSocketClient.add_listener.
+
+        Args:
+            deltas: List of {"symbol", "changes", "timestamp"} entries
+        """
+        self._remember(deltas)
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        for subscription in list(self._subscriptions):
+            if subscription.loop is running_loop:
+                subscription.push(deltas)
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.push, deltas)
+
+    def publish_quotes(
+        self, quotes: List[Dict[str, Any]], announce: bool = True
+    ) -> int:
+        """
+        Publish the fields of full quotes that differ from the latest known ones.
+
+        Args:
+            quotes: Latest quotes as stored in market_data (with 'symbol' and
+                'timestamp')
+            announce: Send the changes to subscribers; when False they are only
+                kept as the latest quotes (e.g. to seed an empty broadcaster)
+
+        Returns:
+            Number of symbols that changed
+        """
+        deltas = []
+        for quote in quotes:
+            known = self._latest.get(quote["symbol"], {})
+            changes = {
+                field: value
+                for field, value in quote.items()
+                if field not in ("symbol", "timestamp") and known.get(field) != value
+            }
+            if changes:
+                deltas.append(
+                    {
+                        "symbol": quote["symbol"],
+                        "changes": changes,
+                        "timestamp": quote.get("timestamp") or datetime.utcnow(),
+                    }
+                )
+        if not deltas:
+            return 0
+        if announce:
+            self.publish(deltas)
+        else:
+            self._remember(deltas)
+        return len(deltas)
+
+    def _remember(self, deltas: List[Dict[str, Any]]) -> None:
+        """Apply changes to the latest known quotes"""
+        for delta in deltas:
+            quote = self._latest.setdefault(
+                delta["symbol"], {"symbol": delta["symbol"]}
+            )
+            quote.update(delta["changes"])
+            quote["timestamp"] = delta["timestamp"]
+
+    def snapshot(self, symbols: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Latest known quote of every symbol (or of the given symbols)"""
+        return [
+            dict(quote)
+            for symbol, quote in list(self._latest.items())
+            if symbols is None or symbol in symbols
+        ]
+
+    def subscribe(
+        self, symbols: Optional[Set[str]] = None, max_pending: int = 1000
+    ) -> Subscription:
+        """
+        Create a subscription on the running event loop.
+
+        Args:
+            symbols: Only receive these symbols (all symbols if None)
+            max_pending: Maximum symbols buffered before the oldest is dropped
+        """
+        subscription = Subscription(asyncio.get_running_loop(), symbols, max_pending)
+        self._subscriptions.add(subscription)
+        logger.debug(f"Subscriber added ({len(self._subscriptions)} total)")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        logger.debug(f"Subscriber removed ({len(self._subscriptions)} total)")
+
+
+class QuotePoller:
+    """
+    Feeds a MarketBroadcaster from the database, so the stream works in
+    processes that don't run the ingester (plain HTTP servers, and replicas
+    that aren't the ingester leader).
+
+    While anyone is subscribed, the market data version is checked every
+    'interval' seconds. When it moved, the latest quotes are read and the
+    fields that differ from the broadcaster's copy are published. Changes
+    the in-process ingester already published compare equal and are not
+    sent twice.
+    """
+
+    def __init__(
+        self,
+        broadcaster: MarketBroadcaster,
+        version_source: Callable[[], int],
+        read_quotes: Callable[[], List[Dict[str, Any]]],
+        interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            broadcaster: Broadcaster to publish to
+            version_source: Returns the current market data version (blocking)
+            read_quotes: Returns the latest quote of every symbol (blocking)
+            interval: Seconds between version checks (MARKET_STREAM_POLL,
+                default 1.0)
+        """
+        self.broadcaster = broadcaster
+        self.version_source = version_source
+        self.read_quotes = read_quotes
+        self.interval = (
+            interval
+            if interval is not None
+            else float(getenv("MARKET_STREAM_POLL") or 1.0)
+        )
+        self._task: Optional[asyncio.Task] = None
+        self._synced: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """
+        Start polling on the running loop, unless it already runs. Call after
+        subscribing: polling stops once the last subscriber is gone.
+
+        When the broadcaster holds no quotes yet, waits (up to a few intervals)
+        for the first read, so the caller's snapshot and the published changes
+        start from the same data.
+        """
+        if not self.running:
+            self._synced = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        if not self.broadcaster.quote_count:
+            try:
+                await asyncio.wait_for(self._synced.wait(), self.interval * 5)
+            except asyncio.TimeoutError:
+                logger.warning("Market stream poller has not read the quotes yet")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        version = None
+        while self.broadcaster.subscriber_count:
+            try:
+                current = await loop.run_in_executor(None, self.version_source)
+                if current != version:
+                    quotes = await loop.run_in_executor(None, self.read_quotes)
+                    # An empty broadcaster is seeded: subscribers just read
+                    # the same quotes as their snapshot
+                    changed = self.broadcaster.publish_quotes(
+                        quotes, announce=self.broadcaster.quote_count > 0
+                    )
+                    logger.debug(f"Market version {current}: {changed} symbols changed")
+                    version = current
+                self._synced.set()
+            except Exception as e:
+                logger.error(f"Market stream poller could not read the database: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Shared by the ingester, quote_poller and the HTTP stream endpoint of a process
+market_broadcaster = MarketBroadcaster()
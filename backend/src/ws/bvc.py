@@ -1,10 +1,16 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import websockets
 from os import getenv
 import ssl
-import json
 import logging
-from typing import Optional, List, Dict, Any
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Callable, Union
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,8 +19,30 @@ import sys
 
 # Handle imports for both direct execution and module import
 try:
+    from src.config.market_session import MarketSession
     from src.config.time import get_current_time, set_time_zone
-    from src.database.mongo import db
+    from src.database.mongo import get_db, start_db
+    from src.database.mongo.collections import (
+        MARKET_CANDLES,
+        MARKET_DATA,
+        MARKET_GAPS,
+        MARKET_TICKS,
+        ensure_indexes,
+    )
+    from src.database.mongo.market_version import bump_market_version
+    from src.ws.broadcast import market_broadcaster
+    from src.ws.candles import CandleAggregator
+    from src.metrics.registry import registry
+    from src.ws.decoder import (
+        DELTA_FIELDS,
+        EVENT,
+        MESSAGE,
+        PING,
+        SymbolTick,
+        decode_event,
+        decode_ticks,
+        frame_type,
+    )
 except ImportError:
     # When running directly, add src to path first
     import sys
@@ -22,15 +50,104 @@ except ImportError:
 
     src_dir = Path(__file__).parent.parent
     sys.path.insert(0, str(src_dir))
+    from config.market_session import MarketSession
     from config.time import get_current_time, set_time_zone
-    from database.mongo import db
+    from database.mongo import get_db, start_db
+    from database.mongo.collections import (
+        MARKET_CANDLES,
+        MARKET_DATA,
+        MARKET_GAPS,
+        MARKET_TICKS,
+        ensure_indexes,
+    )
+    from database.mongo.market_version import bump_market_version
+    from ws.broadcast import market_broadcaster
+    from ws.candles import CandleAggregator
+    from metrics.registry import registry
+    from ws.decoder import (
+        DELTA_FIELDS,
+        EVENT,
+        MESSAGE,
+        PING,
+        SymbolTick,
+        decode_event,
+        decode_ticks,
+        frame_type,
+    )
 
 
 set_time_zone()
 
+# MongoDB error code raised when a write collides with a unique index
+DUPLICATE_KEY_ERROR = 11000
+
+# What to do with a decoded frame when the write queue is full
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued frame (default)
+DROP_NEWEST = "drop_newest"  # discard the incoming frame
+BLOCK = "block"  # wait for room; stalls the receive loop
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+# Health states of the client (see BVCWebSocketClient.health_status)
+STARTING = "starting"
+CONNECTED = "connected"
+RECONNECTING = "reconnecting"
+FAILED = "failed"  # gave up reconnecting (only happens outside market sessions)
+STOPPED = "stopped"
+HEALTH_STATES = (STARTING, CONNECTED, RECONNECTING, FAILED, STOPPED)
+
+# Stored fields that make up a symbol's latest quote
+QUOTE_FIELDS = tuple(DELTA_FIELDS.values()) + ("trading_date",)
+
 # Logging configuration
 logger = logging.getLogger(__name__)
 
+# Metrics (served at /metrics by the HTTP app, or on BVC_METRICS_PORT)
+frames_received = registry.counter(
+    "bvc_frames_total", "Frames received from BVC", ["type"]
+)
+decode_errors = registry.counter(
+    "bvc_decode_errors_total", "Frames that could not be decoded"
+)
+handle_message_seconds = registry.histogram(
+    "bvc_handle_message_seconds", "Time spent in _handle_message per frame", ["type"]
+)
+process_seconds = registry.histogram(
+    "bvc_process_server_data_seconds",
+    "Time spent decoding and deduplicating a serverData frame",
+)
+dedup_lookups = registry.counter(
+    "bvc_dedup_total",
+    "Last-seen cache lookups; hits are ticks skipped before any I/O",
+    ["result"],
+)
+frames_dropped = registry.counter(
+    "bvc_dropped_frames_total", "Frames dropped because the write queue was full"
+)
+write_queue_depth = registry.gauge(
+    "bvc_write_queue_depth", "Decoded frames waiting for a writer"
+)
+save_seconds = registry.histogram(
+    "bvc_save_seconds", "Time spent writing a batch to MongoDB (_save_data)"
+)
+ticks_saved = registry.counter(
+    "bvc_ticks_total", "Ticks handled by the writer stage", ["result"]
+)
+reconnects = registry.counter(
+    "bvc_reconnects_total", "Reconnections after a lost connection", ["reason"]
+)
+connected = registry.gauge("bvc_connected", "1 while connected to the BVC feed")
+health_state = registry.gauge(
+    "bvc_health", "1 for the current health state of the client", ["state"]
+)
+recovery_seconds = registry.histogram(
+    "bvc_recovery_seconds",
+    "Time from losing the feed to the first data frame after reconnecting",
+    buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+gaps_detected = registry.counter(
+    "bvc_gaps_total", "Symbols that changed while the feed was disconnected"
+)
+
 
 class BVCWebSocketClient:
     """
@@ -38,14 +155,20 @@ class BVCWebSocketClient:
     Handles connection, automatic reconnection, and message processing.
     """
 
-    def __init__(self, ws_url: Optional[str] = None):
+    def __init__(
+        self, ws_url: Optional[str] = None, session: Optional[MarketSession] = None
+    ):
         """
         Initialize the WebSocket client.
 
         Args:
             ws_url: WebSocket URL. If not provided, it will be obtained from environment variables.
+            session: Trading session calendar; data frames outside a session are
+                discarded before decoding. Defaults to MarketSession.from_env().
+                Set the 'session' attribute to None to accept frames at any time.
         """
         self.ws_url = ws_url or getenv("WS_BVC")
+        self.session = session or MarketSession.from_env()
         if not self.ws_url:
             raise ValueError("WS_BVC environment variable is not set")
 
@@ -64,10 +187,64 @@ class BVCWebSocketClient:
         }
 
         self.is_running = False
-        self.reconnect_delay = 5  # seconds
+        # Reconnect with exponential backoff and jitter: ~0.5s, 1s, 2s, ... up
+        # to the max delay. Attempts are only limited outside market sessions.
+        self.reconnect_base_delay = float(
+            getenv("BVC_RECONNECT_BASE_DELAY") or 0.5
+        )  # seconds
+        self.reconnect_max_delay = float(
+            getenv("BVC_RECONNECT_MAX_DELAY") or 60
+        )  # seconds
         self.max_reconnect_attempts = 10
+        self.reconnect_attempts = 0
         self.ping_timeout = 20  # seconds
         self.ping_interval = 25  # seconds
+        self._indexes_ready = False  # ensure_indexes() runs before the first save
+
+        # Writer stage: the receive loop only decodes and enqueues frames,
+        # writer tasks batch them and flush to MongoDB on a dedicated thread pool
+        self.write_queue_size = int(getenv("BVC_WRITE_QUEUE_SIZE") or 100)  # frames
+        self.write_batch_size = int(getenv("BVC_WRITE_BATCH_SIZE") or 500)  # symbols
+        self.write_flush_interval = float(
+            getenv("BVC_WRITE_FLUSH_INTERVAL") or 1.0
+        )  # seconds
+        self.writer_count = int(getenv("BVC_WRITERS") or 1)
+        self.drop_policy = getenv("BVC_WRITE_DROP_POLICY") or DROP_OLDEST
+        if self.drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                f"BVC_WRITE_DROP_POLICY must be one of {', '.join(DROP_POLICIES)}"
+            )
+        self.dropped_frames = 0
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writers: List[asyncio.Task] = []
+        self._db_executor: Optional[ThreadPoolExecutor] = None
+
+        # Last persisted quote per symbol. Frames whose (trading_date,
+        # market_time, price, volume) fingerprint matches it are dropped
+        # before any I/O. Writer threads update it under the lock.
+        self._last_seen: Dict[str, Dict[str, Any]] = {}
+        self._last_seen_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Tick of the previous serverData frame per symbol, used to send only
+        # the changed fields to listeners
+        self._last_frame: Dict[str, SymbolTick] = {}
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+
+        # OHLCV candles maintained from the ticks as they are stored
+        self._candles = CandleAggregator()
+
+        # Health tracking. After a reconnect (or a restart) the first data
+        # frame is reconciled against the last-seen quotes to record gaps.
+        self.health = STARTING
+        self.last_error: Optional[str] = None
+        self.last_message_at: Optional[float] = None  # epoch seconds
+        self.connected_since: Optional[datetime] = None
+        self.disconnected_at: Optional[datetime] = None
+        self.gaps_detected = 0
+        self._reconcile_next_frame = False
+        self._set_health(STARTING)
 
     def _create_ssl_context(self) -> ssl.SSLContext:
         """
@@ -87,183 +264,566 @@ class BVCWebSocketClient:
         Args:
             message: Message received from server
         """
+        started = time.perf_counter()
+        kind = "other"
         try:
-            # Process different message types
-            if message == "2":
+            engine_type, socket_type = frame_type(message)
+
+            if engine_type == PING:
                 # Ping message, respond with pong
+                kind = "ping"
                 logger.debug("Ping received, sending pong")
-                print("Ping received, sending pong")
                 return "3"  # Return response
 
-            elif message and message.startswith("42"):
+            elif engine_type == MESSAGE and socket_type == EVENT:
                 # Message with data
-                data_str = message[2:]
-                data = json.loads(data_str)
+                kind = "event"
+                event_type, payload = decode_event(message)
 
-                if isinstance(data, list) and len(data) > 0:
-                    event_type = data[0]
-
-                    if event_type == "serverData" and len(data) > 1:
-                        print(f"Server data received: {len(data[1])} symbols")
-                        await self._process_server_data(data[1])
+                if event_type == "serverData" and isinstance(payload, list):
+                    logger.debug("Server data received: %d symbols", len(payload))
+                    await self._process_server_data(payload)
 
             else:
-                logger.debug(f"Unrecognized message: {message}")
+                logger.debug("Unrecognized message: %.200s", message)
 
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}, message: {message}")
+        except ValueError as e:
+            decode_errors.inc()
+            logger.error(f"JSON decode error: {e}, message: {message[:200]}")
         except Exception as e:
-            print(f"Error processing message: {e}")
+            logger.error(f"Error processing message: {e}")
+        finally:
+            frames_received.inc(type=kind)
+            handle_message_seconds.observe(time.perf_counter() - started, type=kind)
 
     async def _process_server_data(self, data: List[Dict[str, Any]]) -> None:
         """
-        Process and save server data.
+        Process server data and hand it to the writer stage.
 
         Args:
             data: List of symbol data received from BVC WebSocket
         """
+        started = time.perf_counter()
         try:
             symbols_data = []
-            for item in data:
-                if "COD_SIMB" in item:
-                    symbol_info = {
-                        "symbol": item.get("COD_SIMB"),
-                        "description": item.get("DESC_SIMB"),
-                        "price": item.get("PRECIO"),
-                        "absolute_variation": item.get("VAR_ABS"),
-                        "relative_variation": item.get("VAR_REL"),
-                        "volume": item.get("VOLUMEN"),
-                        "effective_amount": item.get("MONTO_EFECTIVO"),
-                        "market_time": item.get("HORA"),
-                        "timestamp": get_current_time(),
-                        "raw_data": item,
-                    }
-                    symbols_data.append(symbol_info)
+            deltas = []
+            hits_before = self.cache_hits
+            now = get_current_time()
+            trading_date = now.date().isoformat()
+            ticks = decode_ticks(data, now, trading_date)
+
+            if self._reconcile_next_frame:
+                self._reconcile_next_frame = False
+                self._reconcile(ticks, now)
+
+            for tick in ticks:
+                symbol = tick.symbol
+
+                changes = tick.changes(self._last_frame.get(symbol))
+                self._last_frame[symbol] = tick
+                if changes:
+                    deltas.append(
+                        {"symbol": symbol, "changes": changes, "timestamp": now}
+                    )
+
+                persisted = self._last_seen.get(symbol)
+                if persisted is not None and self._fingerprint(
+                    persisted
+                ) == self._fingerprint(tick):
+                    self.cache_hits += 1
+                    continue
+                self.cache_misses += 1
+
+                symbols_data.append(tick)
+
+            dedup_lookups.inc(self.cache_hits - hits_before, result="hit")
+            dedup_lookups.inc(len(symbols_data), result="miss")
+
+            if deltas:
+                self._notify(deltas)
+
+            # Time the decode stage only; waiting for queue room is not processing
+            process_seconds.observe(time.perf_counter() - started)
 
             if symbols_data:
-                await self._save_data(symbols_data)
-                print(f"Saved {len(symbols_data)} symbols to database")
+                await self._enqueue(symbols_data)
 
         except Exception as e:
-            print(f"Error processing server data: {e}")
+            logger.error(f"Error processing server data: {e}")
 
-    async def _save_data(self, symbols_data: List[Dict[str, Any]]) -> None:
+    def _reconcile(self, ticks: List[SymbolTick], now: datetime) -> None:
         """
-        Save data to MongoDB.
+        Compare the first frame after a reconnect with the last persisted quotes.
 
-        For each symbol:
-        - If it doesn't exist, create a new document with initial history
-        - If it exists, add to 'history' array only if there's no duplicate timestamp/hour
+        A symbol whose HORA or volume moved while the feed was down traded
+        during the outage, and any tick between the two was missed. Each one is
+        recorded in 'market_gaps' with the quote on both sides of the gap. The
+        insert is scheduled on the writer thread pool and not awaited, so the
+        receive loop never waits for MongoDB.
 
         Args:
-            symbols_data: List of symbol data to save
+            ticks: First data frame received after (re)connecting
+            now: Time the frame was received
         """
-        try:
+        if self.disconnected_at is not None:
+            recovery_seconds.observe((now - self.disconnected_at).total_seconds())
+
+        gaps = []
+        for tick in ticks:
+            persisted = self._last_seen.get(tick.symbol)
+            if persisted is None or persisted.get("trading_date") != tick.trading_date:
+                continue
+            if (
+                persisted.get("market_time") == tick.market_time
+                and persisted.get("volume") == tick.volume
+            ):
+                continue
+            gaps.append(
+                {
+                    "symbol": tick.symbol,
+                    "trading_date": tick.trading_date,
+                    "disconnected_at": self.disconnected_at,
+                    "detected_at": now,
+                    "before": {
+                        field: persisted.get(field)
+                        for field in ("market_time", "price", "volume")
+                    },
+                    "after": {
+                        "market_time": tick.market_time,
+                        "price": tick.price,
+                        "volume": tick.volume,
+                    },
+                    "missed_volume": self._increase(
+                        persisted.get("volume"), tick.volume
+                    ),
+                    "missed_amount": self._increase(
+                        persisted.get("effective_amount"), tick.effective_amount
+                    ),
+                }
+            )
+
+        self.disconnected_at = None
+        if not gaps:
+            return
+
+        self.gaps_detected += len(gaps)
+        gaps_detected.inc(len(gaps))
+        logger.warning(f"Feed gap: {len(gaps)} symbols traded while disconnected")
+        future = asyncio.get_running_loop().run_in_executor(
+            self._db_executor, self._save_gaps, gaps
+        )
+        future.add_done_callback(self._gaps_saved)
+
+    @staticmethod
+    def _gaps_saved(future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Error recording feed gaps: {future.exception()}")
+
+    @staticmethod
+    def _increase(before: Any, after: Any) -> Optional[float]:
+        """after - before for numeric cumulative totals, None otherwise"""
+        if isinstance(before, (int, float)) and isinstance(after, (int, float)):
+            return after - before
+        return None
+
+    def _save_gaps(self, gaps: List[Dict[str, Any]]) -> None:
+        """Store detected gaps. Blocking: runs on the writer thread pool."""
+        get_db()[MARKET_GAPS].insert_many(gaps, ordered=False)
+
+    def _set_health(self, state: str) -> None:
+        self.health = state
+        for known in HEALTH_STATES:
+            health_state.set(1 if known == state else 0, state=known)
+
+    @property
+    def health_status(self) -> Dict[str, Any]:
+        """Connection health: state, last error, reconnect attempts and data freshness"""
+        return {
+            "state": self.health,
+            "connected_since": self.connected_since,
+            "disconnected_at": self.disconnected_at,
+            "last_message_age": (
+                time.time() - self.last_message_at if self.last_message_at else None
+            ),
+            "reconnect_attempts": self.reconnect_attempts,
+            "last_error": self.last_error,
+            "gaps_detected": self.gaps_detected,
+        }
+
+    def add_listener(self, callback: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """
+        Register a downstream consumer of field-level changes.
+
+        The callback runs on the event loop after every serverData frame with a
+        list of {"symbol", "changes", "timestamp"} entries, where 'changes'
+        only holds the quote fields that differ from the previous frame.
+        It must not block.
+
+        Args:
+            callback: Function receiving the list of changes
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, deltas: List[Dict[str, Any]]) -> None:
+        """Send field-level changes to every listener."""
+        for listener in self._listeners:
+            try:
+                listener(deltas)
+            except Exception as e:
+                logger.error(f"Error in market data listener: {e}")
+
+    @staticmethod
+    def _tick_time(quote: Union[Dict[str, Any], SymbolTick]) -> Tuple[str, str]:
+        """(trading_date, market_time) of a quote, which orders a symbol's ticks"""
+        return (quote.get("trading_date") or "", quote.get("market_time") or "")
+
+    @staticmethod
+    def _fingerprint(quote: Union[Dict[str, Any], SymbolTick]) -> Tuple[Any, ...]:
+        """Values that identify a tick for the last-seen cache"""
+        return (
+            quote.get("trading_date"),
+            quote.get("market_time"),
+            quote.get("price"),
+            quote.get("volume"),
+        )
+
+    @property
+    def cache_stats(self) -> Dict[str, Any]:
+        """Last-seen cache counters"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_ratio": self.cache_hits / lookups if lookups else 0.0,
+            "size": len(self._last_seen),
+        }
+
+    def _warm_cache(self) -> None:
+        """
+        Load the last persisted quote of every symbol into the last-seen cache.
+        Blocking: runs on the writer thread pool.
+        """
+        projection = {"_id": 0, "symbol": 1, **{field: 1 for field in QUOTE_FIELDS}}
+        quotes = get_db()[MARKET_DATA].find(
+            {"trading_date": {"$exists": True}}, projection
+        )
+        with self._last_seen_lock:
+            for quote in quotes:
+                self._last_seen[quote.pop("symbol")] = quote
+        self._candles.warm(self._last_seen)
+        logger.info(f"Last-seen cache warmed with {len(self._last_seen)} symbols")
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of decoded frames waiting for a writer"""
+        return self._write_queue.qsize() if self._write_queue is not None else 0
+
+    async def _enqueue(self, symbols_data: List[SymbolTick]) -> None:
+        """
+        Put a decoded frame on the write queue, applying the drop policy when it is full.
 
-            if db is None:
-                print("Database not initialized")
+        Args:
+            symbols_data: Ticks decoded by _process_server_data
+        """
+        if self._write_queue is None:
+            # Writer stage not running (e.g. called outside start()), write inline
+            await asyncio.get_running_loop().run_in_executor(
+                self._db_executor, self._save_data, symbols_data
+            )
+            return
+
+        if self._write_queue.full():
+            if self.drop_policy == BLOCK:
+                await self._write_queue.put(symbols_data)
                 return
 
-            collection = db["market_data"]
+            self.dropped_frames += 1
+            frames_dropped.inc()
+            if self.drop_policy == DROP_NEWEST:
+                logger.warning("Write queue full, dropping incoming frame")
+                return
+
+            logger.warning("Write queue full, dropping oldest queued frame")
+            self._write_queue.get_nowait()
+            self._write_queue.task_done()
+
+        self._write_queue.put_nowait(symbols_data)
+        write_queue_depth.set(self._write_queue.qsize())
+
+    async def _writer(self) -> None:
+        """
+        Writer task: take frames off the queue and flush them in batches.
+        A batch is flushed once it holds write_batch_size symbols or
+        write_flush_interval seconds after its first frame, whichever comes first.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._write_queue
+
+        while True:
+            batch = list(await queue.get())
+            frames = 1
+            write_queue_depth.set(queue.qsize())
+            deadline = loop.time() + self.write_flush_interval
+
+            while len(batch) < self.write_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.extend(await asyncio.wait_for(queue.get(), timeout))
+                    frames += 1
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await loop.run_in_executor(self._db_executor, self._save_data, batch)
+            except Exception as e:
+                logger.error(f"Error flushing write batch: {e}")
+            finally:
+                for _ in range(frames):
+                    queue.task_done()
+
+    def _start_writers(self) -> None:
+        """Create the write queue, the DB thread pool and the writer tasks."""
+        self._write_queue = asyncio.Queue(maxsize=self.write_queue_size)
+        self._db_executor = ThreadPoolExecutor(
+            max_workers=self.writer_count, thread_name_prefix="bvc-writer"
+        )
+        self._writers = [
+            asyncio.create_task(self._writer()) for _ in range(self.writer_count)
+        ]
+
+    async def _stop_writers(self, timeout: float = 10.0) -> None:
+        """
+        Flush what is left on the write queue, then stop the writer tasks.
+
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+        """
+        if self._write_queue is None:
+            return
 
-            inserted_count = 0
-            updated_count = 0
-            skipped_count = 0
+        try:
+            await asyncio.wait_for(self._write_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Write queue not drained, {self._write_queue.qsize()} frames discarded"
+            )
+
+        for writer in self._writers:
+            writer.cancel()
+        await asyncio.gather(*self._writers, return_exceptions=True)
+        self._writers = []
+        self._write_queue = None
+        self._db_executor.shutdown(wait=True)
+        self._db_executor = None
+
+    def _build_tick_upsert(self, symbol_info: SymbolTick) -> UpdateOne:
+        """
+        Build the tick upsert for a single symbol.
 
-            for symbol_info in symbols_data:
-                symbol_code = symbol_info["symbol"]
+        Ticks are keyed by (symbol, trading_date, market_time) with a unique
+        index, so a tick that is already stored is a no-op index hit.
 
-                # History data (without raw_data to save space)
-                history_entry = {
-                    "price": symbol_info["price"],
-                    "absolute_variation": symbol_info["absolute_variation"],
-                    "relative_variation": symbol_info["relative_variation"],
-                    "volume": symbol_info["volume"],
-                    "effective_amount": symbol_info["effective_amount"],
-                    "market_time": symbol_info["market_time"],
+        Args:
+            symbol_info: Tick decoded by _process_server_data
+        """
+        tick = {
+            "symbol": symbol_info["symbol"],
+            "trading_date": symbol_info["trading_date"],
+            "market_time": symbol_info["market_time"],
+            "price": symbol_info["price"],
+            "absolute_variation": symbol_info["absolute_variation"],
+            "relative_variation": symbol_info["relative_variation"],
+            "volume": symbol_info["volume"],
+            "effective_amount": symbol_info["effective_amount"],
+            "timestamp": symbol_info["timestamp"],
+        }
+        return UpdateOne(
+            {
+                "symbol": tick["symbol"],
+                "trading_date": tick["trading_date"],
+                "market_time": tick["market_time"],
+            },
+            {"$setOnInsert": tick},
+            upsert=True,
+        )
+
+    def _build_quote_upsert(self, symbol_info: SymbolTick) -> UpdateOne:
+        """
+        Build the latest-quote upsert for a single symbol.
+
+        Every quote field is $set, so the stored quote is always one whole
+        tick. The filter only matches when the stored quote is older;
+        otherwise the upsert's insert attempt collides on the unique 'symbol'
+        index and is skipped. This keeps concurrent writers from moving a
+        quote backwards, or mixing fields of two ticks.
+
+        Args:
+            symbol_info: Tick decoded by _process_server_data
+        """
+        return UpdateOne(
+            {
+                "symbol": symbol_info["symbol"],
+                "timestamp": {"$not": {"$gte": symbol_info["timestamp"]}},
+            },
+            {
+                "$set": {
+                    **{field: symbol_info[field] for field in QUOTE_FIELDS},
                     "timestamp": symbol_info["timestamp"],
-                }
+                },
+                "$setOnInsert": {"description": symbol_info["description"]},
+            },
+            upsert=True,
+        )
 
-                # Check if symbol already exists
-                existing_doc = collection.find_one({"symbol": symbol_code})
-
-                if existing_doc is None:
-                    # Doesn't exist, create new document with initial history
-                    new_document = {
-                        "symbol": symbol_info["symbol"],
-                        "description": symbol_info["description"],
-                        "timestamp": symbol_info["timestamp"],
-                        "raw_data": symbol_info["raw_data"],
-                        "history": [history_entry],
-                    }
-                    collection.insert_one(new_document)
-                    inserted_count += 1
-                    logger.debug(f"New symbol inserted: {symbol_code}")
-                else:
-                    # Exists, check if there's already a record with same date and market_time
-                    current_date = symbol_info[
-                        "timestamp"
-                    ].date()  # Only year, month, day
-                    market_time = symbol_info["market_time"]
-
-                    # Check if it exists in history
-                    duplicate_exists = False
-                    if "history" in existing_doc:
-                        for entry in existing_doc["history"]:
-                            entry_timestamp = entry.get("timestamp")
-
-                            # Get date from entry timestamp
-                            if isinstance(entry_timestamp, str):
-                                # Parse ISO format string to datetime (format: 2025-10-15T14:30:00.000000)
-                                try:
-
-                                    entry_date = get_current_time().date()
-                                except (ValueError, AttributeError):
-                                    continue  # Skip if we can't parse
-                            elif hasattr(entry_timestamp, "date"):
-                                entry_date = entry_timestamp.date()
-                            else:
-                                continue  # Skip if we can't get date
-
-                            # Compare only date (year, month, day) AND market_time
-                            # Only skip if BOTH match (same date AND same time)
-                            if (
-                                entry_date == current_date
-                                and entry.get("market_time") == market_time
-                            ):
-                                duplicate_exists = True
-                                break
-
-                    if not duplicate_exists:
-                        # Update document: main data + add to history
-                        collection.update_one(
-                            {"symbol": symbol_code},
-                            {
-                                "$push": {"history": history_entry},
-                            },
-                        )
-                        updated_count += 1
-                        logger.debug(f"Symbol updated: {symbol_code}")
-                    else:
-                        skipped_count += 1
-                        logger.debug(
-                            f"Duplicate record skipped: {symbol_code} (date: {current_date}, time: {market_time})"
-                        )
+    def _bulk_write(self, collection, operations: List[UpdateOne]) -> Dict[str, Any]:
+        """
+        Run an unordered bulk_write and summarize the result.
+
+        Duplicate-key errors are the expected outcome for data that is
+        already stored and are counted as skipped.
+
+        Args:
+            collection: Target MongoDB collection
+            operations: Upserts to execute
+
+        Returns:
+            Dictionary with upserted, modified, skipped and failed counts,
+            and the indexes of the operations that inserted a document
+        """
+        counts = {
+            "upserted": 0,
+            "modified": 0,
+            "skipped": 0,
+            "failed": 0,
+            "upserted_indexes": [],
+        }
+        if not operations:
+            return counts
 
-            print(
-                f"Processed {len(symbols_data)} symbols: "
-                f"{inserted_count} new, {updated_count} updated, {skipped_count} skipped"
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            counts["upserted"] = result.upserted_count
+            counts["modified"] = result.modified_count
+            counts["upserted_indexes"] = sorted(result.upserted_ids)
+        except BulkWriteError as e:
+            details = e.details
+            counts["upserted"] = details.get("nUpserted", 0)
+            counts["modified"] = details.get("nModified", 0)
+            counts["upserted_indexes"] = sorted(
+                upserted["index"] for upserted in details.get("upserted", [])
+            )
+            for error in details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    counts["failed"] += 1
+                    logger.error(f"Bulk write error: {error.get('errmsg')}")
+
+        counts["skipped"] = (
+            len(operations) - counts["upserted"] - counts["modified"] - counts["failed"]
+        )
+        return counts
+
+    def _save_data(self, symbols_data: List[SymbolTick]) -> Dict[str, int]:
+        """
+        Save data to MongoDB.
+        Blocking: runs on the writer thread pool, never on the event loop.
+
+        Each batch costs one unordered bulk_write per collection:
+        - Ticks go to 'market_ticks'; ticks already stored are no-op index hits
+        - The latest quote per symbol is upserted into 'market_data' (every
+          field, whatever other writers have stored meanwhile)
+
+        Args:
+            symbols_data: List of symbol data to save
+
+        Returns:
+            Dictionary with inserted, updated, skipped and failed counts
+        """
+        counts = {"inserted": 0, "updated": 0, "skipped": 0, "failed": 0}
+        started = time.perf_counter()
+        try:
+            db = get_db()
+
+            if not self._indexes_ready:
+                ensure_indexes(db)
+                self._indexes_ready = True
+
+            ticks = self._bulk_write(
+                db[MARKET_TICKS],
+                [self._build_tick_upsert(info) for info in symbols_data],
+            )
+            # A batch can hold several frames; only the newest quote per symbol matters
+            latest = {info["symbol"]: info for info in symbols_data}
+            quote_values = {
+                symbol: {field: info[field] for field in QUOTE_FIELDS}
+                for symbol, info in latest.items()
+            }
+            quotes = self._bulk_write(
+                db[MARKET_DATA],
+                [self._build_quote_upsert(info) for info in latest.values()],
+            )
+
+            counts["inserted"] = quotes["upserted"]
+            counts["updated"] = ticks["upserted"] - quotes["upserted"]
+            counts["skipped"] = ticks["skipped"]
+
+            # Fold the ticks that were actually new into the OHLCV candles
+            candle_ops = self._candles.apply(
+                [symbols_data[index] for index in ticks["upserted_indexes"]]
+            )
+            candles = self._bulk_write(db[MARKET_CANDLES], candle_ops)
+
+            counts["failed"] = ticks["failed"] + quotes["failed"] + candles["failed"]
+
+            # Let HTTP readers know their cached snapshots are stale
+            if ticks["upserted"] or quotes["upserted"] or quotes["modified"]:
+                bump_market_version(db)
+
+            # Only remember what is known to be stored: forget the batch's
+            # symbols when a quote failed or was skipped. Writers can finish
+            # out of order, so a newer remembered tick is always kept.
+            with self._last_seen_lock:
+                for symbol, values in quote_values.items():
+                    seen = self._last_seen.get(symbol)
+                    newer = seen is not None and (
+                        self._tick_time(seen) > self._tick_time(values)
+                    )
+                    if counts["failed"]:
+                        self._last_seen.pop(symbol, None)
+                    elif newer:
+                        continue
+                    elif quotes["skipped"]:
+                        self._last_seen.pop(symbol, None)
+                    else:
+                        self._last_seen[symbol] = values
+
+            logger.debug(
+                "Processed %d symbols: %d new, %d updated, %d skipped, %d failed",
+                len(symbols_data),
+                counts["inserted"],
+                counts["updated"],
+                counts["skipped"],
+                counts["failed"],
             )
 
         except Exception as e:
-            print(f"Error saving data: {e}")
+            logger.error(f"Error saving data: {e}")
+
+        save_seconds.observe(time.perf_counter() - started)
+        for result, count in counts.items():
+            ticks_saved.inc(count, result=result)
+        return counts
 
     async def _connect_and_listen(self) -> None:
         """
         Establish WebSocket connection and listen for messages.
         Handles send/receive message logic.
         """
-        ssl_context = self._create_ssl_context()
+        # Plain ws:// URLs (e.g. a local replay server) take no SSL context
+        ssl_context = (
+            self._create_ssl_context() if self.ws_url.startswith("wss://") else None
+        )
 
         try:
             async with websockets.connect(
@@ -273,11 +833,16 @@ class BVCWebSocketClient:
                 ping_interval=self.ping_interval,
                 ping_timeout=self.ping_timeout,
             ) as websocket:
-                print("[OK] Connected to BVC WebSocket server")
+                logger.info("Connected to BVC WebSocket server")
+                connected.set(1)
+                self.connected_since = get_current_time()
+                self._set_health(CONNECTED)
+                if self.disconnected_at is not None:
+                    self._reconcile_next_frame = True
+                received_any = False
 
                 # Send initial handshake message
                 await websocket.send("40")
-                print("Handshake message sent (40)")
                 logger.debug("Handshake message sent (40)")
 
                 # Main receive loop
@@ -286,21 +851,21 @@ class BVCWebSocketClient:
                         message = await asyncio.wait_for(
                             websocket.recv(), timeout=self.ping_timeout
                         )
-
-                        current_hour = get_current_time().hour
+                        self.last_message_at = time.time()
+                        if not received_any:
+                            # The link works: the next drop starts a new backoff
+                            received_any = True
+                            self.reconnect_attempts = 0
+
+                        # Outside the session, drop data frames before any
+                        # decoding; pings are still answered to keep the link up
+                        if self.session is not None and not self.session.is_open_now():
+                            engine_type, socket_type = frame_type(message)
+                            if engine_type == MESSAGE and socket_type == EVENT:
+                                frames_received.inc(type="off_hours")
+                                continue
 
                         response = await self._handle_message(message)
-                        if current_hour < 9 or current_hour == 13:
-                            if self.is_running:
-                                print(
-                                    f"The time must be between 9am and 1pm. {get_current_time()}"
-                                )
-
-                            # self.is_running = False
-                            continue
-                        else:
-                            print("The time is between 9am and 1pm")
-
                         if response:
                             await websocket.send(response)
 
@@ -310,100 +875,165 @@ class BVCWebSocketClient:
                         await websocket.ping()
 
         except websockets.exceptions.WebSocketException as e:
-            print(f"WebSocket error: {e}")
+            logger.error(f"WebSocket error: {e}")
             raise
         except Exception as e:
-            print(f"Unexpected connection error: {e}")
+            logger.error(f"Unexpected connection error: {e}")
             raise
+        finally:
+            connected.set(0)
 
     async def start(self) -> None:
         """
         Start WebSocket client with automatic reconnection.
         """
         self.is_running = True
-        reconnect_attempts = 0
 
-        print(f"Starting BVC WebSocket client: {self.ws_url}")
-        print("IS RUNNING", self.is_running)
-        while self.is_running and reconnect_attempts < self.max_reconnect_attempts:
+        logger.info(f"Starting BVC WebSocket client: {self.ws_url}")
+        self._start_writers()
+        try:
             try:
-                await self._connect_and_listen()
+                await asyncio.get_running_loop().run_in_executor(
+                    self._db_executor, self._warm_cache
+                )
+                # A restart is a gap too: check the first frame against the cache
+                self._reconcile_next_frame = bool(self._last_seen)
+            except Exception as e:
+                logger.error(f"Error warming last-seen cache: {e}")
+            await self._reconnect_loop()
+        finally:
+            await self._stop_writers()
+            if self.health != FAILED:
+                self._set_health(STOPPED)
 
-            except (
-                websockets.exceptions.ConnectionClosed,
-                websockets.exceptions.WebSocketException,
-                ConnectionError,
-            ) as e:
-                reconnect_attempts += 1
-                if self.is_running:
-                    logger.warning(
-                        f"Connection lost ({reconnect_attempts}/{self.max_reconnect_attempts}): {e}"
-                    )
-                    print(f"Reconnecting in {self.reconnect_delay} seconds...")
-                    await asyncio.sleep(self.reconnect_delay)
-                else:
-                    break
+        logger.info("BVC WebSocket client stopped")
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Delay before reconnect attempt 'attempt' (1-based): exponential, capped
+        at reconnect_max_delay, with jitter so replicas don't retry in lockstep.
+        """
+        delay = min(
+            self.reconnect_max_delay, self.reconnect_base_delay * 2 ** (attempt - 1)
+        )
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _reconnect_loop(self) -> None:
+        """
+        Connect and keep reconnecting until stopped.
+
+        During a market session it never gives up; outside of one it stops
+        after max_reconnect_attempts consecutive failures.
+        """
+        self.reconnect_attempts = 0
+        while self.is_running:
+            try:
+                await self._connect_and_listen()
 
             except Exception as e:
-                print(f"Critical error: {e}")
-                reconnect_attempts += 1
-                if reconnect_attempts < self.max_reconnect_attempts:
-                    await asyncio.sleep(self.reconnect_delay)
-                else:
+                if not self.is_running:
                     break
 
-        if reconnect_attempts >= self.max_reconnect_attempts:
-            print("Maximum reconnection attempts reached")
+                reason = (
+                    "connection"
+                    if isinstance(
+                        e, (websockets.exceptions.WebSocketException, OSError)
+                    )
+                    else "error"
+                )
+                self.last_error = f"{type(e).__name__}: {e}"
+                if self.disconnected_at is None:
+                    self.disconnected_at = get_current_time()
+                self._set_health(RECONNECTING)
+                self.reconnect_attempts += 1
+
+                in_session = self.session is not None and self.session.is_open_now()
+                if (
+                    not in_session
+                    and self.reconnect_attempts >= self.max_reconnect_attempts
+                ):
+                    logger.error("Maximum reconnection attempts reached")
+                    self._set_health(FAILED)
+                    break
 
-        print("BVC WebSocket client stopped")
+                delay = self._backoff_delay(self.reconnect_attempts)
+                reconnects.inc(reason=reason)
+                logger.warning(
+                    f"Connection lost (attempt {self.reconnect_attempts}): {e}. "
+                    f"Reconnecting in {delay:.1f} seconds..."
+                )
+                await asyncio.sleep(delay)
 
     async def stop(self) -> None:
         """
         Stop WebSocket client cleanly.
         """
-        print("Stopping BVC WebSocket client...")
+        logger.info("Stopping BVC WebSocket client...")
         self.is_running = False
 
 
+async def run_market_sessions(session: Optional[MarketSession] = None) -> None:
+    """
+    Run the client once per trading session, forever.
+
+    Connects 'lead' minutes before the open and disconnects 'grace' minutes
+    after the close; between sessions (nights, weekends, holidays) it sleeps
+    until the next connection window.
+
+    Args:
+        session: Trading session calendar (defaults to MarketSession.from_env())
+    """
+    session = session or MarketSession.from_env()
+
+    while True:
+        now = get_current_time()
+        start, end = session.window(now)
+        if now < start:
+            logger.info(f"Market closed, next connection at {start.isoformat()}")
+            await asyncio.sleep((start - now).total_seconds())
+            continue
+
+        logger.info(f"Market session until {end.isoformat()}, connecting")
+        client = BVCWebSocketClient(session=session)
+        client.add_listener(market_broadcaster.publish)
+        task = asyncio.create_task(client.start())
+        try:
+            await asyncio.wait(
+                {task}, timeout=(end - get_current_time()).total_seconds()
+            )
+            await client.stop()
+            await task  # returns once the receive loop sees the stop
+        except asyncio.CancelledError:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+
+        # If the client stopped early, don't spin until the window ends
+        if get_current_time() < end:
+            await asyncio.sleep(client.reconnect_max_delay)
+
+
 # Maintain compatibility with original function
 async def connect_to_ws_bvc() -> None:
     """
     Compatibility function to connect to BVC WebSocket.
     Recommended to use BVCWebSocketClient directly for more control.
+
+    Runs the client during market sessions only (see run_market_sessions).
+    Decoded changes are published to market_broadcaster, which feeds the
+    /market/stream endpoint when the client runs inside the HTTP server.
     """
-    client = BVCWebSocketClient()
-    print("Starting BVC WebSocket client...")
-    await client.start()
+    start_db()
+
+    logger.info("Starting BVC WebSocket client...")
+    await run_market_sessions()
 
 
 if __name__ == "__main__":
+    # Run as the supervised, leader-elected ingester (see src/ws/ingester.py)
     try:
-        from database.mongo import start_db
-        from time import sleep
+        from src.ws.ingester import main
+    except ImportError:
+        from ws.ingester import main
 
-        db = start_db()
-        print("[OK] Database connected successfully")
-    except Exception as e:
-        print(f"[ERROR] Error connecting to database: {e}")
-        sys.exit(1)
-
-    # Start the WebSocket client
-    print("Starting BVC WebSocket client...")
-    try:
-        running = False
-        while True:
-            
-            time = get_current_time()
-            hour = time.hour
-            if hour >= 9 and hour <= 2:
-                asyncio.run(connect_to_ws_bvc())
-            else:
-                print(f"Waiting to open marketp current hour -> {hour}")
-                sleep(3600)
-    except Exception as e:
-        print(f"[ERROR] Error starting BVC WebSocket client: {e}")
-        sys.exit(1)
-    except KeyboardInterrupt:
-        print("KeyboardInterrupt")
-        print("Stopping BVC WebSocket client...")
-        sys.exit(0)
+    main()
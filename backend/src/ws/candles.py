@@ -0,0 +1,183 @@
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+from pymongo import UpdateOne
+
+# Supported candle intervals and their length in seconds
+INTERVALS = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+
+# Formats seen in the HORA field of serverData
+_TIME_FORMATS = ("%H:%M:%S", "%H:%M", "%I:%M:%S %p", "%I:%M %p")
+
+
+def market_datetime(
+    trading_date: str, market_time: Any, fallback: datetime
+) -> datetime:
+    """
+    Moment a tick was traded, from its trading date and HORA.
+
+    Args:
+        trading_date: Trading date as YYYY-MM-DD
+        market_time: HORA as sent by BVC (e.g. "10:31:05" or "10:31 AM")
+        fallback: Timezone-aware ingestion time, used when HORA can't be parsed
+    """
+    if isinstance(market_time, str):
+        text = market_time.strip().upper().replace(".", "")
+        text = text.replace("A M", "AM").replace("P M", "PM")
+        for time_format in _TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(text, time_format).time()
+            except ValueError:
+                continue
+            return datetime.combine(
+                date.fromisoformat(trading_date), parsed, tzinfo=fallback.tzinfo
+            )
+    return fallback
+
+
+def bucket_start(moment: datetime, interval: str) -> datetime:
+    """Start of the candle of the given interval that contains 'moment'"""
+    length = INTERVALS[interval]
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second
+    seconds -= seconds % length
+    return moment.replace(
+        hour=seconds // 3600,
+        minute=seconds % 3600 // 60,
+        second=seconds % 60,
+        microsecond=0,
+    )
+
+
+class CandleAggregator:
+    """
+    Maintains OHLCV candles per symbol and interval as ticks arrive.
+
+    BVC sends cumulative daily VOLUMEN and MONTO_EFECTIVO, so the volume of a
+    candle is the increase of those totals between consecutive ticks.
+    Every batch of ticks becomes at most one upsert per open candle, plus one
+    update that marks a candle as closed when a tick crosses its boundary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # symbol -> (trading_date, cumulative volume, cumulative amount)
+        self._totals: Dict[str, Tuple[str, float, float]] = {}
+        # (symbol, interval) -> start of the open candle
+        self._open: Dict[Tuple[str, str], datetime] = {}
+
+    def warm(self, quotes: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Seed the cumulative totals from the last persisted quotes, so the first
+        tick after a restart is not credited with the whole day's volume.
+
+        Args:
+            quotes: symbol -> quote with trading_date, volume and effective_amount
+        """
+        with self._lock:
+            for symbol, quote in quotes.items():
+                self._totals[symbol] = (
+                    quote.get("trading_date"),
+                    quote.get("volume") or 0,
+                    quote.get("effective_amount") or 0,
+                )
+
+    def apply(self, ticks: List[Dict[str, Any]]) -> List[UpdateOne]:
+        """
+        Fold new ticks into the candles.
+
+        Args:
+            ticks: New (not duplicate) ticks, oldest first
+
+        Returns:
+            Upserts for the market_candles collection
+        """
+        bars: Dict[Tuple[str, str, datetime], Dict[str, Any]] = {}
+        closed: List[Tuple[str, str, datetime]] = []
+
+        with self._lock:
+            for tick in ticks:
+                price = tick.get("price")
+                if price is None:
+                    continue
+
+                symbol = tick["symbol"]
+                volume, amount = self._increments(tick)
+                moment = market_datetime(
+                    tick["trading_date"], tick["market_time"], tick["timestamp"]
+                )
+
+                for interval, length in INTERVALS.items():
+                    start = bucket_start(moment, interval)
+                    open_start = self._open.get((symbol, interval))
+                    if open_start is not None and start < open_start:
+                        continue  # late tick for a candle that is already closed
+                    if open_start is not None and start > open_start:
+                        previous = bars.get((symbol, interval, open_start))
+                        if previous is not None:
+                            previous["closed"] = True
+                        else:
+                            closed.append((symbol, interval, open_start))
+                    self._open[(symbol, interval)] = start
+
+                    key = (symbol, interval, start)
+                    bar = bars.get(key)
+                    if bar is None:
+                        bars[key] = {
+                            "open": price,
+                            "high": price,
+                            "low": price,
+                            "close": price,
+                            "volume": volume,
+                            "effective_amount": amount,
+                            "ticks": 1,
+                            "end": start + timedelta(seconds=length),
+                            "closed": False,
+                        }
+                    else:
+                        bar["high"] = max(bar["high"], price)
+                        bar["low"] = min(bar["low"], price)
+                        bar["close"] = price
+                        bar["volume"] += volume
+                        bar["effective_amount"] += amount
+                        bar["ticks"] += 1
+
+        operations = []
+        for (symbol, interval, start), bar in bars.items():
+            operations.append(
+                UpdateOne(
+                    {"symbol": symbol, "interval": interval, "start": start},
+                    {
+                        "$setOnInsert": {"open": bar["open"], "end": bar["end"]},
+                        "$max": {"high": bar["high"]},
+                        "$min": {"low": bar["low"]},
+                        "$set": {"close": bar["close"], "closed": bar["closed"]},
+                        "$inc": {
+                            "volume": bar["volume"],
+                            "effective_amount": bar["effective_amount"],
+                            "ticks": bar["ticks"],
+                        },
+                    },
+                    upsert=True,
+                )
+            )
+        for symbol, interval, start in closed:
+            operations.append(
+                UpdateOne(
+                    {"symbol": symbol, "interval": interval, "start": start},
+                    {"$set": {"closed": True}},
+                )
+            )
+        return operations
+
+    def _increments(self, tick: Dict[str, Any]) -> Tuple[float, float]:
+        """Volume and amount traded since the previous tick of the same day"""
+        volume = tick.get("volume") or 0
+        amount = tick.get("effective_amount") or 0
+        previous = self._totals.get(tick["symbol"])
+        self._totals[tick["symbol"]] = (tick["trading_date"], volume, amount)
+
+        if previous is None or previous[0] != tick["trading_date"]:
+            return volume, amount
+        # Totals only grow during a session; a drop is a correction, not a trade
+        return max(volume - previous[1], 0), max(amount - previous[2], 0)
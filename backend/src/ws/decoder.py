@@ -0,0 +1,196 @@
+"""
+Decoder for the Engine.IO / socket.io frames sent by the BVC WebSocket.
+
+Frames are dispatched on their prefix without slicing the message, and
+serverData items are turned into slotted SymbolTick records that share a
+single timestamp and trading date per frame.
+
+orjson is used as JSON backend when it is installed (BVC_JSON_BACKEND=json
+forces the standard library).
+"""
+
+import json
+from datetime import datetime
+from os import getenv
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Engine.IO packet types (first character of a frame)
+OPEN = "0"
+CLOSE = "1"
+PING = "2"
+PONG = "3"
+MESSAGE = "4"
+
+# socket.io packet types (second character of an Engine.IO message)
+CONNECT = "0"
+DISCONNECT = "1"
+EVENT = "2"
+
+# serverData keys -> SymbolTick fields
+DELTA_FIELDS = {
+    "PRECIO": "price",
+    "VAR_ABS": "absolute_variation",
+    "VAR_REL": "relative_variation",
+    "VOLUMEN": "volume",
+    "MONTO_EFECTIVO": "effective_amount",
+    "HORA": "market_time",
+}
+
+# JSON backend used by decode_event: "orjson" or "json"
+JSON_BACKEND = (
+    "orjson"
+    if orjson is not None and (getenv("BVC_JSON_BACKEND") or "orjson") == "orjson"
+    else "json"
+)
+
+_std_decoder = json.JSONDecoder()
+
+
+class SymbolTick:
+    """
+    One symbol of a serverData frame.
+
+    Supports item access (tick["price"], tick.get("price")) so it can be used
+    wherever the writer stage used to receive plain dictionaries.
+    """
+
+    __slots__ = (
+        "symbol",
+        "description",
+        "price",
+        "absolute_variation",
+        "relative_variation",
+        "volume",
+        "effective_amount",
+        "market_time",
+        "trading_date",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        symbol: str,
+        description: Optional[str],
+        price: Any,
+        absolute_variation: Any,
+        relative_variation: Any,
+        volume: Any,
+        effective_amount: Any,
+        market_time: Any,
+        trading_date: str,
+        timestamp: datetime,
+    ):
+        self.symbol = symbol
+        self.description = description
+        self.price = price
+        self.absolute_variation = absolute_variation
+        self.relative_variation = relative_variation
+        self.volume = volume
+        self.effective_amount = effective_amount
+        self.market_time = market_time
+        self.trading_date = trading_date
+        self.timestamp = timestamp
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field, default)
+
+    def changes(self, previous: Optional["SymbolTick"]) -> Dict[str, Any]:
+        """Quote fields that differ from 'previous' (all of them if None)"""
+        changes = {}
+        for field in _QUOTE_SLOTS:
+            value = getattr(self, field)
+            if previous is None or getattr(previous, field) != value:
+                changes[field] = value
+        return changes
+
+    def __repr__(self) -> str:
+        return f"SymbolTick({self.symbol} {self.price} @ {self.market_time})"
+
+
+# Fields compared between consecutive frames (see SymbolTick.changes)
+_QUOTE_SLOTS = tuple(DELTA_FIELDS.values()) + ("trading_date",)
+
+
+def frame_type(message: str) -> Tuple[str, str]:
+    """
+    Engine.IO and socket.io packet types of a frame, e.g. ("4", "2") for an event.
+
+    Only looks at the first two characters; the message is never copied.
+    """
+    if not message:
+        return "", ""
+    if len(message) == 1 or message[0] != MESSAGE:
+        return message[0], ""
+    return MESSAGE, message[1]
+
+
+def decode_event(message: str) -> Tuple[Optional[str], Any]:
+    """
+    Decode a socket.io event frame ('42["name", payload]').
+
+    The standard library decoder parses from offset 2 in place; orjson needs
+    its own copy of the JSON text.
+
+    Returns:
+        (event name, payload), or (None, None) if the frame holds no event
+
+    Raises:
+        ValueError: If the JSON is invalid (json.JSONDecodeError and
+            orjson.JSONDecodeError are both ValueError subclasses)
+    """
+    if JSON_BACKEND == "orjson":
+        data = orjson.loads(message[2:])
+    else:
+        data, _ = _std_decoder.raw_decode(message, 2)
+
+    if not isinstance(data, list) or not data:
+        return None, None
+    return data[0], data[1] if len(data) > 1 else None
+
+
+def decode_ticks(
+    items: List[Dict[str, Any]], timestamp: datetime, trading_date: str
+) -> List[SymbolTick]:
+    """
+    Turn serverData items into SymbolTick records.
+
+    Args:
+        items: serverData payload
+        timestamp: Ingestion time shared by every tick of the frame
+        trading_date: Trading date (YYYY-MM-DD) of the frame
+
+    Returns:
+        One record per item with a COD_SIMB, in frame order
+    """
+    ticks = []
+    for item in items:
+        symbol = item.get("COD_SIMB")
+        if symbol is None:
+            continue
+        ticks.append(
+            SymbolTick(
+                symbol,
+                item.get("DESC_SIMB"),
+                item.get("PRECIO"),
+                item.get("VAR_ABS"),
+                item.get("VAR_REL"),
+                item.get("VOLUMEN"),
+                item.get("MONTO_EFECTIVO"),
+                item.get("HORA"),
+                trading_date,
+                timestamp,
+            )
+        )
+    return ticks
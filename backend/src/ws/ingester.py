@@ -0,0 +1,198 @@
+"""
+Supervised ingester process with leader election.
+
+Several replicas can run this process; a lease in MongoDB makes exactly one of
+them the leader, which runs the BVC client during market sessions. Standbys
+poll the lease and take over when the leader stops renewing it (crash,
+network partition or shutdown).
+
+Usage (from the backend directory):
+    python -m src.ws.ingester
+
+Environment:
+    BVC_LEASE_TTL: Seconds a lease stays valid without renewal (default 15)
+    BVC_LEASE_HEARTBEAT: Seconds between renewals / standby polls (default 5)
+    BVC_METRICS_PORT: Serve /metrics on this port
+    LOG_LEVEL: Log level (default INFO)
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from os import getenv
+
+try:
+    from src.database.mongo import start_db
+    from src.database.mongo.leader_lease import LeaderLease
+    from src.metrics.registry import registry, start_metrics_server
+    from src.ws.bvc import connect_to_ws_bvc
+except ImportError:
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from database.mongo import start_db
+    from database.mongo.leader_lease import LeaderLease
+    from metrics.registry import registry, start_metrics_server
+    from ws.bvc import connect_to_ws_bvc
+
+logger = logging.getLogger(__name__)
+
+is_leader = registry.gauge(
+    "bvc_leader", "1 while this process holds the ingester lease"
+)
+leader_changes = registry.counter(
+    "bvc_leader_changes_total", "Times this process gained or lost the lease", ["event"]
+)
+
+
+class IngesterSupervisor:
+    """
+    Runs the ingester while this process holds the leader lease.
+
+    The leader renews the lease every 'heartbeat' seconds. If it can't renew
+    (lost to another replica, or MongoDB unreachable until the lease is about
+    to expire) it stops ingesting at once, so two replicas never ingest for
+    longer than one heartbeat. Overlapping writes are harmless anyway: ticks
+    are upserted on a unique key and quotes only move forward in time.
+    """
+
+    def __init__(self, lease: LeaderLease, heartbeat: float = 5.0):
+        """
+        Args:
+            lease: Leader lease shared by every replica
+            heartbeat: Seconds between renewals and standby polls
+        """
+        if heartbeat >= lease.ttl:
+            raise ValueError("The lease heartbeat must be shorter than its TTL")
+        self.lease = lease
+        self.heartbeat = heartbeat
+        self.leader = False
+        self._info = {"host": socket.gethostname(), "pid": os.getpid()}
+
+    async def _try_lease(self) -> bool:
+        """acquire() on a worker thread, bounded by one heartbeat"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(None, self.lease.acquire, self._info),
+                timeout=self.heartbeat,
+            )
+        except Exception as e:
+            logger.warning(f"Could not reach the leader lease: {e}")
+            return False
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader != self.leader:
+            leader_changes.inc(event="acquired" if leader else "lost")
+            logger.info(
+                f"{self.lease.owner} is now "
+                f"{'the leader' if leader else 'a standby'}"
+            )
+        self.leader = leader
+        is_leader.set(1 if leader else 0)
+
+    async def _lead(self) -> None:
+        """Ingest while the lease keeps being renewed"""
+        task = asyncio.create_task(connect_to_ws_bvc())
+        renewed_at = time.monotonic()
+        try:
+            while True:
+                await asyncio.wait({task}, timeout=self.heartbeat)
+                if task.done():
+                    if not task.cancelled() and task.exception() is not None:
+                        logger.error(f"Ingester crashed: {task.exception()}")
+                    return
+
+                if await self._try_lease():
+                    renewed_at = time.monotonic()
+                elif time.monotonic() - renewed_at >= self.lease.ttl - self.heartbeat:
+                    # Another replica may take over at the next heartbeat
+                    logger.warning("Leader lease lost, stopping ingestion")
+                    return
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            self._set_leader(False)
+
+    async def run(self) -> None:
+        """Stand by until elected, lead until the lease is lost, repeat forever"""
+        try:
+            while True:
+                if await self._try_lease():
+                    self._set_leader(True)
+                    await self._lead()
+                    # Hand over straight away instead of waiting for the expiry
+                    await self._release()
+                await asyncio.sleep(self.heartbeat)
+        finally:
+            if self.leader:
+                self._set_leader(False)
+            await self._release()
+
+    async def _release(self) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.lease.release)
+        except Exception as e:
+            logger.warning(f"Could not release the leader lease: {e}")
+
+
+async def run_ingester(db=None) -> None:
+    """
+    Run the leader-elected ingester until cancelled.
+
+    Args:
+        db: Database holding the lease (defaults to start_db())
+    """
+    lease = LeaderLease(
+        db if db is not None else start_db(),
+        ttl=float(getenv("BVC_LEASE_TTL") or 15),
+    )
+    supervisor = IngesterSupervisor(
+        lease, heartbeat=float(getenv("BVC_LEASE_HEARTBEAT") or 5)
+    )
+    logger.info(f"Ingester {lease.owner} started as standby")
+    await supervisor.run()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=getenv("LOG_LEVEL") or "INFO",
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    metrics_port = getenv("BVC_METRICS_PORT")
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+
+    try:
+        db = start_db()
+        logger.info("Database connected successfully")
+    except Exception as e:
+        logger.error(f"Error connecting to database: {e}")
+        sys.exit(1)
+
+    async def supervise() -> None:
+        task = asyncio.create_task(run_ingester(db))
+        loop = asyncio.get_running_loop()
+        # Stop cleanly (and release the lease) when the platform stops us
+        for stop_signal in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(stop_signal, task.cancel)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+        try:
+            await task
+        except asyncio.CancelledError:
+            logger.info("Ingester stopped")
+
+    try:
+        asyncio.run(supervise())
+    except KeyboardInterrupt:
+        logger.info("KeyboardInterrupt, ingester stopped")
+
+
+if __name__ == "__main__":
+    main()
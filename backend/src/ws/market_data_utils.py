@@ -0,0 +1,196 @@
+"""
+Market data queries over the latest quotes stored by the BVC WebSocket client.
+
+Queries run on the server, backed by the indexes created in
+ensure_indexes(), so MongoDB sorts and limits instead of Python.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+try:
+    from src.database.mongo.collections import MARKET_TICKS
+except ImportError:
+    from database.mongo.collections import MARKET_TICKS
+
+
+# Output shape shared by every query (field names used by the examples)
+_QUOTE_PROJECTION = {
+    "_id": 0,
+    "codigo_simbolo": "$symbol",
+    "descripcion": "$description",
+    "precio": "$price",
+    "variacion_absoluta": "$absolute_variation",
+    "variacion_relativa": "$relative_variation",
+    "volumen": "$volume",
+    "monto_efectivo": "$effective_amount",
+    "hora_mercado": "$market_time",
+    "fecha": "$trading_date",
+}
+
+
+class MarketDataQuery:
+    """
+    Rankings, summary and lookups over the market_data collection.
+    """
+
+    def __init__(self, collection):
+        """
+        Args:
+            collection: The market_data collection (latest quote per symbol)
+        """
+        self.collection = collection
+        self.ticks = collection.database[MARKET_TICKS]
+
+    def _ranking(
+        self, field: str, direction: int, match: Dict[str, Any], limit: int
+    ) -> List[Dict[str, Any]]:
+        """Top 'limit' quotes by 'field', using the index on that field"""
+        pipeline = [
+            {"$match": match},
+            {"$sort": {field: direction}},
+            {"$limit": limit},
+            {"$project": _QUOTE_PROJECTION},
+        ]
+        return list(self.collection.aggregate(pipeline))
+
+    def get_market_summary(self) -> Optional[Dict[str, Any]]:
+        """
+        Totals over the symbols quoted in the latest session.
+
+        Symbols that didn't trade today keep the quote of an earlier session;
+        they are left out so their volume and variation don't skew the totals.
+
+        Returns:
+            Dictionary with total_symbols, gainers, losers, unchanged,
+            total_volume, total_value, avg_variation and trading_date, or None
+            if empty
+        """
+        # Latest session, read from the trading_date index
+        latest = self.collection.find_one(
+            {"trading_date": {"$exists": True}},
+            {"_id": 0, "trading_date": 1},
+            sort=[("trading_date", -1)],
+        )
+        if latest is None:
+            return None
+        trading_date = latest["trading_date"]
+
+        pipeline = [
+            {"$match": {"trading_date": trading_date}},
+            {
+                "$group": {
+                    "_id": None,
+                    "total_symbols": {"$sum": 1},
+                    "gainers": {
+                        "$sum": {"$cond": [{"$gt": ["$relative_variation", 0]}, 1, 0]}
+                    },
+                    "losers": {
+                        "$sum": {"$cond": [{"$lt": ["$relative_variation", 0]}, 1, 0]}
+                    },
+                    "unchanged": {
+                        "$sum": {"$cond": [{"$eq": ["$relative_variation", 0]}, 1, 0]}
+                    },
+                    "total_volume": {"$sum": "$volume"},
+                    "total_value": {"$sum": "$effective_amount"},
+                    "avg_variation": {"$avg": "$relative_variation"},
+                }
+            },
+            {"$project": {"_id": 0}},
+        ]
+        results = list(self.collection.aggregate(pipeline))
+        if not results:
+            return None
+        return {**results[0], "trading_date": trading_date}
+
+    def get_top_gainers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Symbols with the highest positive relative variation"""
+        return self._ranking(
+            "relative_variation", -1, {"relative_variation": {"$gt": 0}}, limit
+        )
+
+    def get_top_losers(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Symbols with the lowest negative relative variation"""
+        return self._ranking(
+            "relative_variation", 1, {"relative_variation": {"$lt": 0}}, limit
+        )
+
+    def get_most_traded(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Symbols with the highest traded volume"""
+        return self._ranking("volume", -1, {"volume": {"$gt": 0}}, limit)
+
+    def get_highest_value(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Symbols with the highest effective amount"""
+        return self._ranking(
+            "effective_amount", -1, {"effective_amount": {"$gt": 0}}, limit
+        )
+
+    def search_symbol(self, text: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Symbols whose code starts with 'text' or whose description contains it.
+
+        The unanchored, case-insensitive description match can't use an index,
+        so this scans market_data. That collection holds one small document per
+        listed symbol, so the scan stays bounded by the size of the board.
+        """
+        escaped = re.escape(text.strip())
+        pipeline = [
+            {
+                "$match": {
+                    "$or": [
+                        {"symbol": {"$regex": f"^{escaped.upper()}"}},
+                        {"description": {"$regex": escaped, "$options": "i"}},
+                    ]
+                }
+            },
+            {"$sort": {"symbol": 1}},
+            {"$limit": limit},
+            {"$project": _QUOTE_PROJECTION},
+        ]
+        return list(self.collection.aggregate(pipeline))
+
+    def get_latest_by_symbol(self, symbol: str, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Most recent ticks of a symbol, newest first.
+
+        The ticks come from a find on the (symbol, timestamp) index of the ticks
+        collection; the description from the symbol's quote document.
+        """
+        symbol = symbol.upper()
+        quote = self.collection.find_one({"symbol": symbol}, {"description": 1})
+        if quote is None:
+            return []
+        ticks = (
+            self.ticks.find({"symbol": symbol}, {"_id": 0})
+            .sort("timestamp", -1)
+            .limit(limit)
+        )
+        return [
+            {
+                "codigo_simbolo": symbol,
+                "descripcion": quote.get("description"),
+                "precio": tick.get("price"),
+                "variacion_absoluta": tick.get("absolute_variation"),
+                "variacion_relativa": tick.get("relative_variation"),
+                "volumen": tick.get("volume"),
+                "monto_efectivo": tick.get("effective_amount"),
+                "hora_mercado": tick.get("market_time"),
+                "fecha": tick.get("trading_date"),
+            }
+            for tick in ticks
+        ]
+
+
+def format_currency(value: Optional[float], decimals: int = 2) -> str:
+    """Format a number the Venezuelan way: 1.234.567,89"""
+    if value is None:
+        return "-"
+    formatted = f"{value:,.{decimals}f}"
+    return formatted.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def format_percentage(value: Optional[float], decimals: int = 2) -> str:
+    """Format a relative variation (already in percent) with its sign: +1,25%"""
+    if value is None:
+        return "-"
+    return f"{value:+.{decimals}f}%".replace(".", ",")
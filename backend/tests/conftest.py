@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the backend directory to the path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def alcambio_page() -> str:
+    """alcambio.app page with the markup of its rate cards"""
+    return (FIXTURES / "alcambio.html").read_text(encoding="utf-8")
@@ -0,0 +1,213 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.ws.bcv import RateProvider, parse_amount, parse_rates
+
+URL = "https://alcambio.test/"
+
+
+def make_provider(handler, **options) -> RateProvider:
+    """RateProvider whose requests are answered by 'handler'"""
+    provider = RateProvider(url=URL, **options)
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return provider
+
+
+def page_handler(pages, requests):
+    """Answers with the next page of 'pages' and records every request"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text=pages[min(len(requests), len(pages)) - 1])
+
+    return handler
+
+
+def age(provider: RateProvider, seconds: float) -> None:
+    """Make the cached rates 'seconds' older"""
+    provider._fetched_at -= seconds
+
+
+@pytest.mark.parametrize(
+    "text, value",
+    [
+        ("Bs. 36,52", 36.52),
+        ("Bs. 1.234,56", 1234.56),
+        ("1.234.567", 1234567.0),
+        ("36.52", 36.52),
+        ("Bs. 40,", 40.0),
+        ("USD 1", 1.0),
+        ("Sin datos —", None),
+        ("", None),
+    ],
+)
+def test_parse_amount(text, value):
+    assert parse_amount(text) == value
+
+
+def test_parse_rates(alcambio_page):
+    assert parse_rates(alcambio_page) == [
+        {"label": "Dólar BCV", "text": "Bs. 36,52", "value": 36.52},
+        {"label": "Euro BCV", "text": "Bs. 39,87", "value": 39.87},
+        {"label": "Dólar Promedio", "text": "Bs. 1.234,56", "value": 1234.56},
+        {"label": "USDT", "text": "Sin datos —", "value": None},
+    ]
+
+
+def test_parse_rates_without_money_nodes():
+    assert parse_rates("<html><body><p>Bs. 36,52</p></body></html>") == []
+
+
+def test_fresh_rates_are_served_without_fetching(alcambio_page):
+    requests = []
+    provider = make_provider(page_handler([alcambio_page], requests), ttl=300)
+
+    async def run():
+        await provider.refresh_in_background()
+        rates = provider.get_rates()
+        await provider.aclose()
+        return rates
+
+    rates = asyncio.run(run())
+    assert len(requests) == 1
+    assert [rate["value"] for rate in rates["rates"]] == [36.52, 39.87, 1234.56, None]
+    assert rates["stale"] is False
+    assert rates["refreshing"] is False
+    assert rates["error"] is None
+    assert rates["updated_at"] is not None
+
+
+def test_missing_rates_are_fetched_in_the_background(alcambio_page):
+    requests = []
+    provider = make_provider(page_handler([alcambio_page], requests))
+
+    async def run():
+        first = provider.get_rates()
+        await provider._refresh
+        second = provider.get_rates()
+        await provider.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["rates"] == []
+    assert first["stale"] is True
+    assert first["refreshing"] is True
+    assert len(second["rates"]) == 4
+    assert len(requests) == 1
+
+
+def test_stale_rates_are_served_while_revalidating(alcambio_page):
+    newer = alcambio_page.replace("36,52", "37,10")
+    requests = []
+    provider = make_provider(
+        page_handler([alcambio_page, newer], requests), ttl=300, stale_ttl=3600
+    )
+
+    async def run():
+        await provider.refresh_in_background()
+        age(provider, 301)
+        stale = provider.get_rates()
+        # A single refresh however many requests see the stale rates
+        provider.get_rates()
+        await provider._refresh
+        fresh = provider.get_rates()
+        await provider.aclose()
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+    assert stale["stale"] is True
+    assert stale["refreshing"] is True
+    assert stale["rates"][0]["value"] == 36.52
+    assert fresh["stale"] is False
+    assert fresh["rates"][0]["value"] == 37.10
+    assert len(requests) == 2
+
+
+def test_rates_older_than_stale_ttl_are_dropped(alcambio_page):
+    provider = make_provider(page_handler([alcambio_page], []), stale_ttl=3600)
+
+    async def run():
+        await provider.refresh_in_background()
+        age(provider, 3601)
+        rates = provider.get_rates()
+        await provider.aclose()
+        return rates
+
+    rates = asyncio.run(run())
+    assert rates["rates"] == []
+    assert rates["updated_at"] is None
+    assert rates["refreshing"] is True
+
+
+def test_not_modified_renews_the_cached_rates(alcambio_page):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            text=alcambio_page,
+            headers={"ETag": '"v1"', "Last-Modified": "Sun, 18 Oct 2026 12:00:00 GMT"},
+        )
+
+    provider = make_provider(handler, ttl=300)
+
+    async def run():
+        assert await provider.fetch() is True
+        updated_at = provider.get_rates()["updated_at"]
+        age(provider, 301)
+        assert await provider.fetch() is False
+        rates = provider.get_rates()
+        await provider.aclose()
+        return updated_at, rates
+
+    updated_at, rates = asyncio.run(run())
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    assert requests[1].headers["if-modified-since"] == "Sun, 18 Oct 2026 12:00:00 GMT"
+    assert rates["stale"] is False
+    assert rates["updated_at"] == updated_at
+    assert len(rates["rates"]) == 4
+
+
+def test_failed_refresh_keeps_the_rates(alcambio_page):
+    pages = [alcambio_page]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if pages:
+            return httpx.Response(200, text=pages.pop())
+        return httpx.Response(502)
+
+    provider = make_provider(handler, ttl=300)
+
+    async def run():
+        await provider.refresh_in_background()
+        age(provider, 301)
+        provider.get_rates()
+        await provider._refresh
+        rates = provider.get_rates()
+        await provider.aclose()
+        return rates
+
+    rates = asyncio.run(run())
+    assert len(rates["rates"]) == 4
+    assert rates["stale"] is True
+    assert "502" in rates["error"]
+
+
+def test_page_without_rates_is_an_error():
+    provider = make_provider(lambda request: httpx.Response(200, text="<html></html>"))
+
+    async def run():
+        await provider.refresh_in_background()
+        rates = provider.get_rates()
+        await provider.aclose()
+        return rates
+
+    rates = asyncio.run(run())
+    assert rates["rates"] == []
+    assert rates["error"].startswith("ValueError")
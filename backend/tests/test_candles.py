@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import mongomock
+
+from src.ws.candles import CandleAggregator, bucket_start, market_datetime
+
+CARACAS = ZoneInfo("America/Caracas")
+NOW = datetime(2025, 10, 15, 12, 0, tzinfo=CARACAS)
+
+
+def tick(market_time, price, volume, amount, trading_date="2025-10-15", symbol="BNC"):
+    return {
+        "symbol": symbol,
+        "trading_date": trading_date,
+        "market_time": market_time,
+        "price": price,
+        "volume": volume,
+        "effective_amount": amount,
+        "timestamp": NOW,
+    }
+
+
+def store(operations):
+    """market_candles after applying 'operations'"""
+    candles = mongomock.MongoClient().db.market_candles
+    candles.bulk_write(operations)
+    return candles
+
+
+def test_market_datetime_parses_hora_in_the_market_time_zone():
+    assert market_datetime("2025-10-15", "10:31:05", NOW) == datetime(
+        2025, 10, 15, 10, 31, 5, tzinfo=CARACAS
+    )
+    assert market_datetime("2025-10-15", "2:05 p. m.", NOW) == datetime(
+        2025, 10, 15, 14, 5, tzinfo=CARACAS
+    )
+    assert market_datetime("2025-10-15", "later", NOW) == NOW
+
+
+def test_daily_bucket_starts_at_local_midnight():
+    moment = datetime(2025, 10, 15, 23, 59, 59, tzinfo=CARACAS)
+    start = bucket_start(moment, "1d")
+    assert start == datetime(2025, 10, 15, tzinfo=CARACAS)
+    assert start.utcoffset() == timedelta(hours=-4)
+    assert bucket_start(moment, "1h") == datetime(2025, 10, 15, 23, tzinfo=CARACAS)
+    assert bucket_start(moment, "5m") == datetime(2025, 10, 15, 23, 55, tzinfo=CARACAS)
+
+
+def test_volume_is_the_increase_of_the_cumulative_totals():
+    aggregator = CandleAggregator()
+    operations = aggregator.apply(
+        [
+            tick("10:00:00", 10.0, 100, 1000),
+            tick("10:00:30", 12.0, 150, 1600),
+            tick("10:01:10", 11.0, 170, 1820),
+        ]
+    )
+    candles = store(operations)
+
+    first = candles.find_one({"interval": "1m", "start": NOW.replace(hour=10)})
+    prices = {field: first[field] for field in ("open", "high", "low", "close")}
+    assert prices == {"open": 10.0, "high": 12.0, "low": 10.0, "close": 12.0}
+    assert first["volume"] == 150 and first["effective_amount"] == 1600
+    assert first["closed"] is True
+
+    second = candles.find_one(
+        {"interval": "1m", "start": NOW.replace(hour=10, minute=1)}
+    )
+    assert second["volume"] == 20 and second["effective_amount"] == 220
+    assert second["closed"] is False
+
+    day = candles.find_one({"interval": "1d"})
+    assert day["volume"] == 170 and day["ticks"] == 3
+
+
+def test_warm_totals_are_not_counted_again():
+    aggregator = CandleAggregator()
+    aggregator.warm(
+        {"BNC": {"trading_date": "2025-10-15", "volume": 500, "effective_amount": 5000}}
+    )
+    candles = store(aggregator.apply([tick("11:00:00", 10.0, 520, 5200)]))
+    assert candles.find_one({"interval": "1d"})["volume"] == 20
+
+
+def test_totals_restart_with_a_new_trading_date():
+    aggregator = CandleAggregator()
+    aggregator.apply([tick("15:00:00", 10.0, 900, 9000)])
+    operations = aggregator.apply(
+        [tick("09:30:00", 10.0, 30, 300, trading_date="2025-10-16")]
+    )
+    day = store(operations).find_one(
+        {"interval": "1d", "start": datetime(2025, 10, 16, tzinfo=CARACAS)}
+    )
+    assert day["volume"] == 30
+
+
+def test_a_drop_in_the_totals_adds_no_volume():
+    aggregator = CandleAggregator()
+    operations = aggregator.apply(
+        [tick("10:00:00", 10.0, 100, 1000), tick("10:00:20", 10.0, 90, 900)]
+    )
+    assert store(operations).find_one({"interval": "1m"})["volume"] == 100
+
+
+def test_late_ticks_for_a_closed_candle_are_skipped():
+    aggregator = CandleAggregator()
+    aggregator.apply([tick("10:05:00", 10.0, 100, 1000)])
+    operations = aggregator.apply([tick("10:01:00", 99.0, 110, 1100)])
+    candles = store(operations)
+    assert candles.count_documents({"interval": {"$in": ["1m", "5m"]}}) == 0
+    assert candles.find_one({"interval": "1h"})["high"] == 99.0
@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from src.config.time import get_current_time
+from src.database.mongo.compaction import TickCompactor, daily_bar
+
+TODAY = get_current_time().date()
+OLD_DAY = (TODAY - timedelta(days=40)).isoformat()
+RECENT_DAY = (TODAY - timedelta(days=2)).isoformat()
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db.market_data.insert_many([{"symbol": "BNC"}, {"symbol": "MVZ.A"}])
+    return db
+
+
+def add_day(db, symbol, trading_date, prices):
+    """Ticks of a day with growing cumulative totals. Returns the last _id"""
+    ticks = [
+        {
+            "_id": ObjectId(),
+            "symbol": symbol,
+            "trading_date": trading_date,
+            "market_time": f"10:{minute:02d}:00",
+            "price": price,
+            "volume": (minute + 1) * 100,
+            "effective_amount": (minute + 1) * 1000.0,
+            "timestamp": get_current_time(),
+        }
+        for minute, price in enumerate(prices)
+    ]
+    db.market_ticks.insert_many(ticks)
+    return ticks[-1]["_id"]
+
+
+def export_checkpoint(db, last_id):
+    db.market_meta.insert_one({"_id": "tick_export", "last_id": last_id})
+
+
+def compactor(db, **options):
+    return TickCompactor(db, batch_size=2, pause=0, **options)
+
+
+def test_daily_bar_uses_the_largest_cumulative_totals():
+    bar = daily_bar(
+        [
+            {"price": 10.0, "volume": 100, "effective_amount": 1000},
+            {"price": None, "volume": 150, "effective_amount": 1500},
+            {"price": 8.0, "volume": 120, "effective_amount": 1200},
+            {"price": 9.0, "volume": None, "effective_amount": None},
+        ]
+    )
+    assert bar == {
+        "open": 10.0,
+        "high": 10.0,
+        "low": 8.0,
+        "close": 9.0,
+        "volume": 150,
+        "effective_amount": 1500,
+        "ticks": 3,
+    }
+    assert daily_bar([{"price": None, "volume": 10}]) is None
+
+
+def test_old_days_become_daily_bars(db):
+    add_day(db, "BNC", OLD_DAY, [10.0, 12.0, 9.0, 11.0, 10.5])
+    add_day(db, "BNC", RECENT_DAY, [11.0, 11.5])
+
+    stats = compactor(db).run()
+
+    assert stats["days"] == 1 and stats["deleted"] == 5
+    assert db.market_ticks.count_documents({"trading_date": OLD_DAY}) == 0
+    assert db.market_ticks.count_documents({"trading_date": RECENT_DAY}) == 2
+
+    bar = db.market_candles.find_one({"symbol": "BNC", "interval": "1d"})
+    prices = {field: bar[field] for field in ("open", "high", "low", "close")}
+    assert prices == {"open": 10.0, "high": 12.0, "low": 9.0, "close": 10.5}
+    assert bar["volume"] == 500 and bar["ticks"] == 5
+    assert bar["compacted"] is True and bar["closed"] is True
+
+    # Nothing left to compact
+    assert compactor(db).run()["days"] == 0
+
+
+def test_days_not_exported_yet_are_kept(db):
+    exported = add_day(db, "BNC", OLD_DAY, [10.0, 11.0])
+    export_checkpoint(db, exported)
+    add_day(db, "MVZ.A", OLD_DAY, [80.0, 81.0])
+
+    stats = compactor(db).run()
+
+    assert stats["days"] == 1 and stats["waiting_for_export"] == 1
+    assert db.market_ticks.count_documents({"symbol": "BNC"}) == 0
+    assert db.market_ticks.count_documents({"symbol": "MVZ.A"}) == 2
+    assert db.market_candles.count_documents({"symbol": "MVZ.A"}) == 0
+
+
+def test_ignoring_exports_compacts_every_old_day(db):
+    exported = add_day(db, "BNC", OLD_DAY, [10.0])
+    export_checkpoint(db, exported)
+    add_day(db, "MVZ.A", OLD_DAY, [80.0])
+
+    stats = compactor(db, wait_for_export=False).run()
+
+    assert stats["days"] == 2 and stats["waiting_for_export"] == 0
+    assert db.market_ticks.count_documents({}) == 0
+
+
+def test_an_interrupted_day_only_finishes_the_deletion(db):
+    add_day(db, "BNC", OLD_DAY, [10.0, 12.0, 9.0])
+    compactor(db).run()
+    bar = db.market_candles.find_one({"interval": "1d"})
+
+    # Ticks left behind by a run that stopped while deleting
+    add_day(db, "BNC", OLD_DAY, [99.0])
+    stats = compactor(db).run()
+
+    assert stats["deleted"] == 1
+    assert db.market_candles.find_one({"interval": "1d"}) == bar
+
+
+def test_max_days_limits_a_run(db):
+    for days in (40, 39, 38):
+        add_day(db, "BNC", (TODAY - timedelta(days=days)).isoformat(), [10.0])
+
+    assert compactor(db).run(max_days=2)["days"] == 2
+    assert db.market_ticks.count_documents({}) == 1
+    assert compactor(db).run()["days"] == 1
+
+
+def test_intraday_candles_expire_with_the_window(db):
+    now = get_current_time()
+    for days in (40, 2):
+        for interval in ("1m", "5m", "1h", "1d"):
+            db.market_candles.insert_one(
+                {
+                    "symbol": "BNC",
+                    "interval": interval,
+                    "start": now - timedelta(days=days),
+                }
+            )
+
+    stats = compactor(db).run()
+
+    assert stats["candles_deleted"] == 3
+    assert db.market_candles.count_documents({"interval": "1d"}) == 2
+    assert db.market_candles.count_documents({"interval": "1m"}) == 1
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.ws import decoder
+from src.ws.decoder import decode_event, decode_ticks, frame_type
+
+NOW = datetime(2025, 10, 15, 14, 30, tzinfo=timezone.utc)
+
+ITEMS = [
+    {
+        "COD_SIMB": "BNC",
+        "DESC_SIMB": "Banco Nacional de Crédito",
+        "PRECIO": 1.25,
+        "VAR_ABS": 0.05,
+        "VAR_REL": 4.17,
+        "VOLUMEN": 120000,
+        "MONTO_EFECTIVO": 150000.0,
+        "HORA": "10:31:05",
+    },
+    {"DESC_SIMB": "No symbol code", "PRECIO": 3.0},
+    {"COD_SIMB": "MVZ.A", "PRECIO": 80.5},
+]
+
+
+def test_decode_ticks_maps_server_data_fields():
+    ticks = decode_ticks(ITEMS, NOW, "2025-10-15")
+    assert [tick.symbol for tick in ticks] == ["BNC", "MVZ.A"]
+
+    bnc = ticks[0]
+    assert bnc["description"] == "Banco Nacional de Crédito"
+    assert bnc["price"] == 1.25
+    assert bnc["absolute_variation"] == 0.05
+    assert bnc["relative_variation"] == 4.17
+    assert bnc["volume"] == 120000
+    assert bnc["effective_amount"] == 150000.0
+    assert bnc["market_time"] == "10:31:05"
+    assert bnc["trading_date"] == "2025-10-15"
+    assert bnc["timestamp"] is NOW
+
+
+def test_decode_ticks_leaves_missing_fields_empty():
+    mvz = decode_ticks(ITEMS, NOW, "2025-10-15")[1]
+    assert mvz.price == 80.5
+    assert mvz.description is None and mvz.volume is None
+    assert mvz.get("market_time", "-") is None
+    assert mvz.get("unknown", "-") == "-"
+    with pytest.raises(KeyError):
+        mvz["unknown"]
+
+
+def test_decode_ticks_of_an_empty_frame():
+    assert decode_ticks([], NOW, "2025-10-15") == []
+
+
+def test_changes_against_the_previous_tick():
+    (first,) = decode_ticks(ITEMS[:1], NOW, "2025-10-15")
+    (second,) = decode_ticks([{**ITEMS[0], "PRECIO": 1.3}], NOW, "2025-10-15")
+
+    quote_fields = {*decoder.DELTA_FIELDS.values(), "trading_date"}
+    assert set(first.changes(None)) == quote_fields
+    assert second.changes(first) == {"price": 1.3}
+    assert first.changes(first) == {}
+
+
+@pytest.mark.parametrize(
+    "message, types",
+    [
+        ("", ("", "")),
+        ("2", ("2", "")),
+        ("3probe", ("3", "")),
+        ("40", ("4", "0")),
+        ('42["serverData",[]]', ("4", "2")),
+    ],
+)
+def test_frame_type(message, types):
+    assert frame_type(message) == types
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_decode_event(backend, monkeypatch):
+    if backend == "orjson" and decoder.orjson is None:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(decoder, "JSON_BACKEND", backend)
+
+    assert decode_event('42["serverData",[{"COD_SIMB":"BNC"}]]') == (
+        "serverData",
+        [{"COD_SIMB": "BNC"}],
+    )
+    assert decode_event('42["ping"]') == ("ping", None)
+    assert decode_event("42[]") == (None, None)
+    with pytest.raises(ValueError):
+        decode_event('42["serverData",')
@@ -0,0 +1,66 @@
+import math
+
+import pytest
+
+from src.http.market.downsample import lttb, min_max
+
+
+def series(size: int):
+    """'size' points of a sine wave with a spike and a dip in the middle"""
+    xs = [float(index) for index in range(size)]
+    ys = [math.sin(index / 7) for index in range(size)]
+    if size > 10:
+        ys[size // 3] = 10.0
+        ys[2 * size // 3] = -10.0
+    return xs, ys
+
+
+@pytest.mark.parametrize("threshold", [3, 4, 10, 99])
+def test_lttb_keeps_threshold_points(threshold):
+    xs, ys = series(100)
+    selected = lttb(xs, ys, threshold)
+    assert len(selected) == threshold
+    assert selected[0] == 0 and selected[-1] == 99
+    assert selected == sorted(set(selected))
+
+
+@pytest.mark.parametrize("threshold", [100, 101, 2, 0])
+def test_lttb_keeps_every_point_at_or_past_the_boundaries(threshold):
+    xs, ys = series(100)
+    assert lttb(xs, ys, threshold) == list(range(100))
+
+
+def test_lttb_keeps_the_extremes():
+    xs, ys = series(100)
+    selected = lttb(xs, ys, 20)
+    assert 33 in selected and 66 in selected
+
+
+def test_lttb_empty_series():
+    assert lttb([], [], 10) == []
+
+
+@pytest.mark.parametrize("threshold", [2, 3, 4, 5, 10, 99])
+def test_min_max_keeps_at_most_threshold_points(threshold):
+    _, ys = series(100)
+    selected = min_max(ys, threshold)
+    assert len(selected) <= threshold
+    assert selected[0] == 0 and selected[-1] == 99
+    assert selected == sorted(set(selected))
+
+
+@pytest.mark.parametrize("threshold", [100, 101, 1, 0])
+def test_min_max_keeps_every_point_at_or_past_the_boundaries(threshold):
+    _, ys = series(100)
+    assert min_max(ys, threshold) == list(range(100))
+
+
+def test_min_max_keeps_the_extremes():
+    _, ys = series(100)
+    selected = min_max(ys, 10)
+    assert 33 in selected and 66 in selected
+
+
+def test_min_max_threshold_three_keeps_the_furthest_point():
+    ys = [0.0, 1.0, -5.0, 2.0, 0.0]
+    assert min_max(ys, 3) == [0, 2, 4]
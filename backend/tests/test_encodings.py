@@ -0,0 +1,162 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.http.market import encodings
+from src.http.market.encodings import (
+    ARROW,
+    JSON,
+    MSGPACK,
+    negotiate_encoding,
+    negotiate_format,
+    variant,
+)
+from src.http.market.market_controller import snapshot_response
+from src.http.market.snapshot_cache import SnapshotCache
+
+PAYLOAD = {
+    "data": [
+        {"symbol": f"S{index:03d}", "price": index * 1.5, "volume": index * 100}
+        for index in range(100)
+    ],
+    "count": 100,
+}
+
+needs_msgpack = pytest.mark.skipif(
+    encodings.msgpack is None, reason="msgpack is not installed"
+)
+needs_brotli = pytest.mark.skipif(
+    encodings.brotli is None, reason="brotli is not installed"
+)
+
+
+@pytest.fixture
+def snapshot():
+    return SnapshotCache(lambda: 1).get("board", lambda: PAYLOAD)
+
+
+@pytest.fixture
+def client(snapshot):
+    app = FastAPI()
+
+    @app.get("/board")
+    def board(request: Request):
+        return snapshot_response(request, snapshot)
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "accept, media_type",
+    [
+        ("", JSON),
+        ("*/*", JSON),
+        ("text/html", JSON),
+        ("application/*", JSON),
+        ("application/json;q=0.5, */*;q=0.1", JSON),
+        (f"{JSON};q=0, text/html", JSON),
+    ],
+)
+def test_negotiate_format_defaults_to_json(accept, media_type):
+    assert negotiate_format(accept) == media_type
+
+
+@needs_msgpack
+@pytest.mark.parametrize(
+    "accept",
+    [
+        MSGPACK,
+        f"{JSON};q=0.5, {MSGPACK}",
+        f"{MSGPACK}, {JSON}",
+        f"{MSGPACK};q=0.9, */*;q=0.1",
+    ],
+)
+def test_negotiate_format_msgpack(accept):
+    assert negotiate_format(accept) == MSGPACK
+
+
+def test_negotiate_format_without_pyarrow(monkeypatch):
+    monkeypatch.setattr(encodings, "FORMATS", (JSON,))
+    assert negotiate_format(f"{ARROW}, {MSGPACK};q=0.5") == JSON
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip;q=0, deflate", None),
+        ("deflate, *;q=0.2", encodings.ENCODINGS[0]),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, encoding):
+    assert negotiate_encoding(accept_encoding) == encoding
+
+
+@needs_brotli
+def test_negotiate_encoding_prefers_brotli_on_ties():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+
+def test_variants_are_built_once_per_snapshot(snapshot):
+    first = variant(snapshot, "", "gzip")
+    assert variant(snapshot, "*/*", "gzip, deflate") is first
+    assert first.encoding == "gzip"
+    assert json.loads(gzip.decompress(first.body)) == PAYLOAD
+    assert first.etag != snapshot.etag
+    assert variant(snapshot, "", "").etag == snapshot.etag
+
+
+def test_small_bodies_are_not_compressed():
+    small = SnapshotCache(lambda: 1).get("small", lambda: {"count": 0})
+    selected = variant(small, "", "gzip")
+    assert selected.encoding is None
+    assert selected.etag == small.etag
+
+
+def test_response_is_compressed_and_varies(client, snapshot):
+    response = client.get("/board", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == JSON
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert response.headers["etag"] == variant(snapshot, "", "gzip").etag
+    assert response.json() == PAYLOAD
+
+
+def test_matching_etag_answers_304(client):
+    headers = {"Accept-Encoding": "gzip"}
+    etag = client.get("/board", headers=headers).headers["etag"]
+
+    response = client.get("/board", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-encoding" not in response.headers
+
+
+def test_etag_of_another_variant_gets_the_body(client):
+    gzipped = client.get("/board", headers={"Accept-Encoding": "gzip"})
+    gzip_etag = gzipped.headers["etag"]
+    response = client.get(
+        "/board",
+        headers={"Accept-Encoding": "identity", "If-None-Match": gzip_etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != gzip_etag
+    assert response.json() == PAYLOAD
+
+
+@needs_msgpack
+def test_msgpack_response(client):
+    response = client.get(
+        "/board", headers={"Accept": MSGPACK, "Accept-Encoding": "identity"}
+    )
+    assert response.headers["content-type"] == MSGPACK
+    assert response.headers["etag"].endswith('-msgpack"')
+    assert encodings.msgpack.unpackb(response.content) == PAYLOAD
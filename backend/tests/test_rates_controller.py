@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi.testclient import TestClient
+
+from src.app_module import http_server
+from src.ws.bcv import rate_provider
+
+
+def test_rates_answer_503_until_the_first_fetch(alcambio_page, monkeypatch):
+    release = threading.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        # Hold the first fetch until the 503 was checked
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return httpx.Response(200, text=alcambio_page)
+
+    monkeypatch.setattr(
+        rate_provider,
+        "_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(rate_provider, "_rates", [])
+    monkeypatch.setattr(rate_provider, "_fetched_at", None)
+    monkeypatch.setattr(rate_provider, "_refresh", None)
+
+    # Entering the client runs the startup handlers, which start the fetch
+    with TestClient(http_server) as client:
+        response = client.get("/rates")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+        assert response.json()["rates"] == []
+        assert response.json()["refreshing"] is True
+
+        release.set()
+        deadline = time.monotonic() + 5
+        while rate_provider._fetched_at is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        response = client.get("/rates")
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "max-age=60"
+        assert response.json()["rates"][0] == {
+            "label": "Dólar BCV",
+            "text": "Bs. 36,52",
+            "value": 36.52,
+        }
@@ -0,0 +1,129 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from src.config import market_session
+from src.config.market_session import MarketSession, easter_sunday, national_holidays
+
+CARACAS = ZoneInfo("America/Caracas")
+
+
+@pytest.fixture(autouse=True)
+def caracas_time_zone(monkeypatch):
+    monkeypatch.delenv("TIME_ZONE", raising=False)
+
+
+def at(year, month, day, hour=0, minute=0) -> datetime:
+    return datetime(year, month, day, hour, minute, tzinfo=CARACAS)
+
+
+@pytest.mark.parametrize(
+    "year, sunday",
+    [
+        (1818, date(1818, 3, 22)),
+        (2000, date(2000, 4, 23)),
+        (2024, date(2024, 3, 31)),
+        (2025, date(2025, 4, 20)),
+        (2026, date(2026, 4, 5)),
+        (2038, date(2038, 4, 25)),
+    ],
+)
+def test_easter_sunday(year, sunday):
+    assert easter_sunday(year) == sunday
+
+
+def test_national_holidays_include_the_easter_based_days():
+    holidays = national_holidays(2025)
+    assert {
+        date(2025, 3, 3),  # Lunes de Carnaval
+        date(2025, 3, 4),  # Martes de Carnaval
+        date(2025, 4, 17),  # Jueves Santo
+        date(2025, 4, 18),  # Viernes Santo
+        date(2025, 1, 1),
+        date(2025, 12, 25),
+    } <= holidays
+    assert len(holidays) == 14
+
+
+def test_trading_days():
+    session = MarketSession(holidays=[date(2025, 10, 16)])
+    assert session.is_trading_day(date(2025, 10, 15))  # Wednesday
+    assert not session.is_trading_day(date(2025, 10, 16))  # configured holiday
+    assert not session.is_trading_day(date(2025, 10, 18))  # Saturday
+    assert not session.is_trading_day(date(2025, 4, 18))  # Viernes Santo
+    assert not session.is_trading_day(date(2025, 7, 24))  # fixed holiday
+
+
+@pytest.mark.parametrize(
+    "hour, minute, is_open",
+    [
+        (8, 56, False),  # inside the lead, before the open
+        (9, 0, True),
+        (12, 59, True),
+        (13, 5, True),  # grace after the close
+        (13, 10, False),
+    ],
+)
+def test_is_open_counts_the_grace_but_not_the_lead(hour, minute, is_open):
+    assert MarketSession().is_open(at(2025, 10, 15, hour, minute)) is is_open
+
+
+def test_window_of_the_current_session():
+    session = MarketSession()
+    assert session.window(at(2025, 10, 15, 8)) == (
+        at(2025, 10, 15, 8, 55),
+        at(2025, 10, 15, 13, 10),
+    )
+    assert session.window(at(2025, 10, 15, 13, 5)) == (
+        at(2025, 10, 15, 8, 55),
+        at(2025, 10, 15, 13, 10),
+    )
+
+
+def test_window_skips_holidays_and_weekends():
+    # Wednesday before Holy Thursday: the next session is Easter Monday
+    session = MarketSession()
+    start, end = session.window(at(2026, 4, 1, 13, 10))
+    assert start == at(2026, 4, 6, 8, 55)
+    assert end == at(2026, 4, 6, 13, 10)
+
+
+def test_window_without_trading_days():
+    holidays = [date(2025, 10, 15) + timedelta(days=day) for day in range(40)]
+    with pytest.raises(ValueError):
+        MarketSession(holidays=holidays).window(at(2025, 10, 15))
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("BVC_SESSION_OPEN", "09:30")
+    monkeypatch.setenv("BVC_SESSION_CLOSE", "12:45")
+    monkeypatch.setenv("BVC_HOLIDAYS", "2025-10-15, 2025-10-16,")
+    monkeypatch.setenv("BVC_SESSION_GRACE", "2")
+    session = MarketSession.from_env()
+    assert (session.open_time, session.close_time) == (time(9, 30), time(12, 45))
+    assert session.holidays == {date(2025, 10, 15), date(2025, 10, 16)}
+    assert session.lead == timedelta(minutes=5)
+    assert session.grace == timedelta(minutes=2)
+
+
+def test_is_open_now_is_cached_until_the_state_changes(monkeypatch):
+    now = at(2025, 10, 15, 10)
+    monkeypatch.setattr(market_session, "get_current_time", lambda: now)
+    monkeypatch.setattr(market_session.time, "time", lambda: now.timestamp())
+    session = MarketSession()
+    windows = []
+    window = session.window
+    monkeypatch.setattr(
+        session, "window", lambda now: windows.append(now) or window(now)
+    )
+
+    assert session.is_open_now() is True
+    now = at(2025, 10, 15, 13, 9)
+    assert session.is_open_now() is True
+    assert len(windows) == 1  # answered from the cache until close + grace
+
+    now = at(2025, 10, 15, 13, 10)
+    assert session.is_open_now() is False
+    assert len(windows) == 2
+    assert session._state_until == at(2025, 10, 16, 9).timestamp()
@@ -4,7 +4,9 @@ import {
   MarketInterface,
   MarketService,
   HistoryInterface,
+  QuoteInterface,
 } from '../../services/http/market.service';
+import { Observable, catchError, map, of, switchMap } from 'rxjs';
 import { MarketChartsComponent } from '../../components/market-charts/market-charts.component';
 import { AdsenseComponent } from '../../components/adsense/adsense.component';
 import { inject } from '@vercel/analytics';
@@ -120,9 +122,18 @@ export class AppComponent implements OnInit {
       this.loading = false;
       return;
     }
-    this.marketService.getMarketData().subscribe({
-      next: (data: any) => {
-        this.marketData = data.data as MarketInterface[];
+    // El sondeo solo pide el último precio; el historial se carga una vez
+    const request = this.marketData.length
+      ? this.marketService
+          .getMarketData()
+          .pipe(map((data) => this.appendQuotes(data.data)))
+      : this.marketService
+          .getMarketData()
+          .pipe(switchMap((data) => this.loadHistories(data.data)));
+
+    request.subscribe({
+      next: (markets: MarketInterface[]) => {
+        this.marketData = markets;
 
         // Filtrar solo los que tienen datos de hoy para la tabla
         this.filteredMarketData = this.marketData.filter((market) =>
@@ -140,6 +151,67 @@ export class AppComponent implements OnInit {
     });
   }
 
+  // Historial reducido de todos los símbolos, en una sola petición
+  loadHistories(quotes: QuoteInterface[]): Observable<MarketInterface[]> {
+    return this.marketService.getBoardHistory().pipe(
+      map((response) => {
+        const histories = new Map(
+          response.data.map((entry) => [entry.symbol, entry.history])
+        );
+        return quotes.map((quote) => {
+          const history = histories.get(quote.symbol) ?? [];
+          // Sin historial el símbolo se muestra solo con su último precio
+          return history.length
+            ? {
+                symbol: quote.symbol,
+                description: quote.description,
+                timestamp: quote.timestamp,
+                history,
+              }
+            : this.toMarket(quote, []);
+        });
+      }),
+      catchError(() => of(quotes.map((quote) => this.toMarket(quote, []))))
+    );
+  }
+
+  // Agrega el último precio al historial si es más reciente que el guardado
+  appendQuotes(quotes: QuoteInterface[]): MarketInterface[] {
+    const markets = new Map(this.marketData.map((m) => [m.symbol, m]));
+    return quotes.map((quote) => {
+      const market = markets.get(quote.symbol);
+      if (!market) return this.toMarket(quote, []);
+      const last = market.history[market.history.length - 1];
+      if (last && new Date(last.timestamp) >= new Date(quote.timestamp)) {
+        return market;
+      }
+      return this.toMarket(quote, market.history);
+    });
+  }
+
+  toMarket(
+    quote: QuoteInterface,
+    history: HistoryInterface[]
+  ): MarketInterface {
+    return {
+      symbol: quote.symbol,
+      description: quote.description,
+      timestamp: quote.timestamp,
+      history: [
+        ...history,
+        {
+          price: quote.price,
+          absolute_variation: quote.absolute_variation,
+          relative_variation: quote.relative_variation,
+          volume: quote.volume,
+          effective_amount: quote.effective_amount,
+          market_time: quote.market_time,
+          timestamp: quote.timestamp,
+        },
+      ],
+    };
+  }
+
   hasDataFromToday(market: MarketInterface): boolean {
     if (!market.history || market.history.length === 0) {
       return false;
@@ -26,7 +26,20 @@ export interface MarketInterface {
   symbol: string;
   description: string;
   timestamp: string;
-  raw_data: RawDataInterface;
+  raw_data?: RawDataInterface;
+  history: HistoryInterface[];
+}
+
+export interface QuoteInterface extends HistoryInterface {
+  symbol: string;
+  description: string;
+}
+
+export interface SymbolHistoryInterface {
+  symbol: string;
+  method: string | null;
+  interval: string | null;
+  total: number;
   history: HistoryInterface[];
 }
 
@@ -34,7 +47,19 @@ export interface MarketInterface {
   providedIn: 'root',
 })
 export class MarketService extends BaseService {
+  // Último precio de cada símbolo, sin historial
   getMarketData() {
-    return this.http.get(`${this.baseUrl}/market`);
+    return this.http.get<{ data: QuoteInterface[]; count: number }>(
+      `${this.baseUrl}/market`
+    );
+  }
+
+  // Historial de todos los símbolos en una sola petición, reducido en el
+  // servidor a 'points' registros por símbolo
+  getBoardHistory(points = 200) {
+    return this.http.get<{ data: SymbolHistoryInterface[]; count: number }>(
+      `${this.baseUrl}/market/history`,
+      { params: { points } }
+    );
   }
 }